@@ -0,0 +1,117 @@
+#!/usr/bin/python3
+
+""" Memory and scan speed of the table data stored by row or by column.
+
+    Compares the list of row lists of GamelistTableModel against
+    modules.columns.ColumnStore, filled with the same synthetic games.
+    Memory is measured for the containers only, the strings are shared by
+    both layouts.  Run from the project root:
+
+        python3 -m benchmarks.columns
+"""
+
+import random
+import timeit
+import tracemalloc
+
+from modules.columns import ColumnStore, get_column
+
+
+HEADER_LIST = [
+    'name', 'sortname', 'desc',
+    'developer', 'publisher', 'releasedate', 'players',
+    'path', 'thumbnail', 'image', 'marquee', 'video',
+    'genre', 'rating',
+    'favorite', 'hidden', 'kidgame',
+    'lastplayed', 'playcount',
+    'id', 'source'
+]
+
+GENRES = ['Action', 'Shooter / Run and Gun', 'Platform', 'Puzzle',
+          'Sports / Soccer', 'Racing, Driving', 'Role Playing Game',
+          'Fighting / Versus', 'Adventure', 'Strategy']
+
+
+def make_rows(count, seed=1):
+    """ Games with unique paths and names, and few distinct values in the
+        other columns, similar to scraped gamelists.
+    """
+    rnd = random.Random(seed)
+    companies = [f'Company {number}' for number in range(300)]
+    header = {key: val for val, key in enumerate(HEADER_LIST)}
+    rows = []
+    for number in range(count):
+        row = [''] * len(HEADER_LIST)
+        name = f'Game {number} {rnd.choice(GENRES)}'
+        row[header['name']] = name
+        row[header['desc']] = f'Description of {name}. ' * 4
+        row[header['path']] = f'./{name}.zip'
+        row[header['image']] = f'./images/{name}-image.png'
+        row[header['developer']] = rnd.choice(companies)
+        row[header['publisher']] = rnd.choice(companies)
+        row[header['releasedate']] = f'{rnd.randint(1980, 2005)}0101T000000'
+        row[header['players']] = str(rnd.randint(1, 4))
+        row[header['genre']] = rnd.choice(GENRES)
+        row[header['rating']] = str(rnd.randint(0, 10) / 10)
+        row[header['favorite']] = rnd.choice(['true', 'false', ''])
+        row[header['id']] = str(number)
+        row[header['source']] = 'ScreenScraper.fr'
+        rows.append(row)
+    return header, rows
+
+
+def measure(build):
+    """ Bytes allocated by build() and still in use by its result. """
+    tracemalloc.start()
+    result = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+
+def wordlist(data, column):
+    return sorted(filter(None, set(get_column(data, column))))
+
+
+def genres(data, column):
+    genres = set()
+    for genre in set(get_column(data, column)):
+        if genre:
+            genres.update(entry.strip() for entry in genre.split('/'))
+    return sorted(genres)
+
+
+def main(count=60000, number=5):
+    header, rows = make_rows(count)
+    lists, list_size = measure(lambda: [list(row) for row in rows])
+    store, store_size = measure(lambda: ColumnStore(len(header), rows))
+    assert store == lists
+
+    print(f'{count} games, {len(header)} columns')
+    print(f'{"memory":<24} {"rows":>10} {"columns":>10}')
+    print(f'{"containers":<24} {list_size / 2**20:8.1f}MB'
+          f' {store_size / 2**20:8.1f}MB')
+
+    developer = header['developer']
+    genre = header['genre']
+    name = header['name']
+    tasks = {
+        'wordlist developer': lambda data: wordlist(data, developer),
+        'genres': lambda data: genres(data, genre),
+        'filter name contains': lambda data: [
+            index for index, value in enumerate(get_column(data, name))
+            if 'mario' in value.lower()],
+        'read all cells': lambda data: [
+            row[column] for row in data for column in range(len(header))],
+    }
+    print(f'{"scan":<24} {"rows":>10} {"columns":>10}')
+    for task, func in tasks.items():
+        assert func(lists) == func(store)
+        times = [min(timeit.repeat(lambda: func(data), number=1,
+                                   repeat=number)) * 1000
+                 for data in (lists, store)]
+        print(f'{task:<24} {times[0]:8.1f}ms {times[1]:8.1f}ms')
+
+
+if __name__ == '__main__':
+    main()
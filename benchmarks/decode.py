@@ -0,0 +1,90 @@
+#!/usr/bin/python3
+
+""" Micro-benchmark of decoding a single <game> element into a table row.
+
+    Compares the former per-tag find() loop from GamelistTableModel.load()
+    against modules.core.decode_game().  Run from the project root:
+
+        python3 -m benchmarks.decode
+"""
+
+import html
+import timeit
+import xml.etree.ElementTree as ElementTree
+
+from modules.core import decode_game
+
+
+HEADER_LIST = [
+    'name', 'sortname', 'desc',
+    'developer', 'publisher', 'releasedate', 'players',
+    'path', 'thumbnail', 'image', 'marquee', 'video',
+    'genre', 'rating',
+    'favorite', 'hidden', 'kidgame',
+    'lastplayed', 'playcount',
+    'id', 'source'
+]
+
+GAME = '''<game id="3185" source="ScreenScraper.fr">
+    <path>./Metal Slug X (Japan).zip</path>
+    <name>Metal Slug X &amp;amp; Friends</name>
+    <desc>Run and gun, shoot everything that moves.</desc>
+    <image>./images/Metal Slug X (Japan)-image.png</image>
+    <video>./videos/Metal Slug X (Japan)-video.mp4</video>
+    <marquee>./images/Metal Slug X (Japan)-marquee.png</marquee>
+    <thumbnail>./images/Metal Slug X (Japan)-thumb.png</thumbnail>
+    <rating>0.8</rating>
+    <releasedate>19990101T000000</releasedate>
+    <developer>SNK</developer>
+    <publisher>SNK</publisher>
+    <genre>Shooter / Run and Gun</genre>
+    <players>2</players>
+    <favorite>true</favorite>
+    <playcount>12</playcount>
+    <lastplayed>20210423T201513</lastplayed>
+    <region>jp</region>
+    <lang>ja</lang>
+</game>'''
+
+
+def decode_game_legacy(game, header, header_list):
+    game_data = {key: '' for key in header.keys()}
+    game_data['id'] = html.unescape(game.get('id', ''))
+    game_data['source'] = html.unescape(game.get('source', ''))
+    unsupp = []
+    for tagname in game.iter():
+        if not tagname.tag == 'game':
+            text = game.find(tagname.tag)
+            if text is None:
+                game_data[tagname.tag] = ''
+            elif tagname.tag not in header_list:
+                unsupp.append(text)
+            else:
+                text = text.text
+                if text is not None:
+                    text = html.unescape(text)
+                game_data[tagname.tag] = text
+    return list(game_data.values()), unsupp
+
+
+def main(number=20000, repeat=5):
+    game = ElementTree.fromstring(GAME)
+    header = {key: val for val, key in enumerate(HEADER_LIST)}
+    assert (decode_game_legacy(game, header, HEADER_LIST)
+            == decode_game(game, header))
+    results = {
+        'legacy find() loop': lambda: decode_game_legacy(game, header,
+                                                         HEADER_LIST),
+        'core.decode_game': lambda: decode_game(game, header),
+    }
+    timings = {}
+    for name, func in results.items():
+        best = min(timeit.repeat(func, number=number, repeat=repeat))
+        timings[name] = best / number * 1e6
+        print(f'{name:<20} {timings[name]:8.2f} us per game')
+    before, after = timings.values()
+    print(f'{"speedup":<20} {before / after:8.2f} x')
+
+
+if __name__ == '__main__':
+    main()
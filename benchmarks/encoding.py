@@ -0,0 +1,109 @@
+#!/usr/bin/python3
+
+""" Memory of the table data with shared strings and encoded columns for
+    the tags in core.ENCODED_TAGS.
+
+    Parses a generated gamelist file, once with read_gamelist() and once
+    with plain decode_game(), which gives every cell its own string as
+    before.  Then compares a ColumnStore with and without EncodedColumn.
+    Run from the project root:
+
+        python3 -m benchmarks.encoding
+"""
+
+import gc
+import os
+import random
+import tempfile
+import timeit
+import tracemalloc
+
+from modules.core import (build_header, decode_game, iterparse_gamelist,
+                          read_gamelist, NoProgress, ENCODED_TAGS)
+from modules.columns import ColumnStore, get_distinct
+
+
+GENRES = ['Action', 'Shooter / Run and Gun', 'Platform', 'Puzzle',
+          'Sports / Soccer', 'Racing, Driving', 'Role Playing Game',
+          'Fighting / Versus', 'Adventure', 'Strategy']
+
+
+def write_gamelist(file, count, seed=1):
+    rnd = random.Random(seed)
+    companies = [f'Company {number}' for number in range(300)]
+    with open(file, 'w') as stream:
+        stream.write('<?xml version="1.0"?>\n<gameList>\n')
+        for number in range(count):
+            stream.write(
+                f'<game id="{number}" source="ScreenScraper.fr">'
+                f'<path>./Game {number}.zip</path>'
+                f'<name>Game {number}</name>'
+                f'<developer>{rnd.choice(companies)}</developer>'
+                f'<publisher>{rnd.choice(companies)}</publisher>'
+                f'<genre>{rnd.choice(GENRES)}</genre>'
+                f'<players>{rnd.randint(1, 4)}</players>'
+                f'<favorite>{rnd.choice(["true", "false"])}</favorite>'
+                f'<hidden>false</hidden><kidgame>false</kidgame>'
+                '</game>\n')
+        stream.write('</gameList>\n')
+
+
+def read_rows(file, header, pooled):
+    elements = iterparse_gamelist(file, NoProgress())
+    if pooled:
+        return [row for rows, _ in read_gamelist(elements, header, [], [])
+                for row in rows]
+    return [decode_game(element, header)[0] for element in elements
+            if element.tag == 'game']
+
+
+def measure(build):
+    """ Bytes allocated by build() and still in use by its result. """
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+
+def main(count=60000, number=5):
+    header = build_header()
+    encoded = [header[tag] for tag in ENCODED_TAGS]
+    with tempfile.TemporaryDirectory() as directory:
+        file = os.path.join(directory, 'gamelist.xml')
+        write_gamelist(file, count)
+        plain, plain_size = measure(lambda: read_rows(file, header, False))
+        pooled, pooled_size = measure(lambda: read_rows(file, header, True))
+    assert plain == pooled
+
+    columns, columns_size = measure(lambda: ColumnStore(len(header), pooled))
+    codes, codes_size = measure(
+        lambda: ColumnStore(len(header), pooled, encoded))
+    assert columns == codes
+
+    print(f'{count} games, encoded tags: {", ".join(ENCODED_TAGS)}')
+    print(f'{"rows, own strings":<28} {plain_size / 2**20:8.1f}MB')
+    print(f'{"rows, shared strings":<28} {pooled_size / 2**20:8.1f}MB')
+    print(f'{"column lists":<28} {columns_size / 2**20:8.1f}MB'
+          ' (without strings)')
+    print(f'{"encoded columns":<28} {codes_size / 2**20:8.1f}MB'
+          ' (without strings)')
+
+    developer = header['developer']
+    tasks = {
+        'distinct developer': lambda data: get_distinct(data, developer),
+    }
+    print(f'{"scan":<28} {"rows":>10} {"columns":>10} {"encoded":>10}')
+    for task, func in tasks.items():
+        assert func(pooled) == func(columns) == func(codes)
+        times = [min(timeit.repeat(lambda: func(data), number=1,
+                                   repeat=number)) * 1000
+                 for data in (pooled, columns, codes)]
+        print(f'{task:<28} {times[0]:8.1f}ms {times[1]:8.1f}ms'
+              f' {times[2]:8.1f}ms')
+
+
+if __name__ == '__main__':
+    main()
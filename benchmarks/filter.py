@@ -0,0 +1,86 @@
+#!/usr/bin/python3
+
+""" Filter of the table with and without modules.trigrams.TrigramIndex.
+
+    Matches synthetic games against fixed strings and regular expressions,
+    by scanning every cell of the column, by scanning a lowercase copy of
+    the column made in advance, and by matching only the rows found in a
+    trigram index of the column.  Also reports the time and memory to build
+    the index.  Run from the project root:
+
+        python3 -m benchmarks.filter
+"""
+
+import re
+import time
+import timeit
+import tracemalloc
+
+from benchmarks.columns import make_rows
+from modules.columns import get_column, get_lowercase
+from modules.trigrams import TrigramIndex, required_literals
+
+
+def scan(values, match):
+    return {row for row, value in enumerate(values) if match(value or '')}
+
+
+def lookup(values, index, match, literals):
+    candidates = None
+    for literal in literals:
+        rows = index.search(literal)
+        if rows is not None:
+            candidates = rows if candidates is None else candidates & rows
+    if candidates is None:
+        return scan(values, match)
+    return {row for row in candidates if match(values[row] or '')}
+
+
+def main(count=60000, number=5):
+    header, rows = make_rows(count)
+    name = get_column(rows, header['name'])
+    lowercase = [get_lowercase(value) for value in name]
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    index = TrigramIndex()
+    index.extend(name)
+    seconds = time.perf_counter() - start
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f'{count} games, index of column name: {seconds * 1000:.1f}ms'
+          f' {size / 2**20:.1f}MB (build time with tracemalloc)')
+
+    filters = {
+        'fixed "ga"': ('ga', False),
+        'fixed "game 4711"': ('game 4711', False),
+        'fixed "shooter"': ('shooter', False),
+        'fixed "zzz"': ('zzz', False),
+        'regex "game 12.*puzzle"': ('game 12.*puzzle', True),
+        'regex "^game \\d+ sport"': (r'^game \d+ sport', True),
+    }
+    print(f'{"filter":<28} {"scan":>10} {"lowercase":>10} {"index":>10}'
+          f' {"rows":>8}')
+    for task, (pattern, regex) in filters.items():
+        if regex:
+            match = re.compile(pattern, re.IGNORECASE).search
+            literals = required_literals(pattern)
+            folded, values = match, name
+        else:
+            match = lambda text: pattern in text.lower()
+            literals = [pattern]
+            folded = lambda text: pattern in text
+            values = lowercase
+        found = scan(name, match)
+        assert found == scan(values, folded)
+        assert found == lookup(values, index, folded, literals)
+        times = [min(timeit.repeat(func, number=1, repeat=number)) * 1000
+                 for func in (lambda: scan(name, match),
+                              lambda: scan(values, folded),
+                              lambda: lookup(values, index, folded, literals))]
+        print(f'{task:<28} {times[0]:8.1f}ms {times[1]:8.1f}ms'
+              f' {times[2]:8.1f}ms {len(found):8}')
+
+
+if __name__ == '__main__':
+    main()
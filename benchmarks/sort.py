@@ -0,0 +1,68 @@
+#!/usr/bin/python3
+
+""" Sort of the table by several columns with modules.sorting.
+
+    Sorts synthetic games by each column of --sort in turn, as the table
+    view did with one sort per column and both cells read for every
+    comparison, and at once by precomputed keys of all columns with
+    modules.sorting.sort_order().  Also reports the time to make the keys
+    alone.  Run from the project root:
+
+        python3 -m benchmarks.sort
+"""
+
+import functools
+import timeit
+
+from benchmarks.columns import make_rows
+from modules.sorting import (column_keys, get_fallbacks, significant,
+                             sort_order, text_key)
+
+
+def per_column(data, specs, fallbacks):
+    def get_cell(row, column):
+        value = data[row][column]
+        if not value and column in fallbacks:
+            value = data[row][fallbacks[column]]
+        return text_key(value)
+
+    order = list(range(len(data)))
+    for column, descending in specs:
+        def compare(row, other):
+            value, other_value = get_cell(row, column), get_cell(other, column)
+            return (other_value < value) - (value < other_value)
+        order.sort(key=functools.cmp_to_key(compare), reverse=descending)
+    return order
+
+
+def main(count=60000, number=5):
+    header, rows = make_rows(count)
+    fallbacks = get_fallbacks(header)
+    sorts = {
+        'name': [('name', False)],
+        'genre desc': [('genre', True)],
+        'name, players': [('name', False), ('players', False)],
+        'name, genre desc': [('name', False), ('genre', True)],
+        'name, rating, genre': [('name', False), ('rating', False),
+                                ('genre', False)],
+        'players desc, developer': [('players', True),
+                                    ('developer', False)],
+    }
+    print(f'{count} games')
+    print(f'{"sort":<26} {"per column":>10} {"at once":>10} {"keys":>10}')
+    for task, tags in sorts.items():
+        specs = significant([(header[tag], descending)
+                             for tag, descending in tags])
+        assert per_column(rows, specs, fallbacks) == \
+            sort_order(rows, specs, fallbacks)[0]
+        times = [min(timeit.repeat(func, number=1, repeat=number)) * 1000
+                 for func in (lambda: per_column(rows, specs, fallbacks),
+                              lambda: sort_order(rows, specs, fallbacks),
+                              lambda: [column_keys(rows, column)
+                                       for column, _ in specs])]
+        print(f'{task:<26} {times[0]:8.1f}ms {times[1]:8.1f}ms'
+              f' {times[2]:8.1f}ms')
+
+
+if __name__ == '__main__':
+    main()
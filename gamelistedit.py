@@ -2,35 +2,86 @@
 
 import sys
 import os
+import io
+import argparse
 import pathlib
-
-from PyQt5 import QtWidgets, QtCore
+import contextlib
 
 import modules
+from modules import timings
 from modules import settings as G
-from modules.MainWindow import *
 from modules.arguments import *
 from modules.misc import *
 
+timings.mark('imports')
+
+
+def no_gui_requested():
+    """ Check for --no-gui, before any Qt argument is removed from argv by
+        QApplication.  Help and version are left for the full parser after
+        QApplication is created, and so are invalid options unless --no-gui
+        or --batch is given, so their error is shown without Qt.
+    """
+    try:
+        with contextlib.redirect_stdout(io.StringIO()), \
+             contextlib.redirect_stderr(io.StringIO()):
+            arguments, _ = get_parser(list_styles=False).parse_known_args()
+    except SystemExit as error:
+        if not error.code == 2:
+            return False
+        parser = argparse.ArgumentParser(add_help=False)
+        parser.add_argument('-G', '--no-gui', dest='no_gui',
+                            action='store_true')
+        parser.add_argument('--batch', dest='batch')
+        try:
+            with contextlib.redirect_stderr(io.StringIO()):
+                arguments, _ = parser.parse_known_args()
+        except SystemExit:
+            return False
+    return bool(arguments.no_gui or arguments.batch)
+
 
 if __name__ == '__main__':
-    APP = QtWidgets.QApplication(sys.argv)
-    check_version()
-    arguments = get_arguments()
     if frozen():
         executable = sys.executable
     else:
         executable = os.path.abspath(__file__)
     executable = os.path.realpath(executable)
+
+    # Headless mode runs without PyQt5, QApplication and MainWindow.
+    if no_gui_requested():
+        from modules import headless
+        check_version(qt=False)
+        arguments = get_parser(list_styles=False).parse_args()
+        G.set_settings(executable, arguments)
+        timings.mark('settings')
+        if G.settings['batch']:
+            exitcode = 0 if headless.run_batch() else 1
+        else:
+            headless.run()
+            exitcode = 0
+        timings.mark('import and export')
+        EOT_action()
+        if G.settings['startup_timings']:
+            timings.report()
+        sys.exit(exitcode)
+
+    from PyQt5 import QtWidgets
+    from modules.MainWindow import MainWindow
+    timings.mark('import Qt and MainWindow')
+    APP = QtWidgets.QApplication(sys.argv)
+    timings.mark('QApplication')
+    check_version()
+    arguments = get_arguments()
     G.set_settings(executable, arguments)
     set_window_style(APP)
+    timings.mark('settings')
     mainwin = MainWindow(arguments)
-    if G.settings['no_gui']:
-        mainwin.export_file()
-        EOT_action()
-        sys.exit(0)
-    else:
-        APP.setApplicationName(G.settings['app_title'])
-        APP.setApplicationDisplayName(G.settings['app_title'])
-        mainwin.show()
+    timings.mark('MainWindow')
+    APP.setApplicationName(G.settings['app_title'])
+    APP.setApplicationDisplayName(G.settings['app_title'])
+    if G.settings['startup_timings']:
+        timings.report_on_first_paint(APP, mainwin)
+    mainwin.show()
+    timings.mark('show')
     sys.exit(APP.exec())
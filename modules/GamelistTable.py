@@ -3,44 +3,155 @@
 import sys
 import os
 import xml.etree.ElementTree as ElementTree
-import html
-import json
-import csv
 import copy
+import array
+import bisect
+import itertools
+import functools
+import concurrent.futures
 
 from PyQt5 import QtWidgets, QtCore, QtGui
-import xmltodict
 
 from modules.dialogs import *
-
+from modules.core import (build_header, iterparse_gamelist, read_gamelist,
+                          load_gamelist, load_error_message, ENCODED_TAGS)
+from modules.columns import ColumnStore, get_column, get_lowercase
+from modules.trigrams import TrigramIndex, required_literals
+from modules.query import Query, QueryError
+from modules.sorting import (compare_keys, get_directions, get_fallbacks,
+                             get_sort_columns, row_key, significant,
+                             sort_order, upper_bound)
+from modules.wordcounts import WordCounts, WordList
+from modules.genres import GenreIndex, has_genre
+
+
+# Tags not in the trigram index of the filter.  Their long texts would take
+# most of its memory, so they are matched without it.
+UNINDEXED_TAGS = ['desc']
+
+# Roles of a cell that change with its value, given with dataChanged.
+CHANGED_ROLES = [QtCore.Qt.DisplayRole, QtCore.Qt.EditRole,
+                 QtCore.Qt.FontRole, QtCore.Qt.DecorationRole]
 
 class GamelistTableModel(QtCore.QAbstractTableModel):
     """    """
-    def __init__(self, file, tags, progress):
+    def __init__(self, file, tags, progress, background=False, cache=None,
+                 columnar=False):
         super(GamelistTableModel, self).__init__()
+        # columnar keeps data in a ColumnStore instead of a list of rows.
+        self.columnar = columnar
         # data structure from parsed XML file or ElementTree object,
         # header dict with fullset of name:id pairs,
         # file path of parsed XML from filesystem
-        (self.data,
-         self.header,
-         self.unsupptags,
-         self.otherdata,
-         self.folders,
-         self.file) = self.load(file, tags, progress)
-        # original data is the unaltered copy of data, for quick and easy
-        # revert possibility
-        self._original_data = copy.deepcopy(self.data)
+        if background:
+            # Rows are added later in chunks by GamelistLoader.
+            self.header = build_header(tags)
+            self.data = self.new_data()
+            self.unsupptags = []
+            self.otherdata = []
+            self.folders = None
+            self.file = file
+        else:
+            (self.data,
+             self.header,
+             self.unsupptags,
+             self.otherdata,
+             self.folders,
+             self.file) = self.load(file, tags, progress, cache)
+            if columnar:
+                self.data = self.new_data(self.data)
+        # changes holds the unaltered value of each edited cell, for quick
+        # and easy revert possibility, as {row: {column: original value}}.
+        # Use set_value() to edit cells, so they are recorded.
+        self.changes = {}
+        # undo_stack and redo_stack are the journal of edits, recorded as
+        # small deltas instead of copies of the table:
+        #   ('cells', [(row, column, old value, new value), ...])
+        #   ('remove', row, values, unsupptags, changed cells)
+        #   ('add', row, values, unsupptags, None)
+        # Cell edits between begin_group() and end_group() are one entry,
+        # and are signaled with dataChanged at the end.
+        self.undo_stack = []
+        self.redo_stack = []
+        self.group = None
+        # word_counts are the distinct values of the columns used by
+        # completers, as {column: WordCounts}.  They are made on demand by
+        # count_words() and kept up to date with every change of data.
+        self.word_counts = {}
+        # genres are the rows of each genre, see modules.genres, made along
+        # with data and kept up to date with every change of it.
+        self.genre_column = self.header.get('genre')
+        self.genres = GenreIndex()
+        if self.genre_column is not None:
+            self.genres.extend(get_column(self.data, self.genre_column), 0)
         # name of protected headers
         self.locked_columns = []
         # mod_flag_role is used in data as DecorationRole, should be updated
         # later to something like QtGui.QColor('yellow'), None to disable
         self.mod_flag_role = None
 
-    def removeRows(self, position, rows=1, index=QtCore.QModelIndex()):
+    def new_data(self, rows=()):
+        """ Container for rows, as set up for this model. """
+        if self.columnar:
+            encoded = [self.header[tag] for tag in ENCODED_TAGS]
+            return ColumnStore(len(self.header), rows, encoded)
+        return list(rows)
+
+    def append_rows(self, rows, unsupptags):
+        """ Add a chunk of decoded games at the end of table. """
+        position = len(self.data)
+        if not self.data:
+            # Column count changes from zero, so views need a full reset.
+            self.beginResetModel()
+        else:
+            self.beginInsertRows(QtCore.QModelIndex(),
+                                 position, position + len(rows) - 1)
+        self.data.extend(rows)
+        self.unsupptags.extend(unsupptags)
+        for column, counts in self.word_counts.items():
+            counts.extend(row[column] for row in rows)
+        if self.genre_column is not None:
+            self.genres.extend((row[self.genre_column] for row in rows),
+                               position)
+        if len(self.data) == len(rows):
+            self.endResetModel()
+        else:
+            self.endInsertRows()
+
+    def set_loaded(self, folders, otherdata):
+        self.folders = folders
+        self.otherdata = otherdata
+
+    def clear_rows(self):
+        self.beginResetModel()
+        self.data = self.new_data()
+        self.changes = {}
+        self.undo_stack = []
+        self.redo_stack = []
+        self.group = None
+        for counts in self.word_counts.values():
+            counts.clear()
+        self.genres.clear()
+        self.unsupptags = []
+        self.otherdata = []
+        self.folders = None
+        self.file = None
+        self.endResetModel()
+
+    def removeRows(self, position, rows=1, index=QtCore.QModelIndex(),
+                   record=True):
         self.beginRemoveRows(index, position, position + rows - 1)
-        self.data.pop(position)
-        self._original_data.pop(position)
-        self.unsupptags.pop(position)
+        values = self.data.pop(position)
+        self.count_row(values, False)
+        if self.genre_column is not None:
+            self.genres.remove_row(position, values[self.genre_column])
+        changed = self.changes.get(position)
+        self.changes = {(row - 1 if row > position else row): cells
+                        for row, cells in self.changes.items()
+                        if not row == position}
+        unsupptags = self.unsupptags.pop(position)
+        if record:
+            self.record(('remove', position, values, unsupptags, changed))
         self.endRemoveRows()
         #return True
         return position
@@ -48,8 +159,7 @@ class GamelistTableModel(QtCore.QAbstractTableModel):
     def duplicateRows(self, source_row, ignore,
                       position, rows=1, index=QtCore.QModelIndex()):
         self.beginInsertRows(index, position, position + rows - 1)
-        new_row = copy.deepcopy(self.data[source_row])
-        orig_row = copy.deepcopy(new_row)
+        new_row = list(self.data[source_row])
         unsupptags_row = copy.deepcopy(self.unsupptags[source_row])
 
         header_keys = self.header.keys()
@@ -57,11 +167,14 @@ class GamelistTableModel(QtCore.QAbstractTableModel):
             if head in header_keys:
                 head_id = self.header[head]
                 new_row[head_id] = ''
-                orig_row[head_id] = ''
 
         self.data.append(new_row)
-        self._original_data.append(orig_row)
         self.unsupptags.append(unsupptags_row)
+        self.count_row(new_row)
+        if self.genre_column is not None:
+            self.genres.add(len(self.data) - 1, new_row[self.genre_column])
+        self.record(('add', len(self.data) - 1, list(new_row), unsupptags_row,
+                     None))
         self.endInsertRows()
         #return True
         return QtCore.QVariant(len(self.data) - 1)
@@ -72,8 +185,9 @@ class GamelistTableModel(QtCore.QAbstractTableModel):
         for _ in self.header.keys():
             empty_game.append('')
         self.data.append(empty_game)
-        self._original_data.append(empty_game)
-        self.unsupptags.append(empty_game)
+        self.unsupptags.append([])
+        self.count_row(empty_game)
+        self.record(('add', len(self.data) - 1, list(empty_game), [], None))
         self.endInsertRows()
         #return True
         return QtCore.QVariant(len(self.data) - 1)
@@ -82,10 +196,8 @@ class GamelistTableModel(QtCore.QAbstractTableModel):
         return len(self.data)
 
     def columnCount(self, index):
-        try:
-            return len(self.data[0])
-        except IndexError:
-            return 0
+        # Every row has a column for each tag in header.
+        return len(self.header) if len(self.data) else 0
 
     def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
         if (orientation == QtCore.Qt.Horizontal
@@ -97,19 +209,21 @@ class GamelistTableModel(QtCore.QAbstractTableModel):
         and role == QtCore.Qt.DisplayRole):
             return section + 1
 
+    def get_cell(self, row, column):
+        if self.columnar:
+            # Without a RowView, this is called for every cell on sorting.
+            return self.data.columns[column][row]
+        return self.data[row][column]
+
     def data(self, index, role):
         if role == QtCore.Qt.DisplayRole:
-            row = self.data[index.row()]
-            return row[index.column()]
+            return self.get_cell(index.row(), index.column())
 
         if role == QtCore.Qt.EditRole:
-            row = self.data[index.row()]
-            return row[index.column()]
+            return self.get_cell(index.row(), index.column())
 
         if role == QtCore.Qt.FontRole:
-            row = index.row()
-            column = index.column()
-            if not self.data[row][column] == self._original_data[row][column]:
+            if self.is_edited_cell(index.row(), index.column()):
                 font = QtGui.QFont()
                 font.setItalic(True)
                 return font
@@ -118,36 +232,178 @@ class GamelistTableModel(QtCore.QAbstractTableModel):
 
         if role == QtCore.Qt.DecorationRole:
             if self.mod_flag_role:
-                row = index.row()
-                column = index.column()
-                if not self.data[row][column] == self._original_data[row][column]:
+                if self.is_edited_cell(index.row(), index.column()):
                     return self.mod_flag_role
                 else:
                     return None
 
     def setData(self, index, value, role):
         if role == QtCore.Qt.EditRole:
-            row = index.row()
-            column = index.column()
-            self.data[row][column] = value
+            self.set_value(index.row(), index.column(), value)
             return True
 
         if role == QtCore.Qt.DecorationRole:
-            row = index.row()
-            column = index.column()
-            if self.data[row][column] == self._original_data[row][column]:
+            if self.is_edited_cell(index.row(), index.column()):
+                return QtGui.QColor('red')
+            else:
                 return QtGui.QColor('black')
+
+    def set_value(self, row, column, value, record=True):
+        """ Change a cell and keep its original value in changes, as long
+            as it differs.  The edit is added to the journal for undo, if
+            record is True.
+        """
+        current = self.get_cell(row, column)
+        if value == current:
+            return
+        if record:
+            if self.group is None:
+                self.record(('cells', [(row, column, current, value)]))
             else:
-                return QtGui.QColor('red')
+                self.group.append((row, column, current, value))
+        cells = self.changes.get(row)
+        if cells is not None and column in cells:
+            if value == cells[column]:
+                del cells[column]
+                if not cells:
+                    del self.changes[row]
+        else:
+            self.changes.setdefault(row, {})[column] = current
+        if self.columnar:
+            self.data[row][column] = value
+        else:
+            # The row is replaced instead of changed, for snapshot().
+            values = list(self.data[row])
+            values[column] = value
+            self.data[row] = values
+        counts = self.word_counts.get(column)
+        if counts is not None:
+            counts.discard(current)
+            counts.add(value)
+        if column == self.genre_column:
+            self.genres.discard(row, current)
+            self.genres.add(row, value)
+        if self.group is None:
+            index = self.index(row, column)
+            self.dataChanged.emit(index, index, CHANGED_ROLES)
+
+    def insert_row(self, position, values, unsupptags, changed=None):
+        """ Put back a row at position, with its original values in
+            changed.  Not recorded in the journal.
+        """
+        self.beginInsertRows(QtCore.QModelIndex(), position, position)
+        self.data.insert(position, list(values))
+        self.unsupptags.insert(position, unsupptags)
+        self.count_row(values)
+        if self.genre_column is not None:
+            self.genres.insert_row(position, values[self.genre_column])
+        self.changes = {(row + 1 if row >= position else row): cells
+                        for row, cells in self.changes.items()}
+        if changed:
+            self.changes[position] = dict(changed)
+        self.endInsertRows()
+
+    def snapshot(self):
+        """ Data as it is now, which later changes of data leave alone, to
+            be read in another thread.
+        """
+        if self.columnar:
+            return self.data.snapshot()
+        # Rows are never changed in place, so their list is enough.
+        return list(self.data)
+
+    def count_words(self, column):
+        """ WordCounts of column, kept up to date from now on. """
+        counts = self.word_counts.get(column)
+        if counts is None:
+            counts = WordCounts(get_column(self.data, column))
+            self.word_counts[column] = counts
+        return counts
+
+    def count_row(self, values, add=True):
+        """ Add the cells of a row to word_counts, or remove them. """
+        for column, counts in self.word_counts.items():
+            if add:
+                counts.add(values[column])
+            else:
+                counts.discard(values[column])
+
+    def record(self, entry):
+        """ Add entry to the journal.  A new edit ends any redo. """
+        self.undo_stack.append(entry)
+        self.redo_stack.clear()
+
+    def begin_group(self):
+        """ Record following cell edits as a single undo step. """
+        self.group = []
+
+    def end_group(self):
+        group, self.group = self.group, None
+        if group:
+            self.record(('cells', group))
+        # One signal for the changed range of each row.
+        columns = {}
+        for row, column, _, _ in group:
+            columns.setdefault(row, []).append(column)
+        for row, changed in columns.items():
+            self.dataChanged.emit(self.index(row, min(changed)),
+                                  self.index(row, max(changed)),
+                                  CHANGED_ROLES)
+
+    def replay(self, entry, undo):
+        """ Revert the edit of a journal entry, or do it again. """
+        kind, *args = entry
+        if kind == 'cells':
+            cells = reversed(args[0]) if undo else args[0]
+            for row, column, old, new in cells:
+                self.set_value(row, column, old if undo else new, False)
+        elif (kind == 'remove') == undo:
+            self.insert_row(*args)
+        else:
+            self.removeRows(args[0], record=False)
+
+    def undo(self):
+        """ Revert the last edit.  Returns False if there is none. """
+        if not self.undo_stack:
+            return False
+        entry = self.undo_stack.pop()
+        self.replay(entry, True)
+        self.redo_stack.append(entry)
+        return True
+
+    def redo(self):
+        """ Do the last undone edit again.  Returns False if there is
+            none.
+        """
+        if not self.redo_stack:
+            return False
+        entry = self.redo_stack.pop()
+        self.replay(entry, False)
+        self.undo_stack.append(entry)
+        return True
+
+    def original_value(self, row, column):
+        cells = self.changes.get(row)
+        if cells is not None and column in cells:
+            return cells[column]
+        return self.get_cell(row, column)
+
+    def original_row(self, row):
+        """ Copy of row as it was before any edit. """
+        original = list(self.data[row])
+        for column, value in self.changes.get(row, {}).items():
+            original[column] = value
+        return original
 
     def is_edited(self):
-        return not self.data == self._original_data
+        return bool(self.changes)
 
     def is_edited_row(self, index):
-        return not self.data[index] == self._original_data[index]
+        return index in self.changes
 
     def is_edited_cell(self, index, hindex):
-        return not self.data[index][hindex] == self._original_data[index][hindex]
+        cells = self.changes.get(index)
+        return cells is not None and hindex in cells
 
     def append_locked_columns(self, head):
         if not head in self.locked_columns:
@@ -168,102 +424,942 @@ class GamelistTableModel(QtCore.QAbstractTableModel):
     def load(self,
              xml,
              tags,
-             progress):
+             progress,
+             cache=None):
 
         data = []
         unsupptags = []
-        header_list = [
-            'name', 'sortname', 'desc',
-            'developer', 'publisher', 'releasedate', 'players',
-            'path', 'thumbnail', 'image', 'marquee', 'video',
-            'genre', 'rating',
-            'favorite', 'hidden', 'kidgame',
-            'lastplayed', 'playcount',
-            'id', 'source'
-        ]
-        if tags:
-            new_order = []
-            # Validate user tag.
-            for tag in tags:
-                if (tag in header_list
-                and tag not in new_order):
-                    new_order.append(tag)
-            # Remove from default list, so user list can appear in front.
-            for tag in new_order:
-                if tag in header_list:
-                    header_list.remove(tag)
-            header_list = new_order + header_list
-        header = {key: val for val, key in enumerate(header_list)}
+        header = build_header(tags)
         folders = None
         otherdata = []
 
-        # Path file to open
+        # Path file to open, is streamed instead of parsed as a whole tree.
         if (isinstance(xml, os.PathLike)
         or os.path.exists(xml)):  # and xml.exists():
+            file = xml
             try:
-                file = xml
-                xml = ElementTree.parse(xml).getroot()
-            except FileNotFoundError as error:
-                msg = f'Error! Could not find file: {str(file)}'
-                msg_show_error(msg, 'Critical')
-                xml = file = None
-            except IsADirectoryError as error:
-                msg = f'Error! Path is a directory: {str(file)}'
-                msg_show_error(msg, 'Critical')
-                xml = file = None
-            except ElementTree.ParseError as error:
-                msg = ('Error! Could not parse gamelist XML file '
-                       f'{str(error.position)}: {str(file)}')
-                msg_show_error(msg, 'Critical')
-                xml = file = None
+                (data,
+                 unsupptags,
+                 folders,
+                 otherdata) = load_gamelist(file, header, progress, cache)
+            except (OSError, ElementTree.ParseError) as error:
+                msg_show_error(load_error_message(error, file), 'Critical')
+                file = None
+        # Continue loading data if its a XML root element
+        elif isinstance(xml, ElementTree.Element):
+            file = None
+            folders = []
+            for rows, unsupp in read_gamelist(xml.iterfind('*'),
+                                              header,
+                                              folders,
+                                              otherdata):
+                data.extend(rows)
+                unsupptags.extend(unsupp)
         else:
             file = None
-        # Continue loading data if its a XML root element
-        if isinstance(xml, ElementTree.Element):
-            for tag in xml.iterfind('*'):
-                if (not tag.tag == 'game'
-                and not tag.tag == 'folder'):
-                    otherdata.append(tag)
-            folders = xml.findall('folder')
-            all_games = xml.findall('game')
-            progress.setRange(0, len(all_games))
-            for count, game in enumerate(all_games, 1):
-                game_data = {key: '' for key in header.keys()}
-                game_data['id'] = html.unescape(game.get('id', ''))
-                game_data['source'] = html.unescape(game.get('source', ''))
-                unsupp = []
-                for tagname in game.iter():
-                    if not tagname.tag == 'game':
-                        text = game.find(tagname.tag)
-                        if text is None:
-                            game_data[tagname.tag] = ''
-                        elif tagname.tag not in header_list:
-                            unsupp.append(text)
-                        else:
-                            text = text.text
-                            if text is not None:
-                                text = html.unescape(text)
-                            game_data[tagname.tag] = text
-                data.append(list(game_data.values()))
-                unsupptags.append(unsupp)
-                progress.setValue(count)
         return data, header, unsupptags, otherdata, folders, file
 
+
+class GamelistLoader(QtCore.QObject):
+    """ Reads a gamelist file in a background thread.  Decoded games are
+        handed over in chunks with chunkLoaded, so the table can be used
+        before the import is complete.  Only one of loaded, failed or
+        cancelled is emitted at the end.
+    """
+    chunkLoaded = QtCore.pyqtSignal(list, list)
+    loaded = QtCore.pyqtSignal(list, list)
+    failed = QtCore.pyqtSignal(str)
+    cancelled = QtCore.pyqtSignal()
+    progressRange = QtCore.pyqtSignal(int, int)
+    progressValue = QtCore.pyqtSignal(int)
+
+    def __init__(self, file, header, cache=None, chunk_size=1000):
+        super(GamelistLoader, self).__init__()
+        self.file = file
+        self.header = header
+        self.cache = cache
+        self.chunk_size = chunk_size
+        self.is_cancelled = False
+        self._progress_step = 1
+        self._progress_last = 0
+
+    def cancel(self):
+        self.is_cancelled = True
+
+    # Same interface as QProgressBar, used by iterparse_gamelist().  Values
+    # are only forwarded on every full percent, to keep the event queue of
+    # the GUI thread free.
+    def setRange(self, minimum, maximum):
+        self._progress_step = max(1, (maximum - minimum) // 100)
+        self.progressRange.emit(minimum, maximum)
+
+    def setValue(self, value):
+        if value - self._progress_last >= self._progress_step:
+            self._progress_last = value
+            self.progressValue.emit(value)
+
+    def run(self):
+        cached = self.cache.load(self.file, self.header) if self.cache else None
+        if cached:
+            self.run_cached(*cached)
+            return
+        identity = self.cache.identify(self.file) if self.cache else None
+        folders = []
+        otherdata = []
+        # Rows are edited in the GUI thread as soon as they are handed over,
+        # so the cache gets its own copy of the unaltered rows.
+        cache_data = []
+        cache_unsupptags = []
+        elements = iterparse_gamelist(self.file, self)
+        try:
+            for rows, unsupptags in read_gamelist(elements,
+                                                  self.header,
+                                                  folders,
+                                                  otherdata,
+                                                  self.chunk_size):
+                if self.is_cancelled:
+                    break
+                if self.cache:
+                    cache_data.extend([list(row) for row in rows])
+                    cache_unsupptags.extend(unsupptags)
+                self.chunkLoaded.emit(rows, unsupptags)
+        except (OSError, ElementTree.ParseError) as error:
+            self.failed.emit(load_error_message(error, self.file))
+        else:
+            if self.is_cancelled:
+                self.cancelled.emit()
+            else:
+                self.loaded.emit(folders, otherdata)
+                if self.cache:
+                    self.cache.store(self.file, self.header,
+                                     cache_data, cache_unsupptags,
+                                     folders, otherdata, identity)
+        finally:
+            elements.close()
+
+    def run_cached(self, data, unsupptags, folders, otherdata):
+        self.setRange(0, len(data))
+        for start in range(0, len(data), self.chunk_size):
+            if self.is_cancelled:
+                self.cancelled.emit()
+                return
+            end = start + self.chunk_size
+            self.chunkLoaded.emit(data[start:end], unsupptags[start:end])
+            self.setValue(end)
+        self.loaded.emit(folders, otherdata)
+
+
+class ProxyJob():
+    """ Filter or sort of GamelistFilterProxy, computed by function in a
+        worker thread.  function is called with job=self and gives up, once
+        cancelled is set by a newer job of the same kind.  args have all
+        it reads, taken when the job is made, so it never sees the changes
+        made meanwhile.  dirty collects the rows edited in columns in the
+        meantime (in any column if None), which are done again when the
+        result is applied.
+    """
+    def __init__(self, kind, function, *args, columns=None):
+        self.kind = kind
+        self.function = function
+        self.args = args
+        self.columns = columns
+        self.cancelled = False
+        self.dirty = set()
+        self.future = None
+
+    def run(self):
+        return self.function(*self.args, job=self)
+
+
+class ProxyFilter():
+    """ Filter of GamelistFilterProxy.  match is called with the text of a
+        cell and returns True to show its row, None shows all rows.  With
+        folded it gets the text in lowercase.  column is the column index
+        to match, or -1 for any column.  literals are strings every
+        matching cell contains, used to look up rows in the index.  query
+        is a modules.query.Query matched against whole rows instead of
+        match, None if not in use.
+    """
+    def __init__(self, match=None, column=-1, literals=(), folded=False,
+                 query=None):
+        self.match = match
+        self.column = column
+        self.literals = list(literals)
+        self.folded = folded
+        self.query = query
+
+    def is_active(self):
+        return self.match is not None or self.query is not None
+
+    def get_columns(self, count):
+        """ Columns to match, of count columns. """
+        if self.column < 0:
+            return range(count)
+        return [self.column]
+
+
+class FilterSnapshot():
+    """ All a filter job reads, taken from GamelistFilterProxy when it is
+        made: the filter, a snapshot of the data of the model and the
+        lowercase cache and index of each column to match, as they are.
+    """
+    def __init__(self, proxy, filter, data=None):
+        self.filter = filter
+        self.data = proxy.model.snapshot() if data is None else data
+        columns = filter.get_columns(len(proxy.indexes))
+        self.indexes = {column: proxy.indexes[column].view()
+                        for column in columns}
+        # lowercase are the lists of the proxy, which are copied before
+        # their first rows are changed, with the number of rows done.
+        self.lowercase = {}
+        if filter.folded:
+            for column in columns:
+                proxy.shared_lowercase.add(column)
+                lowercase = proxy.lowercase[column]
+                self.lowercase[column] = (lowercase, len(lowercase))
+
+    def cell_text(self, row, column):
+        """ Text of a cell as given to match. """
+        if self.filter.folded:
+            lowercase, done = self.lowercase[column]
+            if row < done:
+                return lowercase[row]
+            return get_lowercase(self.data[row][column])
+        return self.data[row][column] or ''
+
+    def column_text(self, column):
+        """ Text of all cells in column as given to match. """
+        if self.filter.folded:
+            lowercase, done = self.lowercase[column]
+            rest = get_column(self.data, column, done)
+            return itertools.chain(itertools.islice(lowercase, done),
+                                   map(get_lowercase, rest))
+        return (value or '' for value in get_column(self.data, column))
+
+
+class GamelistFilterProxy(QtCore.QAbstractProxyModel):
+    """ Sort and filter proxy for GamelistTableModel, which keeps its own
+        mapping of rows and computes it in Python instead of calling data()
+        for every cell.  Rows for the filter are looked up in a TrigramIndex
+        of each column but desc, and matched against a cached lowercase copy
+        of the column if case does not matter.  Both are built in small steps
+        while the application is idle, rows not done yet are read from the
+        model.
+
+        New filters and sort orders are computed by jobs in a worker thread,
+        on a snapshot of the data as it is.  The result is shown right away
+        if it is done within job_wait seconds, else when it arrives, and the
+        rows shown stay usable in the meantime.  Edited, added and removed
+        rows are updated in place, like QSortFilterProxyModel does.
+    """
+    # Emitted when a job finished in the background is shown.
+    applied = QtCore.pyqtSignal()
+    # Emitted from the worker thread with a finished ProxyJob.
+    jobDone = QtCore.pyqtSignal(object)
+
+    def __init__(self, index_step=250, job_wait=0.05):
+        super(GamelistFilterProxy, self).__init__()
+        self.model = None
+        # filter is the ProxyFilter in effect, a new one is pending in the
+        # filter job until its result is shown.
+        self.filter = ProxyFilter()
+        # accepted has a byte for each row of the model, 1 if it is shown by
+        # filter, or is None if all rows are shown.
+        self.accepted = None
+        # sort_specs are the significant (column, descending) pairs sorted
+        # by, as in modules.sorting, with keys made of the cells in
+        # sort_columns and compared in directions.  Empty cells of the
+        # columns in fallbacks are sorted by another column.
+        self.sort_specs = []
+        self.sort_columns = set()
+        self.directions = []
+        self.fallbacks = {}
+        # order has all rows of the model, sorted by sort_specs with the
+        # sort key of each in keys, or in model order if there are none.
+        # rows are the rows of order shown, as the rows of the proxy, and
+        # positions has the proxy row of each row of the model or -1.
+        self.order = []
+        self.keys = None
+        self.rows = []
+        self.positions = array.array('i')
+        # jobs are the pending ProxyJob by kind, 'filter' or 'sort'.
+        self.jobs = {}
+        self.job_wait = job_wait
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        self.jobDone.connect(self.job_done)
+        # indexes and lowercase are per column, for the first rows.  The
+        # columns in shared_lowercase are read by a job, so their list is
+        # replaced by a copy before any row done is changed, and is only
+        # added to at the end meanwhile.  The columns in unindexed, those of
+        # UNINDEXED_TAGS, are left out of their index.
+        self.indexes = []
+        self.unindexed = set()
+        self.lowercase = []
+        self.shared_lowercase = set()
+        # pool shares equal lowercase strings while lowercase is built.
+        self.pool = {}
+        self.index_step = index_step
+        self.index_timer = QtCore.QTimer(self)
+        self.index_timer.setInterval(0)
+        self.index_timer.timeout.connect(
+            self.index_timer_timeout)
+
+    def setSourceModel(self, model):
+        self.model = model
+        self.fallbacks = get_fallbacks(model.header)
+        self.indexes = [TrigramIndex() for _ in model.header]
+        self.unindexed = {model.header[tag] for tag in UNINDEXED_TAGS
+                          if tag in model.header}
+        self.lowercase = [[] for _ in model.header]
+        self.order = list(range(len(model.data)))
+        self.show_rows()
+        model.dataChanged.connect(
+            self.source_dataChanged)
+        model.rowsAboutToBeRemoved.connect(
+            self.source_rowsAboutToBeRemoved)
+        model.rowsInserted.connect(
+            self.source_rowsInserted)
+        model.rowsRemoved.connect(
+            self.source_rowsRemoved)
+        model.modelAboutToBeReset.connect(
+            self.beginResetModel)
+        model.modelReset.connect(
+            self.source_modelReset)
+        super(GamelistFilterProxy, self).setSourceModel(model)
+        self.index_timer.start()
+
+    def index(self, row, column, parent=QtCore.QModelIndex()):
+        if (parent.isValid()
+        or not 0 <= row < len(self.rows)
+        or not 0 <= column < self.columnCount()):
+            return QtCore.QModelIndex()
+        return self.createIndex(row, column)
+
+    def parent(self, index=None):
+        if index is None:
+            return super(GamelistFilterProxy, self).parent()
+        return QtCore.QModelIndex()
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        if parent.isValid() or self.model is None:
+            return 0
+        return self.model.columnCount(QtCore.QModelIndex())
+
+    def mapToSource(self, index):
+        if not index.isValid():
+            return QtCore.QModelIndex()
+        return self.model.index(self.rows[index.row()], index.column())
+
+    def mapFromSource(self, index):
+        row = index.row()
+        if not index.isValid() or row >= len(self.positions):
+            return QtCore.QModelIndex()
+        position = self.positions[row]
+        if position < 0:
+            return QtCore.QModelIndex()
+        return self.createIndex(position, index.column())
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        if orientation == QtCore.Qt.Vertical:
+            # Number of the row in the model, which get_data_index() reads.
+            if not 0 <= section < len(self.rows):
+                return None
+            section = self.rows[section]
+        return self.model.headerData(section, orientation, role)
+
+    def show_rows(self):
+        """ Take the rows of order accepted by the filter as rows of the
+            proxy.  Call between begin_layout() and end_layout(), if the
+            proxy is in use.
+        """
+        accepted = self.accepted
+        if accepted is None:
+            self.rows = list(self.order)
+        elif not self.sort_specs:
+            self.rows = list(itertools.compress(self.order, accepted))
+        else:
+            self.rows = [row for row in self.order if accepted[row]]
+        self.positions = array.array('i', [-1]) * len(self.order)
+        self.number_rows()
+
+    def number_rows(self, start=0):
+        """ Update positions for the proxy rows from start on. """
+        positions = self.positions
+        rows = itertools.islice(self.rows, start, None)
+        for position, row in enumerate(rows, start):
+            positions[row] = position
+
+    def begin_layout(self):
+        """ Announce a change of the rows shown.  Returns the rows in the
+            model of the persistent indexes, for end_layout().
+        """
+        self.layoutAboutToBeChanged.emit()
+        persistent = self.persistentIndexList()
+        return persistent, [(self.rows[index.row()], index.column())
+                            for index in persistent]
+
+    def end_layout(self, saved):
+        persistent, cells = saved
+        indexes = []
+        for row, column in cells:
+            position = self.positions[row] if row < len(self.positions) else -1
+            if position < 0:
+                indexes.append(QtCore.QModelIndex())
+            else:
+                indexes.append(self.index(position, column))
+        self.changePersistentIndexList(persistent, indexes)
+        self.layoutChanged.emit()
+
+    def place_rows(self, rows):
+        """ Put rows into order at the position of their sort key, after the
+            rows with an equal key.  Rows already in order are moved.
+        """
+        if not self.sort_specs:
+            self.order = list(range(len(self.model.data)))
+            return
+        rows = set(rows)
+        order, keys = self.order, self.keys
+        # order and rows together have all rows of the model.
+        present = len(order) + len(rows) - len(self.model.data)
+        if present > 16:
+            kept = [position for position, row in enumerate(order)
+                    if row not in rows]
+            order = [order[position] for position in kept]
+            keys = [keys[position] for position in kept]
+        elif present:
+            for row in rows:
+                if row < len(order):
+                    position = order.index(row)
+                    del order[position]
+                    del keys[position]
+        data = self.model.data
+        new_keys = {row: row_key(data[row], self.sort_specs, self.fallbacks)
+                    for row in rows}
+        compare = functools.cmp_to_key(
+            lambda row, other: compare_keys(new_keys[row], new_keys[other],
+                                            self.directions))
+        rows = sorted(rows)
+        rows.sort(key=compare)
+        merged_order, merged_keys = [], []
+        start = 0
+        for row in rows:
+            key = new_keys[row]
+            end = upper_bound(keys, key, self.directions)
+            merged_order.extend(order[start:end])
+            merged_keys.extend(keys[start:end])
+            merged_order.append(row)
+            merged_keys.append(key)
+            start = end
+        merged_order.extend(order[start:])
+        merged_keys.extend(keys[start:])
+        self.order, self.keys = merged_order, merged_keys
+
+    def source_dataChanged(self, top_left, bottom_right, roles=[]):
+        model = self.model
+        rows = range(top_left.row(), bottom_right.row() + 1)
+        columns = range(top_left.column(), bottom_right.column() + 1)
+        for column in columns:
+            index = self.indexes[column]
+            lowercase = self.lowercase[column]
+            if rows[0] < len(lowercase):
+                lowercase = self.own_lowercase(column)
+            for row in rows:
+                value = model.get_cell(row, column)
+                if row < index.length and not index.edit(row, value):
+                    # Too many rows were edited, so it is built anew.
+                    self.index_timer.start()
+                if row < len(lowercase):
+                    lowercase[row] = get_lowercase(value)
+        for job in self.jobs.values():
+            if job.columns is None or job.columns.intersection(columns):
+                job.dirty.update(rows)
+        if self.accepted is not None:
+            for row in rows:
+                self.accepted[row] = self.match_row(row)
+
+        if self.sort_columns.intersection(columns):
+            # Sorted again by the changed key, with a new layout like
+            # QSortFilterProxyModel does.
+            saved = self.begin_layout()
+            self.place_rows(rows)
+            self.show_rows()
+            self.end_layout(saved)
+        else:
+            for row in rows:
+                self.update_row(row)
+        for row in rows:
+            position = self.positions[row]
+            if position >= 0:
+                self.dataChanged.emit(self.index(position, columns[0]),
+                                      self.index(position, columns[-1]),
+                                      roles)
+
+    def update_row(self, row):
+        """ Show or hide row after an edit, as the filter accepts it. """
+        position = self.positions[row]
+        shown = self.accepted is None or self.accepted[row]
+        if position >= 0 and not shown:
+            self.beginRemoveRows(QtCore.QModelIndex(), position, position)
+            del self.rows[position]
+            self.positions[row] = -1
+            self.number_rows(position)
+            self.endRemoveRows()
+        elif position < 0 and shown:
+            position = self.find_position(row)
+            self.beginInsertRows(QtCore.QModelIndex(), position, position)
+            self.rows.insert(position, row)
+            self.number_rows(position)
+            self.endInsertRows()
+
+    def find_position(self, row):
+        """ Proxy row where row of order goes, if it is shown. """
+        if not self.sort_specs:
+            return bisect.bisect_left(self.rows, row)
+        following = itertools.islice(self.order,
+                                     self.order.index(row) + 1, None)
+        for other in following:
+            position = self.positions[other]
+            if position >= 0:
+                return position
+        return len(self.rows)
+
+    def source_rowsInserted(self, parent, first, last):
+        model = self.model
+        for column, index in enumerate(self.indexes):
+            # Rows in front of the end shift the rows already indexed.
+            if first < index.length:
+                index.clear()
+            if first < len(self.lowercase[column]):
+                lowercase = self.own_lowercase(column)
+                values = get_column(model.data, column, first, last + 1)
+                lowercase[first:first] = map(get_lowercase, values)
+        if self.accepted is not None:
+            self.accepted[first:first] = bytes(
+                self.match_row(row) for row in range(first, last + 1))
+        self.index_timer.start()
+
+        count = last - first + 1
+        new = range(first, last + 1)
+        if first < len(self.positions):
+            self.order = [row + count if row >= first else row
+                          for row in self.order]
+            self.rows = [row + count if row >= first else row
+                         for row in self.rows]
+            self.positions[first:first] = array.array('i', [-1]) * count
+        else:
+            self.positions.extend(array.array('i', [-1]) * count)
+        if self.sort_specs and count > 1:
+            saved = self.begin_layout()
+            self.place_rows(new)
+            self.show_rows()
+            self.end_layout(saved)
+        else:
+            self.place_rows(new)
+            shown = [row for row in new
+                     if self.accepted is None or self.accepted[row]]
+            if shown:
+                position = self.find_position(first)
+                self.beginInsertRows(QtCore.QModelIndex(), position,
+                                     position + len(shown) - 1)
+                self.rows[position:position] = shown
+                self.number_rows(position)
+                self.endInsertRows()
+        if first < len(self.positions) - count:
+            # Rows behind were shifted, so pending results do not fit.
+            self.restart_jobs()
+
+    def source_rowsAboutToBeRemoved(self, parent, first, last):
+        # The rows are still in the model, while views see them removed.
+        removed = sorted(position for position
+                         in self.positions[first:last + 1] if position >= 0)
+        if not removed:
+            return
+        if removed[-1] - removed[0] + 1 == len(removed):
+            self.beginRemoveRows(QtCore.QModelIndex(),
+                                 removed[0], removed[-1])
+            del self.rows[removed[0]:removed[-1] + 1]
+            for row in range(first, last + 1):
+                self.positions[row] = -1
+            self.number_rows(removed[0])
+            self.endRemoveRows()
+        else:
+            saved = self.begin_layout()
+            self.rows = [row for row in self.rows
+                         if not first <= row <= last]
+            for row in range(first, last + 1):
+                self.positions[row] = -1
+            self.number_rows()
+            self.end_layout(saved)
+
+    def source_rowsRemoved(self, parent, first, last):
+        for index in self.indexes:
+            if first < index.length:
+                index.clear()
+        for column, lowercase in enumerate(self.lowercase):
+            if first < len(lowercase):
+                del self.own_lowercase(column)[first:last + 1]
+        if self.accepted is not None:
+            del self.accepted[first:last + 1]
+        self.index_timer.start()
+
+        count = last - first + 1
+        if self.keys is not None:
+            self.keys = [key for key, row in zip(self.keys, self.order)
+                         if not first <= row <= last]
+        self.order = [row - count if row > last else row
+                      for row in self.order if not first <= row <= last]
+        self.rows = [row - count if row > last else row
+                     for row in self.rows]
+        del self.positions[first:last + 1]
+        self.restart_jobs()
+
+    def source_modelReset(self):
+        for index in self.indexes:
+            index.clear()
+        self.lowercase = [[] for _ in self.lowercase]
+        self.shared_lowercase.clear()
+        # Few rows are left or loaded at first, so pending jobs are done
+        # right here.
+        filter = self.get_filter()
+        specs = self.get_sort_specs()
+        self.cancel_jobs()
+        self.filter = filter
+        if filter.is_active():
+            self.accepted = self.find_rows(FilterSnapshot(self, filter))
+        else:
+            self.accepted = None
+        self.set_order(self.sort_rows(specs))
+        self.show_rows()
+        self.endResetModel()
+
+    def index_timer_timeout(self):
+        """ Index the next rows of each column, until all are done. """
+        data = self.model.data
+        done = True
+        for column, index in enumerate(self.indexes):
+            if index.length < len(data) and column not in self.unindexed:
+                end = index.length + self.index_step
+                index.extend(get_column(data, column, index.length, end))
+                done = False
+            lowercase = self.lowercase[column]
+            if len(lowercase) < len(data):
+                end = len(lowercase) + self.index_step
+                values = get_column(data, column, len(lowercase), end)
+                lowercase.extend(get_lowercase(value, self.pool)
+                                 for value in values)
+                done = False
+        if done:
+            self.index_timer.stop()
+            self.pool = {}
+
+    def start_job(self, job, wait=True):
+        """ Run job in the worker thread in place of any job of its kind.
+            With wait its result is applied right away, if it is done
+            within job_wait seconds.
+        """
+        self.cancel_job(job.kind)
+        self.jobs[job.kind] = job
+        job.future = self.executor.submit(job.run)
+        if wait:
+            concurrent.futures.wait([job.future], self.job_wait)
+        if job.future.done():
+            self.finish_job(job)
+        else:
+            job.future.add_done_callback(
+                lambda future: self.emit_job_done(job))
+
+    def emit_job_done(self, job):
+        try:
+            self.jobDone.emit(job)
+        except RuntimeError:
+            # Proxy is deleted already.
+            pass
+
+    def job_done(self, job):
+        if self.finish_job(job):
+            self.applied.emit()
+
+    def finish_job(self, job):
+        """ Apply the result of job, unless it was replaced.  Returns True
+            if it was applied.
+        """
+        if self.jobs.get(job.kind) is not job:
+            return False
+        del self.jobs[job.kind]
+        result = job.future.result()
+        if job.kind == 'filter':
+            self.apply_filter(result, job.args[0].filter, job.dirty)
+        else:
+            self.apply_sort(result, job.dirty)
+        return True
+
+    def cancel_job(self, kind):
+        job = self.jobs.pop(kind, None)
+        if job is not None:
+            job.cancelled = True
+            job.future.cancel()
+
+    def cancel_jobs(self):
+        """ Cancel all pending jobs, leaving the rows shown as they are. """
+        for kind in list(self.jobs):
+            self.cancel_job(kind)
+
+    def restart_jobs(self):
+        """ Start pending jobs again with the rows as they are now, after
+            rows were added or removed.
+        """
+        if not self.jobs:
+            return
+        data = self.model.snapshot()
+        job = self.jobs.get('filter')
+        if job is not None:
+            snapshot = FilterSnapshot(self, job.args[0].filter, data)
+            self.start_job(ProxyJob('filter', self.find_rows, snapshot),
+                           False)
+        job = self.jobs.get('sort')
+        if job is not None:
+            self.start_job(ProxyJob('sort', self.sort_rows, job.args[0], data,
+                                    columns=job.columns), False)
+
+    def finish_jobs(self):
+        """ Wait for all pending jobs and apply their results. """
+        for job in list(self.jobs.values()):
+            concurrent.futures.wait([job.future])
+            self.finish_job(job)
+
+    def set_filter(self, match, column=-1, literals=(), folded=False,
+                   narrow=False, rows=None):
+        """ Show only rows with a cell for which match returns True.  With
+            narrow, match is known to reject all rows hidden by the current
+            filter, so only the rows shown are matched again.  rows, if
+            given, are all rows matching already, so none is matched.
+        """
+        within = None
+        if (narrow and self.filter.match is not None
+        and self.accepted is not None and 'filter' not in self.jobs):
+            within = bytes(self.accepted)
+        filter = ProxyFilter(match, column, literals, folded)
+        if match is None:
+            self.cancel_job('filter')
+            self.apply_filter(None, filter)
+        elif rows is not None:
+            self.cancel_job('filter')
+            accepted = bytearray(len(self.model.data))
+            for row in rows:
+                accepted[row] = 1
+            self.apply_filter(accepted, filter)
+        else:
+            self.start_job(ProxyJob('filter', self.find_rows,
+                                    FilterSnapshot(self, filter), within))
+
+    def set_query(self, query):
+        """ Show only rows matching the modules.query.Query query. """
+        filter = ProxyFilter(query=query)
+        self.start_job(ProxyJob('filter', self.find_rows,
+                                FilterSnapshot(self, filter)))
+
+    def get_filter(self):
+        """ Filter in effect, or the one pending. """
+        job = self.jobs.get('filter')
+        return job.args[0].filter if job else self.filter
+
+    def is_filtered(self):
+        return self.get_filter().is_active()
+
+    def apply_filter(self, accepted, filter, dirty=()):
+        """ Show the rows in accepted, the result of find_rows() with filter
+            for fewer or the same rows.  Rows in dirty are matched again.
+        """
+        self.filter = filter
+        if accepted is not None:
+            count = len(self.model.data)
+            dirty = set(dirty)
+            dirty.update(range(len(accepted), count))
+            accepted.extend(bytes(count - len(accepted)))
+            for row in dirty:
+                accepted[row] = self.match_row(row)
+        saved = self.begin_layout()
+        self.accepted = accepted
+        self.show_rows()
+        self.end_layout(saved)
+
+    def sort(self, column, order=QtCore.Qt.AscendingOrder):
+        """ Sort by column as well, which becomes the primary key and
+            leaves the current order for rows with an equal key.  Column -1
+            restores the order of the model.
+        """
+        descending = order == QtCore.Qt.DescendingOrder
+        self.sort_by(self.get_sort_specs() + [(column, descending)])
+
+    def sort_by(self, specs):
+        """ Sort by all (column, descending) pairs of specs in one job, the
+            last one is the primary key and former ones break ties.
+        """
+        specs = significant(specs)
+        if specs == self.get_sort_specs():
+            return
+        if not specs:
+            self.cancel_job('sort')
+            self.apply_sort(self.sort_rows(specs))
+            return
+        job = self.jobs.get('sort')
+        new = ProxyJob('sort', self.sort_rows, specs, self.model.snapshot(),
+                       columns=get_sort_columns(specs, self.fallbacks))
+        if job:
+            new.dirty = job.dirty
+        self.start_job(new)
+
+    def get_sort_specs(self):
+        """ Sort in effect, or the one pending. """
+        job = self.jobs.get('sort')
+        return job.args[0] if job else self.sort_specs
+
+    def sort_rows(self, specs, data=None, job=None):
+        """ All rows of data, the data of the model if None, sorted by
+            specs, specs and the sort key of each row in this order, or
+            None if job is cancelled.
+        """
+        if data is None:
+            data = self.model.data
+        if not specs:
+            return list(range(len(data))), specs, None
+        order, keys = sort_order(data, specs, self.fallbacks)
+        if job is not None and job.cancelled:
+            return None
+        return order, specs, [keys[row] for row in order]
+
+    def apply_sort(self, result, dirty=()):
+        """ Show rows in the order of result from sort_rows(), for fewer or
+            the same rows.  Rows in dirty and new rows are sorted in.
+        """
+        saved = self.begin_layout()
+        self.set_order(result, dirty)
+        self.show_rows()
+        self.end_layout(saved)
+
+    def set_order(self, result, dirty=()):
+        order, specs, keys = result
+        self.sort_specs = specs
+        self.sort_columns = get_sort_columns(specs, self.fallbacks)
+        self.directions = get_directions(specs)
+        self.order, self.keys = order, keys
+        rows = set(dirty)
+        rows.update(range(len(order), len(self.model.data)))
+        if rows:
+            self.place_rows(rows)
+
+    def own_lowercase(self, column):
+        """ Lowercase cache of column, to be changed.  It is copied first,
+            if a job might read it.
+        """
+        if column in self.shared_lowercase:
+            self.shared_lowercase.discard(column)
+            self.lowercase[column] = list(self.lowercase[column])
+        return self.lowercase[column]
+
+    def cell_text(self, row, column):
+        """ Text of a cell as given to the match of filter. """
+        if self.filter.folded:
+            lowercase = self.lowercase[column]
+            if row < len(lowercase):
+                return lowercase[row]
+            return get_lowercase(self.model.get_cell(row, column))
+        return self.model.get_cell(row, column) or ''
+
+    def match_row(self, row):
+        """ Whether filter, the one in effect, accepts row. """
+        if self.filter.query is not None:
+            return self.filter.query.match(self.model.data[row])
+        match = self.filter.match
+        return any(match(self.cell_text(row, column))
+                   for column in self.filter.get_columns(len(self.indexes)))
+
+    def find_rows(self, snapshot, within=None, job=None):
+        """ Bytes for all rows of the FilterSnapshot snapshot, 1 for the
+            rows matching its filter.  If within is given, only rows with a
+            1 in it can match.  Gives up and returns None, once job is
+            cancelled.
+        """
+        filter = snapshot.filter
+        data = snapshot.data
+        count = len(data)
+        if within is not None:
+            count = min(count, len(within))
+        accepted = bytearray(count)
+        cancelled = lambda: job is not None and job.cancelled
+        if filter.query is not None:
+            rows = filter.query.find_rows(data, cancelled)
+            if rows is None:
+                return None
+            for row in rows:
+                accepted[row] = 1
+            return accepted
+        match = filter.match
+        if within is not None:
+            shown = within.count(1)
+        for column, index in snapshot.indexes.items():
+            # Rows indexed later are read as not indexed.
+            length = index.length
+            candidates = None
+            # Without any row indexed, as in unindexed columns, all rows
+            # are read anyway.
+            for literal in filter.literals if length else ():
+                rows = index.search(literal)
+                if rows is not None:
+                    if candidates is None:
+                        candidates = rows
+                    else:
+                        candidates &= rows
+            if candidates is not None:
+                candidates.update(range(length, count))
+            # Whichever of candidates and within has fewer rows is read.
+            if candidates is None or within is not None and (
+                    shown < len(candidates)):
+                texts = enumerate(snapshot.column_text(column))
+                if within is not None:
+                    texts = itertools.compress(texts, within)
+                texts = itertools.islice(texts, count)
+                for step, (row, text) in enumerate(texts):
+                    if not step % 1024 and cancelled():
+                        return None
+                    if not accepted[row] and match(text):
+                        accepted[row] = 1
+            else:
+                for step, row in enumerate(candidates):
+                    if not step % 1024 and cancelled():
+                        return None
+                    if (row < count
+                    and not accepted[row]
+                    and (within is None or within[row])
+                    and match(snapshot.cell_text(row, column))):
+                        accepted[row] = 1
+        return accepted
+
+
 class GamelistTable():
     """    """
     instances = 0
 
-    def __init__(self, file, table, parent, tags, progress):
+    def __init__(self, file, table, parent, tags, progress, background=False,
+                 cache=None, columnar=False):
         # Keep track of how many gamelists exist.
         self.__class__.instances += 1
         # Create the actual object.
         self.parent = parent
-        self.model = GamelistTableModel(file, tags, progress)
+        self.model = GamelistTableModel(file, tags, progress, background,
+                                        cache, columnar)
         self.view = table
-        self.proxy = QtCore.QSortFilterProxyModel()
+        self.proxy = GamelistFilterProxy()
         self.proxy.setSourceModel(self.model)
         self.view.setSortingEnabled(True)
         self.view.setModel(self.proxy)
+        # fixed_filter is (column, case, text) of the filter in effect, if
+        # it is a fixed text.  A text containing it can only match rows it
+        # matched too, so filter() narrows them down.
+        self.fixed_filter = None
 
         # self.view.horizontalHeader().setSectionsMovable(True)
         # self.view.horizontalHeader().setDragEnabled(True)
@@ -279,28 +1375,133 @@ class GamelistTable():
         self.item_delegate.commitData.connect(
             self.commitData)
 
+        # completer_specs are the arguments of set_completer() for each
+        # widget.  Its completer is made the first time the widget gets the
+        # focus, and completers has the WordList of it from then on.
+        self.completer_specs = {}
+        self.completers = {}
+        # completer_timer indexes completer_step words of each completer at
+        # a time, while the application is idle.
+        self.completer_step = 500
+        self.completer_timer = QtCore.QTimer()
+        self.completer_timer.setInterval(0)
+        self.completer_timer.timeout.connect(
+            self.completer_timer_timeout)
+
         # unsaved should be set to True whenever data is changed,
         # set it back to False, when the file is successfully exported
         #   False=nothing changed, True=data changed and is unsaved
         self.unsaved = False
 
+        # loader reads the file in loader_thread, if background is True.
+        # Connect to its signals before calling start_loading().
+        self.loader = None
+        self.loader_thread = None
+        self.loading = False
+        if background:
+            self.loader = GamelistLoader(file, self.model.header, cache)
+            self.loader_thread = QtCore.QThread()
+            self.loader.moveToThread(self.loader_thread)
+            self.loader_thread.started.connect(self.loader.run)
+            self.loader.loaded.connect(self.loader_finished)
+            self.loader.failed.connect(self.loader_finished)
+            self.loader.cancelled.connect(self.loader_finished)
+            self.loader.chunkLoaded.connect(self.loader_chunkLoaded)
+            self.loader.loaded.connect(self.loader_loaded)
+            self.loader.loaded.connect(self.loader_thread.quit)
+            self.loader.failed.connect(self.loader_failed)
+            self.loader.failed.connect(self.loader_thread.quit)
+            self.loader.cancelled.connect(self.model.clear_rows)
+            self.loader.cancelled.connect(self.loader_thread.quit)
+            self.loader.progressRange.connect(progress.setRange)
+            self.loader.progressValue.connect(progress.setValue)
+
     def __del__(self):
+        try:
+            self.stop_loading()
+        except RuntimeError:
+            # Wrapped Qt objects are already deleted at application exit.
+            pass
         if self.__class__.instances:
             self.__class__.instances -= 1
             del self.model
             del self.view
             del self.proxy
 
+    def start_loading(self):
+        if self.loader_thread:
+            self.loading = True
+            self.loader_thread.start()
+
+    def stop_loading(self):
+        """ Cancel a running background import and wait for the thread.
+            Pending filter and sort jobs are cancelled too.
+        """
+        if self.loader_thread and self.loader_thread.isRunning():
+            self.loader.cancel()
+            self.loader_thread.quit()
+            self.loader_thread.wait()
+        self.loading = False
+        self.proxy.cancel_jobs()
+
+    def is_loading(self):
+        return self.loading
+
+    def loader_finished(self):
+        self.loading = False
+
+    def loader_chunkLoaded(self, rows, unsupptags):
+        # Chunks still queued after a cancel are dropped.
+        if not self.loader.is_cancelled:
+            self.model.append_rows(rows, unsupptags)
+
+    def loader_loaded(self, folders, otherdata):
+        # Cancelled after the last chunk was queued already.
+        if self.loader.is_cancelled:
+            self.model.clear_rows()
+        else:
+            self.model.set_loaded(folders, otherdata)
+
+    def loader_failed(self, message):
+        self.model.clear_rows()
+        msg_show_error(message, 'Critical')
+
     def commitData(self, editor):
         self.set_unsaved()
-        self.view.model().layoutChanged.emit()
 
     def set_completer(self, widget, wordlist, FilterMode='MatchStartsWith'):
+        """ Complete the text of widget with the values of the columns in
+            wordlist.  The completer is made by load_completer(), once the
+            widget gets the focus.
+        """
+        old = self.completers.pop(widget, None)
+        if old is not None:
+            old.close()
+            widget.textEdited.disconnect(old.complete)
+        self.completer_specs[widget] = (wordlist, FilterMode)
+        widget.setCompleter(None)
+        if widget.hasFocus():
+            self.load_completer(widget)
+
+    def load_completer(self, widget):
+        """ Make the completer of widget, or bring its word list up to date
+            with the values added or removed since.
+        """
+        wordlist = self.completers.get(widget)
+        if wordlist is not None:
+            wordlist.update()
+            self.completer_timer.start()
+            return
+        if widget not in self.completer_specs:
+            return
+        wordlist, FilterMode = self.completer_specs[widget]
         completer = QtWidgets.QCompleter()
         completer.setCompletionMode(QtWidgets.QCompleter.UnfilteredPopupCompletion)
         completer.setCaseSensitivity(QtCore.Qt.CaseInsensitive)
         completer.setCompletionRole(QtCore.Qt.DisplayRole)
-        completer.setModelSorting(QtWidgets.QCompleter.CaseInsensitivelySortedModel)
+        # Only the words found for the text are in the model, those starting
+        # with it first.
+        completer.setModelSorting(QtWidgets.QCompleter.UnsortedModel)
         if FilterMode == 'MatchStartsWith':
             completer.setFilterMode(QtCore.Qt.MatchStartsWith)
         elif FilterMode == 'MatchContains':
@@ -308,23 +1509,28 @@ class GamelistTable():
         elif FilterMode == 'MatchEndsWith':
             completer.setFilterMode(QtCore.Qt.MatchEndsWith)
         #completer.setModelSorting(QtWidgets.QCompleter.CaseInsensitivelySortedModel)
-        if isinstance(wordlist, list):
-            newwordlist = []
-            for listinlist in wordlist:
-                newwordlist.extend(self.get_wordlist(listinlist))
-            wordlist = newwordlist
         if isinstance(wordlist, str):
-            wordlist = self.get_wordlist(wordlist)
+            wordlist = [wordlist]
             completer.setCompletionMode(QtWidgets.QCompleter.InlineCompletion)
-        wordlist = sorted(list(set(wordlist)))
-        model = QtCore.QStringListModel(wordlist, completer)
+        counts = [self.model.count_words(self.model.header[head])
+                  for head in wordlist]
+        model = QtCore.QStringListModel(completer)
+        contains = not FilterMode == 'MatchStartsWith'
+        self.completers[widget] = WordList(counts, model, contains)
+        self.completers[widget].complete(widget.text())
+        widget.textEdited.connect(self.completers[widget].complete)
         completer.setModel(model)
         widget.setCompleter(completer)
+        self.completer_timer.start()
 
-    def get_wordlist(self, header):
-        head = self.model.header[header]
-        wordlist = [row[head] for row in self.model.data]
-        return filter(None, list(set(wordlist)))
+    def completer_timer_timeout(self):
+        """ Index the next words of each completer, until all are done. """
+        done = True
+        for wordlist in self.completers.values():
+            if wordlist.index.step(self.completer_step):
+                done = False
+        if done:
+            self.completer_timer.stop()
 
     #def model_rowsInserted(self, parent, first, last):
     #    pass
@@ -354,6 +1560,18 @@ class GamelistTable():
         self.commitData(self)
         return self.model.index(new.value(), 0, QtCore.QModelIndex())
 
+    def undo(self):
+        if self.model.undo():
+            self.commitData(self)
+            return True
+        return False
+
+    def redo(self):
+        if self.model.redo():
+            self.commitData(self)
+            return True
+        return False
+
     def update_selected_row(self):
         for mindex in self.view.selectedIndexes():
             self.view.update(mindex)
@@ -364,6 +1582,12 @@ class GamelistTable():
         else:
             return self.model.data[index]
 
+    def get_rows(self):
+        """ All rows as a list of lists, also if stored by column. """
+        if isinstance(self.model.data, ColumnStore):
+            return self.model.data.rows()
+        return self.model.data
+
     def get_selected_mindex(self):
         QModelIndexes = self.view.selectedIndexes()
         return QModelIndexes[0] if QModelIndexes else None
@@ -380,6 +1604,8 @@ class GamelistTable():
         # is exactly what is filtered too.  Hidden columns are missing and
         # index numbers for rows does not match the real data from real model.
         table_model = self.view.model()
+        # Export what the filter and sort in progress will show.
+        self.proxy.finish_jobs()
 
         filtered_data = []
         rowcount = table_model.rowCount(QtCore.QModelIndex())
@@ -390,402 +1616,11 @@ class GamelistTable():
             tableindex = table_model.index(rownum, 0, QtCore.QModelIndex())
             # Get QModelIndex of real data, including all hidden columns.
             dataindex = self.get_data_index(tableindex)
-            # Get games list data from real data.
-            filtered_data.append(self.model.data[dataindex])
+            # Get games list data from real data, as plain list also when
+            # stored by column.
+            filtered_data.append(list(self.model.data[dataindex]))
         return filtered_data
 
-    def xmltag_to_dict(self, tag):
-        return xmltodict.parse(ElementTree.tostring(tag, encoding='unicode'))
-
-    def xml_write(self, data, file):
-        data.write(file, encoding='UTF-8', xml_declaration=True, method='xml')
-        return file
-
-    def xml_to_string(self, data, indent):
-        xml_root = data.getroot()
-        if indent is not None:
-            self.xml_indent_root(xml_root, 0, indent)
-            newline = ''
-        else:
-            newline = '\n'
-        xml_root = ElementTree.tostring(xml_root, encoding='unicode')
-        return xml_root + newline
-
-    def xml_indent_root(self, element, level=0, indent=4):
-        """
-            https://effbot.org/zone/element-lib.htm#prettyprint
-            2004 by Fredrik Lundh
-        """
-        spaces = indent * ' '
-        i = '\n' + level * spaces
-        if element:
-            if not element.text or not element.text.strip():
-                element.text = i + spaces
-            if not element.tail or not element.tail.strip():
-                element.tail = i
-            for element in element:
-                self.xml_indent_root(element, level + 1, indent)
-            if not element.tail or not element.tail.strip():
-                element.tail = i
-        else:
-            if level and (not element.tail or not element.tail.strip()):
-                element.tail = i
-        return element
-
-    def data_to_xml(self,
-                    data,
-                    export_exclude,
-                    exclude_unsupptags,
-                    remove_empty,
-                    progress,
-                    indent):
-
-        if not isinstance(data, list):
-            raise TypeError('Invalid data in data_to_xml()', type(data))
-        if data:
-            progress.setRange(0, len(data))
-        header_items = self.model.header.items()
-        header_list = list(self.model.header.keys())
-        unsupptags = [] if exclude_unsupptags else self.model.unsupptags
-        folders = self.model.folders
-        otherdata = self.model.otherdata
-
-        root = '<gameList></gameList>'
-        root = ElementTree.fromstring(root)
-        for count, row in enumerate(data, 1):
-            game_dict = {}
-
-            for head, headid in header_items:
-                if head in export_exclude:
-                    continue
-                cell = row[headid]
-                if cell is None:
-                    cell = ''
-                if head in ['id', 'source']:
-                    if not cell == '':
-                        game_dict[head] = html.escape(cell)
-                elif head in ['favorite', 'hidden', 'kidgame']:
-                    if cell in ['true', 'false']:
-                        game_dict[head] = cell
-                elif not cell == '':
-                    game_dict[head] = html.escape(cell)
-                else:
-                    game_dict[head] = ''
-
-            if remove_empty is False:
-                game = ElementTree.SubElement(root, 'game')
-            elif remove_empty and game_dict:
-                game = ElementTree.SubElement(root, 'game')
-            elif unsupptags or folders:
-                game = ElementTree.SubElement(root, 'game')
-
-            if game_dict:
-                for tag in header_list:
-                    try:
-                        cell = game_dict[tag]
-                    except KeyError:
-                        if remove_empty:
-                            continue
-                        elif tag in ['id', 'source']:
-                            game.set(tag, '')
-                        else:
-                            ElementTree.SubElement(game, tag).text = ''
-                    else:
-                        if remove_empty and cell == '':
-                            continue
-                        elif tag in ['id', 'source']:
-                            game.set(tag, cell)
-                        else:
-                            ElementTree.SubElement(game, tag).text = cell
-
-            if unsupptags:
-                for tag in unsupptags[count - 1]:
-                    game.append(tag)
-            progress.setValue(count)
-
-        if not exclude_unsupptags:
-            if folders:
-                root.extend(folders)
-            if otherdata:
-                root.extend(otherdata)
-        if indent is not None:
-            self.xml_indent_root(root, 0, indent)
-        return ElementTree.ElementTree(root)
-
-    def json_write(self, data, file):
-        with open(file, 'w') as jsonfile:
-            jsonfile.write(data)
-        return file
-
-    def data_to_json(self,
-                     data,
-                     export_exclude,
-                     exclude_unsupptags,
-                     remove_empty,
-                     progress,
-                     indent):
-        if not isinstance(data, list):
-            raise TypeError('Invalid data in data_to_json()', type(data))
-        if data:
-            progress.setRange(0, len(data))
-        header_items = self.model.header.items()
-        header_list = list(self.model.header.keys())
-        unsupptags = [] if exclude_unsupptags else self.model.unsupptags
-        folders = self.model.folders
-        otherdata = self.model.otherdata
-
-        root = {'gameList': []}
-        for count, row in enumerate(data, 1):
-            game_dict = {}
-
-            for head, headid in header_items:
-                if head in export_exclude:
-                    continue
-                cell = row[headid]
-                if cell is None:
-                    cell = ''
-                if head == 'id':
-                    if not cell == '':
-                        try:
-                            cell = int(cell)
-                        except ValueError:
-                            pass
-                        game_dict[head] = cell
-                elif head == 'source':
-                    if not cell == '':
-                        game_dict[head] = cell
-                elif head in ['favorite', 'hidden', 'kidgame']:
-                    if cell == 'true':
-                        game_dict[head] = True
-                    elif cell == 'false':
-                        game_dict[head] = False
-                elif head in ['players', 'playcount']:
-                    if not cell == '':
-                        try:
-                            cell = int(cell)
-                        except ValueError:
-                            pass
-                        game_dict[head] = cell
-                elif head == 'genre':
-                    if not cell == '':
-                        if '/' in cell:
-                            cell = cell.split('/')
-                            cell = [cell.strip() for cell in cell]
-                        elif ',' in cell:
-                            cell = cell.split(',')
-                            cell = [cell.strip() for cell in cell]
-                        game_dict[head] = cell
-                elif head == 'rating':
-                    if not cell == '':
-                        try:
-                            cell = float(cell)
-                        except ValueError:
-                            pass
-                        game_dict[head] = cell
-                elif cell is None:
-                    game_dict[head] = ''
-                elif not cell == '':
-                    game_dict[head] = cell
-
-            if (remove_empty
-            and game_dict == {}
-            and unsupptags == []
-            and folders is None):
-                progress.setValue(count)
-                continue
-
-            game = {}
-            if game_dict:
-                for tag in header_list:
-                    try:
-                        cell = game_dict[tag]
-                    except KeyError:
-                        if remove_empty:
-                            continue
-                        else:
-                            game[tag] = ''
-                    else:
-                        if remove_empty and cell == '':
-                            continue
-                        else:
-                            game[tag] = cell
-
-            if unsupptags:
-                for tag in unsupptags[count - 1]:
-                    game.update(self.xmltag_to_dict(tag))
-
-            root['gameList'].append(game)
-            progress.setValue(count)
-
-        if not exclude_unsupptags:
-            if folders:
-                for tag in folders:
-                    root['gameList'].append(self.xmltag_to_dict(tag))
-            if otherdata:
-                for tag in otherdata:
-                    root['gameList'].append(self.xmltag_to_dict(tag))
-        return json.dumps(root, sort_keys=False, indent=indent)
-
-    def csv_write(self, data, file, header):
-        with open(file, 'w', newline='') as csvfile:
-            csvwriter = csv.DictWriter(csvfile,
-                                       fieldnames=header,
-                                       restval='',
-                                       extrasaction='ignore',
-                                       dialect='excel')
-            csvwriter.writeheader()
-            csvwriter.writerows(data)
-        return file
-
-    def csv_write_stdout(self, data, header):
-        csvwriter = csv.DictWriter(sys.stdout,
-                                   fieldnames=header,
-                                   restval='',
-                                   extrasaction='ignore',
-                                   dialect='excel')
-        csvwriter.writeheader()
-        csvwriter.writerows(data)
-        return sys.stdout
-
-    def data_to_csv(self,
-                    data,
-                    export_exclude,
-                    exclude_unsupptags,
-                    remove_empty,
-                    progress):
-        if not isinstance(data, list):
-            raise TypeError('Invalid data in data_to_csv()', type(data))
-        if data:
-            progress.setRange(0, len(data))
-        header_items = self.model.header.items()
-        header_list = list(self.model.header.keys())
-        unsupptags = [] if exclude_unsupptags else self.model.unsupptags
-
-        root = []
-        for count, row in enumerate(data, 1):
-            game_dict = {}
-
-            for head, headid in header_items:
-                if head in export_exclude:
-                    continue
-                cell = row[headid]
-                if cell is None:
-                    game_dict[head] = ''
-                elif not cell == '':
-                    game_dict[head] = cell
-
-            if unsupptags:
-                for tag in unsupptags[count - 1]:
-                    if tag.tag not in header_list:
-                        header_list.append(tag.tag)
-                    game_dict.update(self.xmltag_to_dict(tag))
-
-            progress.setValue(count)
-            if (remove_empty
-            and game_dict == {}
-            and unsupptags == []):
-                continue
-
-            root.append(game_dict)
-        return root, header_list
-
-    def txt_write(self, data, file):
-        data = [str(line) + '\n' for line in data]
-        with open(file, 'w', newline='') as txtfile:
-            txtfile.writelines(data)
-        return file
-
-    def data_to_txt(self,
-                    data,
-                    export_exclude,
-                    exclude_unsupptags,
-                    remove_empty,
-                    progress,
-                    indent):
-        if not isinstance(data, list):
-            raise TypeError('Invalid data in data_to_txt()', type(data))
-        if data:
-            progress.setRange(0, len(data))
-        header_items = self.model.header.items()
-        header_list = list(self.model.header.keys())
-        unsupptags = [] if exclude_unsupptags else self.model.unsupptags
-        folders = self.model.folders
-
-        if indent:
-            indent = str(indent * '\n')
-        else:
-            indent = ''
-
-        root = []
-        for count, row in enumerate(data, 1):
-            game_dict = {}
-
-            for head, headid in header_items:
-                if head in export_exclude:
-                    continue
-
-                cell = row[headid]
-                if cell is None or cell == '':
-                    game_dict[head] = ''
-                else:
-                    game_dict[head] = cell
-
-            if (remove_empty
-            and game_dict == {}
-            and not unsupptags == {}):
-                progress.setValue(count)
-                continue
-
-            if unsupptags:
-                for tag in unsupptags[count - 1]:
-                    if tag.tag not in header_list:
-                        header_list.append(tag.tag)
-                    game_dict.update(self.xmltag_to_dict(tag))
-
-            game = []
-            if game_dict:
-                for tag in header_list:
-                    try:
-                        cell = game_dict[tag]
-                    except KeyError:
-                        if remove_empty:
-                            continue
-                        else:
-                            game.append('')
-                    else:
-                        if remove_empty and cell == '':
-                            continue
-                        else:
-                            game.append(str(cell))
-
-            if indent and root and game:
-                game[0] = indent + game[0]
-            root.extend(game)
-            progress.setValue(count)
-        return root
-
-    def cfg_write(self, data, file):
-        data = [str(line) + '\n' for line in data]
-        with open(file, 'w', newline='') as cfgfile:
-            cfgfile.writelines(data)
-        return file
-
-    def data_to_cfg(self,
-                    data,
-                    progress):
-        if not isinstance(data, list):
-            raise TypeError('Invalid data in data_to_cfg()', type(data))
-        if data:
-            progress.setRange(0, len(data))
-        headid = self.get_header('path')
-
-        root = []
-        for count, row in enumerate(data, 1):
-            if not row[headid] == '' and not row[headid] is None:
-                root.append(row[headid])
-            progress.setValue(count)
-        return root
-
     def is_unsaved(self):
         return self.unsaved
 
@@ -804,22 +1639,25 @@ class GamelistTable():
         return len(self.model.data) > 0
 
     def get_genres(self, groups=False):
-        headid = self.model.header['genre']
-        genres = []
-        for game in self.model.data:
-            if (not game[headid] == ''
-            and not game[headid] is None):
-                if groups:
-                    genres.append(game[headid])
-                elif '/' in game[headid]:
-                    genres.extend(game[headid].split('/'))
-                else:
-                    genres.append(game[headid])
-        if genres:
-            genres = [entry.strip() for entry in genres]
-            genres = list(set(genres))
-            genres.sort()
-        return genres
+        return self.model.genres.get_genres(groups)
+
+    def get_genre_counts(self, groups=False):
+        """ Number of games in each genre. """
+        return self.model.genres.get_counts(groups)
+
+    def filter_genre(self, genre, groups=False):
+        """ Show only games in genre, as listed by get_genres(), found in
+            the genre index instead of matching every game.
+        """
+        self.fixed_filter = None
+        genre = genre.strip()
+        column = self.model.genre_column
+        if not genre or column is None:
+            self.proxy.set_filter(None)
+            return
+        self.proxy.set_filter(lambda text: has_genre(text, genre, groups),
+                              column,
+                              rows=self.model.genres.find_rows(genre, groups))
 
     def get_header(self, head=None):
         if head is None:
@@ -853,49 +1691,96 @@ class GamelistTable():
         return [reverse_header[head] for head in self.model.locked_columns]
 
     def filter(self, head, filter, regex=False, case=False, widget=None):
-        try:
-            if head is None:
-                self.proxy.setFilterKeyColumn(-1)
-            else:
-                self.proxy.setFilterKeyColumn(self.get_header(head))
-        except KeyError:
-            pass
+        if head is None:
+            column = -1
         else:
-            if regex:
-                filter = QtCore.QRegularExpression(filter)
-                if filter.isValid():
-                    if widget:
-                        widget.setStyleSheet('')
-                    if case:
-                        filter.setPatternOptions(
-                            QtCore.QRegularExpression.UseUnicodePropertiesOption
-                            | QtCore.QRegularExpression.DotMatchesEverythingOption
-                        )
-                    else:
-                        filter.setPatternOptions(
-                            QtCore.QRegularExpression.CaseInsensitiveOption
-                            | QtCore.QRegularExpression.UseUnicodePropertiesOption
-                            | QtCore.QRegularExpression.DotMatchesEverythingOption
-                        )
-                    self.proxy.setFilterRegularExpression(filter)
+            column = self.get_header(head)
+        previous = self.fixed_filter
+        self.fixed_filter = None
+        if widget:
+            widget.setToolTip('')
+            if not regex:
+                widget.setStyleSheet('')
+        if regex:
+            filter = QtCore.QRegularExpression(filter)
+            if filter.isValid():
+                if widget:
+                    widget.setStyleSheet('')
+                if case:
+                    filter.setPatternOptions(
+                        QtCore.QRegularExpression.UseUnicodePropertiesOption
+                        | QtCore.QRegularExpression.DotMatchesEverythingOption
+                    )
+                else:
+                    filter.setPatternOptions(
+                        QtCore.QRegularExpression.CaseInsensitiveOption
+                        | QtCore.QRegularExpression.UseUnicodePropertiesOption
+                        | QtCore.QRegularExpression.DotMatchesEverythingOption
+                    )
+                if filter.pattern():
+                    match = lambda text: filter.match(text).hasMatch()
                 else:
-                    if widget:
-                        widget.setStyleSheet('color: #8B0000;')  # DarkRed
+                    match = None
+                self.proxy.set_filter(match, column,
+                                      required_literals(filter.pattern()))
             else:
-                #self.proxy.setFilterWildcard(filter)
-                self.proxy.setFilterFixedString(filter)
-                self.proxy.setFilterCaseSensitivity(case)
+                if widget:
+                    widget.setStyleSheet('color: #8B0000;')  # DarkRed
+                # Any filter in effect stays, also a query or genre filter.
+                self.fixed_filter = previous
+        elif not filter:
+            self.proxy.set_filter(None, column)
+        else:
+            self.fixed_filter = (column, case, filter)
+            narrow = (previous is not None
+                      and previous[:2] == (column, case)
+                      and (previous[2] in filter if case
+                           else previous[2].lower() in filter.lower()))
+            if case:
+                self.proxy.set_filter(lambda text: filter in text, column,
+                                      [filter], False, narrow)
+            else:
+                lower = filter.lower()
+                self.proxy.set_filter(lambda text: lower in text, column,
+                                      [filter], True, narrow)
+
+    def query(self, text, widget=None):
+        """ Filter by text in the language of modules.query.  An invalid
+            query leaves the filter unchanged and turns widget red, with
+            the error as tooltip.
+        """
+        self.fixed_filter = None
+        try:
+            query = Query(text, self.model.header)
+        except QueryError as error:
+            if widget:
+                widget.setStyleSheet('color: #8B0000;')  # DarkRed
+                widget.setToolTip(str(error))
+            return False
+        if widget:
+            widget.setStyleSheet('')
+            widget.setToolTip('')
+        if query.terms:
+            self.proxy.set_query(query)
+        else:
+            self.proxy.set_filter(None)
+        return True
 
     def clear_sort(self):
         self.view.clearSelection()
         self.view.sortByColumn(-1, QtCore.Qt.AscendingOrder)
 
     def sort_header(self, sortlist):
-        self.view.sortByColumn(-1, QtCore.Qt.AscendingOrder)
-        for head in sortlist:
-            if head in self.get_header():
-                self.view.sortByColumn(self.get_header(head),
-                                       QtCore.Qt.AscendingOrder)
+        """ Sort by all tags in sortlist at once, the last one is the
+            primary key and former ones break ties.
+        """
+        columns = [self.get_header(head) for head in sortlist
+                   if head in self.get_header()]
+        self.proxy.sort_by([(column, False) for column in columns])
+        # The proxy is sorted by the primary column already, so the view
+        # does not sort again.
+        self.view.horizontalHeader().setSortIndicator(
+            columns[-1] if columns else -1, QtCore.Qt.AscendingOrder)
 
     def hide_header(self, hidelist):
         hidden = []
@@ -3,19 +3,17 @@
 import sys
 import os
 import pathlib
-import urllib.parse
-import xml.etree.ElementTree as ElementTree
-import webbrowser
 
-import PyQt5.uic
 from PyQt5 import QtWidgets, QtCore, QtGui
 
 from modules import settings as G
 from modules.gamelistedit_ui import Ui_mainwindow
 from modules.GamelistTable import *
+from modules.cache import GamelistCache
 from modules.dialogs import *
 from modules.path import *
 from modules.misc import *
+from modules import timings
 
 
 class MainWindow(QtWidgets.QMainWindow, QtGui.QWindow):
@@ -27,6 +25,7 @@ class MainWindow(QtWidgets.QMainWindow, QtGui.QWindow):
         super(MainWindow, self).__init__()
         self.ui = Ui_mainwindow()
         self.ui.setupUi(self)
+        timings.mark('setupUi')
         self.setWindowIcon(QtGui.QIcon(str(G.settings['app_icon_path'])))
         self.setWindowTitle(G.settings['app_title'])
 
@@ -59,6 +58,17 @@ class MainWindow(QtWidgets.QMainWindow, QtGui.QWindow):
         # the button included the portion of name, so it can be removed later.
         self.le_export_startswith_custom = None
 
+        # filter_timer delays the filter while text is typed into le_filter,
+        # so a quick sequence of keys filters the table only once.  Text set
+        # by the program is filtered at once.  filter_typed is True between
+        # the textEdited and textChanged signals of a typed key.
+        self.filter_typed = False
+        self.filter_timer = QtCore.QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(G.settings['filter_delay'])
+        self.filter_timer.timeout.connect(
+            self.le_filter_textChanged)
+
         if not G.settings['no_gui']:
             # add SHORTCUTS
             self.shortcut_filterbar = QtWidgets.QShortcut(
@@ -101,6 +111,28 @@ class MainWindow(QtWidgets.QMainWindow, QtGui.QWindow):
             self.shortcut_nextgame.activated.connect(
                 self.b_edit_nextgame_clicked)
 
+            self.shortcut_cancel = QtWidgets.QShortcut(
+                QtGui.QKeySequence('Esc'), self)
+            self.shortcut_cancel.activated.connect(
+                self.tb_file_cancel_clicked)
+
+            self.shortcut_undo = QtWidgets.QShortcut(
+                QtGui.QKeySequence('Ctrl+Z'), self)
+            self.shortcut_undo.activated.connect(
+                self.undo_activated)
+
+            self.shortcut_redo = QtWidgets.QShortcut(
+                QtGui.QKeySequence('Ctrl+Y'), self)
+            self.shortcut_redo.activated.connect(
+                self.redo_activated)
+
+        # Completers of the gamelist are made on the first focus of their
+        # widget, see GamelistTable.load_completer().
+        app = QtWidgets.QApplication.instance()
+        if app is not None:
+            app.focusChanged.connect(
+                self.app_focusChanged)
+
         # add WIDGETS
         self.l_current_file = self.findChild(
             QtWidgets.QLabel,
@@ -118,6 +150,13 @@ class MainWindow(QtWidgets.QMainWindow, QtGui.QWindow):
             QtWidgets.QProgressBar,
             'pb_file_progress')
 
+        self.tb_file_cancel = self.findChild(
+            QtWidgets.QToolButton,
+            'tb_file_cancel')
+        self.tb_file_cancel.clicked.connect(
+            self.tb_file_cancel_clicked)
+        self.tb_file_cancel.setVisible(False)
+
         # add IMPORT TAB
         self.tb_import_filedialog = self.findChild(
             QtWidgets.QToolButton,
@@ -202,6 +241,8 @@ class MainWindow(QtWidgets.QMainWindow, QtGui.QWindow):
         self.le_filter = self.findChild(
             QtWidgets.QLineEdit,
             'le_filter')
+        self.le_filter.textEdited.connect(
+            self.le_filter_textEdited)
         self.le_filter.textChanged.connect(
             self.le_filter_textChanged)
         self.le_filter.editingFinished.connect(
@@ -921,7 +962,8 @@ class MainWindow(QtWidgets.QMainWindow, QtGui.QWindow):
         self.export_exclude_init(G.settings['export_exclude'])
         self.cb_export_exclude_unsupptags.setChecked(G.settings['export_exclude_unsupptags'])
         self.cb_export_keep_empty.setChecked(G.settings['export_keep_empty'])
-        self.pb_file_progress.setVisible(False)
+        if not self.gamelist.is_loading():
+            self.pb_file_progress.setVisible(False)
 
         if G.settings['indent'] is not None:
             self.sb_export_indent.setValue(G.settings['indent'])
@@ -985,6 +1027,7 @@ class MainWindow(QtWidgets.QMainWindow, QtGui.QWindow):
         self.pb_file_progress.setVisible(True)
 
         try:
+            self.gamelist.stop_loading()
             del self.gamelist
         except AttributeError:
             pass
@@ -993,27 +1036,31 @@ class MainWindow(QtWidgets.QMainWindow, QtGui.QWindow):
             QtWidgets.QTableView,
             table)
 
+        # Import in a worker thread when the window is shown, so it stays
+        # responsive and the table fills up chunk by chunk.
+        background = bool(not G.settings['no_gui']
+                          and file
+                          and os.path.exists(file))
+        if G.settings['no_cache']:
+            cache = None
+        else:
+            cache = GamelistCache(use_hash=G.settings['cache_hash'])
         self.gamelist = GamelistTable(
             file,
             self.tv_gamelist,
             self,
             G.settings['tag_order'],
-            self.pb_file_progress)
+            self.pb_file_progress,
+            background,
+            cache,
+            G.settings['column_store'])
 
         if self.gamelist.model.file:
-            msg_stderr(f'File successfully imported: {str(file)}')
             wintitle = f'{os.path.basename(file)}[*] - {G.settings["app_title"]}'
             self.setWindowTitle(wintitle)
             self.l_current_file.setText(str(file))
-            self.dbb_export_buttons.setEnabled(self.allow_export())
         self.gamelist.reset_unsaved()
 
-        tabs = []
-        tabs.append(self.t_tabs.widget(self.tabs_names['edit']))
-        tabs.append(self.t_tabs.widget(self.tabs_names['export']))
-        for tab in tabs:
-            tab.setEnabled(bool(self.gamelist.model.file))
-
         if G.settings['no_table_edit']:
             self.gamelist.view.doubleClicked.connect(
                 self.view_doubleClicked)
@@ -1024,17 +1071,18 @@ class MainWindow(QtWidgets.QMainWindow, QtGui.QWindow):
 
         if G.settings['mod_flag']:
             self.gamelist.model.mod_flag_role = QtGui.QColor('yellow')
-        self.cbb_edit_genre.clear()
-        self.cbb_edit_genre.addItems(
-            self.gamelist.get_genres(G.settings['genre_groups']))
         self.le_filter_textChanged()
 
         self.selectionModel = self.gamelist.view.selectionModel()
         self.selectionModel.selectionChanged.connect(
             self.gamelist_selectionChanged)
+        self.gamelist.proxy.applied.connect(
+            self.gamelist_applied)
 
         self.cbb_filter_header.clear()
-        self.cbb_filter_header.addItems(['ALL'])
+        # QUERY reads the filter text as query, see modules.query, and
+        # GENRE as one of the genres listed in the editbox.
+        self.cbb_filter_header.addItems(['ALL', 'QUERY', 'GENRE'])
         self.cbb_filter_header.addItems(self.gamelist.get_header())
         self.set_filter_header(G.settings['filter_by'])
 
@@ -1051,51 +1099,125 @@ class MainWindow(QtWidgets.QMainWindow, QtGui.QWindow):
         self.lock_controls(locked_header)
         self.hide_header_and_controls(G.settings['turnoff'])
         self.set_header_sizes(G.settings['resize'])
-        if self.gamelist.model.file:
-            self.select_table_row(0)
-
-        self.update_completer()
 
         self.item_delegate = self.gamelist.view.itemDelegate()
         self.item_delegate.commitData.connect(
             self.commitData)
+        self.le_export_startswith_custom = None
 
+        if background:
+            loader = self.gamelist.loader
+            loader.chunkLoaded.connect(self.gamelist_chunkLoaded)
+            loader.loaded.connect(self.gamelist_loaded)
+            loader.failed.connect(self.gamelist_loaded)
+            loader.cancelled.connect(self.gamelist_loaded)
+            self.tb_file_cancel.setVisible(True)
+            self.enable_tabs(False)
+            self.gamelist.start_loading()
+        else:
+            self.gamelist_loaded()
+
+    def gamelist_chunkLoaded(self):
+        if (self.sender() is not self.gamelist.loader
+        or self.gamelist.loader.is_cancelled):
+            return
+        # Table is usable as soon as the first games arrive.
+        if not self.gamelist.get_selected_mindex():
+            self.t_tabs.widget(self.tabs_names['edit']).setEnabled(True)
+            self.select_table_row(0)
+        else:
+            self.update_icount_display(
+                self.gamelist.get_data_index(
+                    self.gamelist.get_selected_mindex()))
+
+    def gamelist_loaded(self):
+        """ Final setup of a gamelist, after all data is imported. """
+        if (self.sender() is not None
+        and self.sender() is not self.gamelist.loader):
+            return
+        file = self.gamelist.model.file
+        if file:
+            msg_stderr(f'File successfully imported: {str(file)}')
+        else:
+            self.setWindowTitle(G.settings['app_title'])
+            self.l_current_file.clear()
+            self.jump_to_tab('import')
+        self.enable_tabs(bool(file))
+        self.dbb_export_buttons.setEnabled(self.allow_export())
+
+        self.fill_genres()
+        if file and not self.gamelist.get_selected_mindex():
+            self.select_table_row(0)
+        self.update_editbox()
+        self.update_completer()
+
+        self.tb_file_cancel.setVisible(False)
         self.pb_file_progress.setVisible(False)
         self.l_current_file.setVisible(True)
-        self.le_export_startswith_custom = None
+
+    def enable_tabs(self, enable):
+        tabs = []
+        tabs.append(self.t_tabs.widget(self.tabs_names['edit']))
+        tabs.append(self.t_tabs.widget(self.tabs_names['export']))
+        for tab in tabs:
+            tab.setEnabled(enable)
+
+    def tb_file_cancel_clicked(self):
+        if self.gamelist.is_loading():
+            self.gamelist.loader.cancel()
+            msg_stderr('Import cancelled.')
 
     def update_completer(self):
+        """ Set up the completers of all text fields, which are made once a
+            field gets the focus.
+        """
         if (not G.settings['no_gui']
         and not G.settings['no_autocomplete']):
-            self.gamelist.set_completer(self.le_filter,
-                ['name', 'developer', 'publisher'], 'MatchContains')
-            self.gamelist.set_completer(self.le_edit_source,
-                'source')
-            self.gamelist.set_completer(self.le_edit_name,
-                'name')
-            self.gamelist.set_completer(self.le_edit_sortname,
-                'sortname')
-            self.gamelist.set_completer(self.le_edit_developer,
-                'developer')
-            self.gamelist.set_completer(self.le_edit_publisher,
-                'publisher')
-            self.gamelist.set_completer(self.le_edit_releasedate,
-                'releasedate')
-            self.gamelist.set_completer(self.le_edit_path,
-                'path')
-            self.gamelist.set_completer(self.le_edit_thumbnail,
-                'thumbnail')
-            self.gamelist.set_completer(self.le_edit_image,
-                'image')
-            self.gamelist.set_completer(self.le_edit_marquee,
-                'marquee')
-            self.gamelist.set_completer(self.le_edit_video,
-                'video')
+            completers = [
+                (self.le_filter, ['name', 'developer', 'publisher'],
+                    'MatchContains'),
+                (self.le_edit_source, 'source', 'MatchStartsWith'),
+                (self.le_edit_name, 'name', 'MatchStartsWith'),
+                (self.le_edit_sortname, 'sortname', 'MatchStartsWith'),
+                (self.le_edit_developer, 'developer', 'MatchStartsWith'),
+                (self.le_edit_publisher, 'publisher', 'MatchStartsWith'),
+                (self.le_edit_releasedate, 'releasedate', 'MatchStartsWith'),
+                (self.le_edit_path, 'path', 'MatchStartsWith'),
+                (self.le_edit_thumbnail, 'thumbnail', 'MatchStartsWith'),
+                (self.le_edit_image, 'image', 'MatchStartsWith'),
+                (self.le_edit_marquee, 'marquee', 'MatchStartsWith'),
+                (self.le_edit_video, 'video', 'MatchStartsWith'),
+            ]
+            for widget, wordlist, mode in completers:
+                self.gamelist.set_completer(widget, wordlist, mode)
+
+    def fill_genres(self):
+        """ List the genres in the editbox, each with its number of games
+            as tooltip, and keep the text entered.
+        """
+        counts = self.gamelist.get_genre_counts(G.settings['genre_groups'])
+        self.gamelist.model.genres.changed = False
+        text = self.cbb_edit_genre.currentText()
+        self.cbb_edit_genre.clear()
+        for position, genre in enumerate(sorted(counts)):
+            self.cbb_edit_genre.addItem(genre)
+            self.cbb_edit_genre.setItemData(
+                position, f'{counts[genre]} games', QtCore.Qt.ToolTipRole)
+        self.cbb_edit_genre.setEditText(text)
+
+    def app_focusChanged(self, old, new):
+        gamelist = getattr(self, 'gamelist', None)
+        if gamelist is not None and new is not None:
+            gamelist.load_completer(new)
+            # Genres added or removed by edits are listed again once the
+            # list is used.
+            if (new is self.cbb_edit_genre
+            and gamelist.model.genres.changed):
+                self.fill_genres()
 
     def commitData(self, editor):
         self.gamelist.view.commitData(editor)
         self.update_editbox()
-        self.update_completer()
 
     def view_doubleClicked(self, mindex):
         self.tb_toggle_editbox_clicked()
@@ -1117,6 +1239,11 @@ class MainWindow(QtWidgets.QMainWindow, QtGui.QWindow):
     def gamelist_selectionChanged(self, newSelection, oldSelection):
         self.update_editbox()
 
+    def gamelist_applied(self):
+        # Filter or sort finished in the background, count of games shown
+        # and selection may have changed.
+        self.update_editbox()
+
     def closeEvent(self, event):
         #and self.gamelist.model.is_edited()):
         close = True
@@ -1129,6 +1256,7 @@ class MainWindow(QtWidgets.QMainWindow, QtGui.QWindow):
             if not msg_continue(msg, 'Warning', parent=self):
                 close = False
         if close:
+            self.gamelist.stop_loading()
             EOT_action()
             event.accept()
         else:
@@ -1198,7 +1326,7 @@ class MainWindow(QtWidgets.QMainWindow, QtGui.QWindow):
             self.enable_toolbox_weblinks(True)
 
             if reset:
-                data = self.gamelist.model._original_data[index]
+                data = self.gamelist.model.original_row(index)
             else:
                 data = self.gamelist.model.data[index]
             header = self.gamelist.model.header
@@ -1397,102 +1525,105 @@ class MainWindow(QtWidgets.QMainWindow, QtGui.QWindow):
         if mindex:
             index = self.gamelist.get_data_index(mindex)
             header = self.gamelist.model.header
+            # All fields are reverted together with a single undo.
+            self.gamelist.model.begin_group()
 
             if self.le_edit_id.isEnabled():
                 text = self.le_edit_id.text()
-                self.gamelist.model.data[index][header['id']] = text
+                self.gamelist.model.set_value(index, header['id'], text)
 
             if self.le_edit_source.isEnabled():
                 text = self.le_edit_source.text()
-                self.gamelist.model.data[index][header['source']] = text
+                self.gamelist.model.set_value(index, header['source'], text)
 
             if self.le_edit_name.isEnabled():
                 text = self.le_edit_name.text()
-                self.gamelist.model.data[index][header['name']] = text
+                self.gamelist.model.set_value(index, header['name'], text)
 
             if self.le_edit_sortname.isEnabled():
                 text = self.le_edit_sortname.text()
-                self.gamelist.model.data[index][header['sortname']] = text
+                self.gamelist.model.set_value(index, header['sortname'], text)
 
             if self.pte_edit_desc.isEnabled():
                 text = self.pte_edit_desc.toPlainText()
-                self.gamelist.model.data[index][header['desc']] = text
+                self.gamelist.model.set_value(index, header['desc'], text)
 
             if self.le_edit_developer.isEnabled():
                 text = self.le_edit_developer.text()
-                self.gamelist.model.data[index][header['developer']] = text
+                self.gamelist.model.set_value(index, header['developer'], text)
 
             if self.le_edit_publisher.isEnabled():
                 text = self.le_edit_publisher.text()
-                self.gamelist.model.data[index][header['publisher']] = text
+                self.gamelist.model.set_value(index, header['publisher'], text)
 
             if self.le_edit_releasedate.isEnabled():
                 text = self.le_edit_releasedate.text()
-                self.gamelist.model.data[index][header['releasedate']] = text
+                self.gamelist.model.set_value(index, header['releasedate'], text)
 
             if self.cbb_edit_genre.isEnabled():
                 text = self.cbb_edit_genre.currentText()
-                self.gamelist.model.data[index][header['genre']] = text
+                self.gamelist.model.set_value(index, header['genre'], text)
 
             if self.le_edit_path.isEnabled():
                 text = self.le_edit_path.text()
-                self.gamelist.model.data[index][header['path']] = text
+                self.gamelist.model.set_value(index, header['path'], text)
 
             if self.le_edit_thumbnail.isEnabled():
                 text = self.le_edit_thumbnail.text()
-                self.gamelist.model.data[index][header['thumbnail']] = text
+                self.gamelist.model.set_value(index, header['thumbnail'], text)
 
             if self.le_edit_image.isEnabled():
                 text = self.le_edit_image.text()
-                self.gamelist.model.data[index][header['image']] = text
+                self.gamelist.model.set_value(index, header['image'], text)
 
             if self.le_edit_marquee.isEnabled():
                 text = self.le_edit_marquee.text()
-                self.gamelist.model.data[index][header['marquee']] = text
+                self.gamelist.model.set_value(index, header['marquee'], text)
 
             if self.le_edit_video.isEnabled():
                 text = self.le_edit_video.text()
-                self.gamelist.model.data[index][header['video']] = text
+                self.gamelist.model.set_value(index, header['video'], text)
 
             if self.sp_edit_playcount.isEnabled():
                 text = self.sp_edit_playcount.cleanText()
-                self.gamelist.model.data[index][header['playcount']] = text
+                self.gamelist.model.set_value(index, header['playcount'], text)
 
             if self.le_edit_lastplayed.isEnabled():
                 text = self.le_edit_lastplayed.text()
-                self.gamelist.model.data[index][header['lastplayed']] = text
+                self.gamelist.model.set_value(index, header['lastplayed'], text)
 
             if self.sp_edit_players.isEnabled():
                 text = self.sp_edit_players.cleanText()
-                self.gamelist.model.data[index][header['players']] = text
+                self.gamelist.model.set_value(index, header['players'], text)
 
             if self.dsp_edit_rating.isEnabled():
                 text = self.dsp_edit_rating.cleanText().replace(',', '.')
                 if not text == '1.00':
                     text = text.rstrip('0')
-                self.gamelist.model.data[index][header['rating']] = text
+                self.gamelist.model.set_value(index, header['rating'], text)
 
             if self.cb_edit_favorite.isEnabled():
                 if self.cb_edit_favorite.checkState():
                     text = 'true'
                 else:
                     text = ''
-                self.gamelist.model.data[index][header['favorite']] = text
+                self.gamelist.model.set_value(index, header['favorite'], text)
 
             if self.cb_edit_hidden.isEnabled():
                 if self.cb_edit_hidden.checkState():
                     text = 'true'
                 else:
                     text = ''
-                self.gamelist.model.data[index][header['hidden']] = text
+                self.gamelist.model.set_value(index, header['hidden'], text)
 
             if self.cb_edit_kidgame.isEnabled():
                 if self.cb_edit_kidgame.checkState():
                     text = 'true'
                 else:
                     text = ''
-                self.gamelist.model.data[index][header['kidgame']] = text
+                self.gamelist.model.set_value(index, header['kidgame'], text)
 
+            self.gamelist.model.end_group()
             self.gamelist.update_selected_row()
             self.gamelist.item_delegate.commitData.emit(self.f_editbox)
 
@@ -1511,6 +1642,14 @@ class MainWindow(QtWidgets.QMainWindow, QtGui.QWindow):
         self.set_fullscreen(not self.is_fullscreen)
         return self.is_fullscreen
 
+    def undo_activated(self):
+        if self.gamelist.undo():
+            self.update_editbox()
+
+    def redo_activated(self):
+        if self.gamelist.redo():
+            self.update_editbox()
+
     def toggle_weblinks_activated(self):
         if not G.settings['no_gui']:
             self.w_weblinks.setHidden(not self.w_weblinks.isHidden())
@@ -1612,7 +1751,28 @@ class MainWindow(QtWidgets.QMainWindow, QtGui.QWindow):
                 self.cb_export_sameasopen.isChecked())
 
     # EDIT TAB
+    def le_filter_textEdited(self):
+        if G.settings['filter_delay'] > 0:
+            self.filter_typed = True
+            self.filter_timer.start()
+
     def le_filter_textChanged(self):
+        if self.filter_typed:
+            # Filtered by filter_timer, after the last key typed.
+            self.filter_typed = False
+            return
+        self.filter_timer.stop()
+        if self.cbb_filter_header.currentIndex() == 1:
+            self.gamelist.query(self.le_filter.text(), self.le_filter)
+            self.update_editbox()
+            return
+        if self.cbb_filter_header.currentIndex() == 2:
+            self.le_filter.setStyleSheet('')
+            self.le_filter.setToolTip('')
+            self.gamelist.filter_genre(self.le_filter.text(),
+                                       G.settings['genre_groups'])
+            self.update_editbox()
+            return
         if self.cbb_filter_header.currentIndex() == 0:
             head = None
         else:
@@ -1625,6 +1785,8 @@ class MainWindow(QtWidgets.QMainWindow, QtGui.QWindow):
         self.update_editbox()
 
     def le_filter_editingFinished(self):
+        if self.filter_timer.isActive():
+            self.le_filter_textChanged()
         text = self.le_filter.text()
         if (not text == ''
            and self.cbb_filter_history.findText(text) == -1):
@@ -1678,9 +1840,12 @@ class MainWindow(QtWidgets.QMainWindow, QtGui.QWindow):
         self.cb_filter_case.setChecked(False)
 
     def set_filter_header(self, head):
+        if head == 'query':
+            self.cbb_filter_header.setCurrentIndex(1)
+            return
         headid = self.gamelist.get_header(head)
         if headid > -1:
-            self.cbb_filter_header.setCurrentIndex(headid + 1)
+            self.cbb_filter_header.setCurrentIndex(headid + 3)
 
     def tb_toggle_editbox_clicked(self):
         if self.f_editbox.isVisible():
@@ -1710,7 +1875,8 @@ class MainWindow(QtWidgets.QMainWindow, QtGui.QWindow):
             if not self.gamelist.is_unsaved():
                 msg = ('Delete game:'
                       f'\n\n{row + 1}. {name}'
-                      '\n\nRemoving an entire game entry cannot be reverted.'
+                      '\n\nRemoving an entire game entry can only be reverted'
+                      ' with Ctrl+Z, until the next import.'
                       ' Proceed only, if you are 100% sure to discard the'
                       ' selected row.'
                       '\nIf you accept, this message will not appear again'
@@ -1866,7 +2032,7 @@ class MainWindow(QtWidgets.QMainWindow, QtGui.QWindow):
         if index is not None:
             urlquery = self.add_urlquery_source(data)
             if not urlquery == '':
-                webbrowser.open_new_tab(urlquery)
+                open_url(urlquery)
         self.tb_search_source.setChecked(False)
 
     def tb_search_web_clicked(self):
@@ -1879,8 +2045,7 @@ class MainWindow(QtWidgets.QMainWindow, QtGui.QWindow):
             query += self.add_query(data, 'developer')
             query += self.add_query(data, 'publisher')
             #query += self.add_query(data, 'desc', False)
-            query = urllib.parse.quote(query.strip())
-            webbrowser.open_new_tab(url + query)
+            open_web_search(url, query)
         self.tb_search_web.setChecked(False)
 
     def tb_search_video_clicked(self):
@@ -1890,8 +2055,7 @@ class MainWindow(QtWidgets.QMainWindow, QtGui.QWindow):
             query = 'emulation'
             query += self.add_query(data, 'image')
             query += self.add_query(data, 'name')
-            query = urllib.parse.quote(query.strip())
-            webbrowser.open_new_tab(url + query)
+            open_web_search(url, query)
         self.tb_search_video.setChecked(False)
 
     def tb_search_wiki_clicked(self):
@@ -1900,8 +2064,7 @@ class MainWindow(QtWidgets.QMainWindow, QtGui.QWindow):
         if index is not None:
             query = ''
             query += self.add_query(data, 'name')
-            query = urllib.parse.quote(query.strip())
-            webbrowser.open_new_tab(url + query)
+            open_web_search(url, query)
         self.tb_search_wiki.setChecked(False)
 
     def tb_search_games_clicked(self):
@@ -1911,8 +2074,7 @@ class MainWindow(QtWidgets.QMainWindow, QtGui.QWindow):
         if index is not None:
             query = ''
             query += self.add_query(data, 'name')
-            query = urllib.parse.quote(query.strip())
-            webbrowser.open_new_tab(url + query + url_tail)
+            open_web_search(url, query, url_tail)
         self.tb_search_games.setChecked(False)
 
     def tb_search_emulation_clicked(self):
@@ -1923,8 +2085,7 @@ class MainWindow(QtWidgets.QMainWindow, QtGui.QWindow):
         if index is not None:
             query = ''
             query += self.add_query(data, 'name')
-            query = urllib.parse.quote(query.strip())
-            webbrowser.open_new_tab(url + query + url_tail)
+            open_web_search(url, query, url_tail)
         self.tb_search_emulation.setChecked(False)
 
     def tb_search_romhacks_clicked(self):
@@ -1937,8 +2098,7 @@ class MainWindow(QtWidgets.QMainWindow, QtGui.QWindow):
             query += self.add_query(data, 'image', False)
             query += self.add_query(data, 'name', False)
             query += self.add_query(data, 'developer', False)
-            query = urllib.parse.quote(query.strip())
-            webbrowser.open_new_tab(url + query + url_tail)
+            open_web_search(url, query, url_tail)
         self.tb_search_romhacks.setChecked(False)
 
     # EXPORT TAB
@@ -2076,7 +2236,9 @@ class MainWindow(QtWidgets.QMainWindow, QtGui.QWindow):
         if file is None:
             file = self.le_export_file.text()
         file = normalize_path(file.strip())
-        allow = file != '' and self.l_current_file.text() != ''
+        allow = (file != ''
+                 and self.l_current_file.text() != ''
+                 and not self.gamelist.is_loading())
         self.set_export_format(file)
         return allow
 
@@ -2184,7 +2346,7 @@ class MainWindow(QtWidgets.QMainWindow, QtGui.QWindow):
             if self.cb_export_applyfilter.isChecked():
                 data = self.gamelist.get_filtered_tabledata()
             else:
-                data = self.gamelist.get_data()
+                data = self.gamelist.get_rows()
             file = get_path(self.le_export_file.text().strip())
             exclude = self.build_export_exclude()
             empty = self.get_remove_empty()
@@ -2228,146 +2390,60 @@ class MainWindow(QtWidgets.QMainWindow, QtGui.QWindow):
 
     def export_xml(self, data, file, export_exclude, exclude_unsupptags,
                    remove_empty, progress, indent):
+        from modules.export import looks_like_gamelist
         proceed = True
         try:
-            ElementTree.parse(file)
-        except ElementTree.ParseError:
-            msg = ('You are about to overwrite and replace a non XML file:'
-                  f' {str(file)}'
+            gamelist = looks_like_gamelist(file)
+        except Exception:
+            gamelist = True
+        if not gamelist:
+            msg = ('You are about to overwrite and replace a file, which is'
+                  f' not a gamelist: {str(file)}'
                   '\n\nDo you want continue?')
             if not msg_continue(msg, 'Warning', 'Export', self):
                 proceed = False
-        except Exception:
-            pass
 
         if proceed:
-            xml_data = self.gamelist.data_to_xml(data,
-                                                 export_exclude,
-                                                 exclude_unsupptags,
-                                                 remove_empty,
-                                                 progress,
-                                                 indent=indent)
-            try:
-                if G.settings['export'] == '/dev/null/':
-                    sys.stdout.write(
-                        self.gamelist.xml_to_string(xml_data, indent))
-                else:
-                    self.gamelist.xml_write(xml_data, file)
-            except PermissionError:
-                msg_show_error(f'Error! No permission to access: {str(file)}',
-                               'Critical')
-            except IsADirectoryError:
-                msg_show_error(f'Error! Path is a directory: {str(file)}',
-                               'Critical')
-            except OSError:
-                msg_show_error(f'Error! File cannot be saved: {str(file)}',
-                               'Critical')
-            else:
-                if file and file.exists():
-                    return True
+            return self.export_format('xml', data, file, export_exclude,
+                                      exclude_unsupptags, remove_empty,
+                                      progress, indent)
         return False
 
     def export_json(self, data, file, export_exclude, exclude_unsupptags,
                     remove_empty, progress, indent):
-        json_data = self.gamelist.data_to_json(data,
-                                               export_exclude,
-                                               exclude_unsupptags,
-                                               remove_empty,
-                                               progress,
-                                               indent=indent)
-        try:
-            if G.settings['export'] == '/dev/null/':
-                sys.stdout.write(str(json_data) + '\n')
-            else:
-                self.gamelist.json_write(json_data, file)
-        except PermissionError:
-         msg_show_error(f'Error! No permission to access: {str(file)}',
-                        'Critical')
-        except IsADirectoryError:
-            msg_show_error(f'Error! Path is a directory: {str(file)}',
-                           'Critical')
-        except OSError:
-            msg_show_error(f'Error! File cannot be saved: {str(file)}',
-                           'Critical')
-        else:
-            if file and file.exists():
-                return True
-        return False
+        return self.export_format('json', data, file, export_exclude,
+                                  exclude_unsupptags, remove_empty,
+                                  progress, indent)
 
     def export_csv(self, data, file, export_exclude, exclude_unsupptags,
                    remove_empty, progress):
-        csv_data, header = self.gamelist.data_to_csv(data,
-                                                     export_exclude,
-                                                     exclude_unsupptags,
-                                                     remove_empty,
-                                                     progress)
-        try:
-            if G.settings['export'] == '/dev/null/':
-                self.gamelist.csv_write_stdout(csv_data, header)
-            else:
-                self.gamelist.csv_write(csv_data, file, header)
-        except PermissionError:
-         msg_show_error(f'Error! No permission to access: {str(file)}',
-                        'Critical')
-        except IsADirectoryError:
-            msg_show_error(f'Error! Path is a directory: {str(file)}',
-                           'Critical')
-        except OSError:
-            msg_show_error(f'Error! File cannot be saved: {str(file)}',
-                           'Critical')
-        else:
-            if file and file.exists():
-                return True
-        return False
+        return self.export_format('csv', data, file, export_exclude,
+                                  exclude_unsupptags, remove_empty,
+                                  progress, None)
 
     def export_txt(self, data, file, export_exclude, exclude_unsupptags,
                    remove_empty, progress, indent):
-        txt_data= self.gamelist.data_to_txt(data,
-                                            export_exclude,
-                                            exclude_unsupptags,
-                                            remove_empty,
-                                            progress,
-                                            indent=indent)
-        try:
-            if G.settings['export'] == '/dev/null/':
-                sys.stdout.write('\n'.join(txt_data) + '\n')
-            else:
-                self.gamelist.txt_write(txt_data, file)
-        except PermissionError:
-         msg_show_error(f'Error! No permission to access: {str(file)}',
-                        'Critical')
-        except IsADirectoryError:
-            msg_show_error(f'Error! Path is a directory: {str(file)}',
-                           'Critical')
-        except OSError:
-            msg_show_error(f'Error! File cannot be saved: {str(file)}',
-                           'Critical')
-        else:
-            if file and file.exists():
-                return True
-        return False
+        return self.export_format('txt', data, file, export_exclude,
+                                  exclude_unsupptags, remove_empty,
+                                  progress, indent)
 
     def export_cfg(self, data, file, progress):
-        cfg_data = self.gamelist.data_to_cfg(data,
-                                             progress)
-        try:
-            if G.settings['export'] == '/dev/null/':
-                sys.stdout.write('\n'.join(cfg_data) + '\n')
-            else:
-                self.gamelist.cfg_write(cfg_data, file)
-        except PermissionError:
-         msg_show_error(f'Error! No permission to access: {str(file)}',
-                        'Critical')
-        except IsADirectoryError:
-            msg_show_error(f'Error! Path is a directory: {str(file)}',
-                           'Critical')
-        except OSError:
-            msg_show_error(f'Error! File cannot be saved: {str(file)}',
-                           'Critical')
-        else:
-            if file and file.exists():
-                return True
-        return False
+        return self.export_format('cfg', data, file, [], False, True,
+                                  progress, None)
+
+    def export_format(self, format, data, file, export_exclude,
+                      exclude_unsupptags, remove_empty, progress, indent):
+        from modules.export import export_data
+        return export_data(format,
+                           self.gamelist.model,
+                           data,
+                           file,
+                           export_exclude,
+                           exclude_unsupptags,
+                           remove_empty,
+                           progress,
+                           indent,
+                           G.settings['export'] == '/dev/null/')
 
     def cb_export_sameasopen_clicked(self, checked):
         export_file = self.sameasopen(self.le_export_file.text())
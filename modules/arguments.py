@@ -2,8 +2,6 @@
 
 import argparse
 
-from PyQt5 import QtWidgets
-
 from modules import settings as G
 
 def get_arguments():
@@ -12,6 +10,30 @@ def get_arguments():
         replaced by default values when converting to settings
         dictionary.
     """
+    return get_parser().parse_args()
+
+
+def job_count(text):
+    """ Type of --jobs, a count of at least 1 or 0 for the default. """
+    try:
+        count = int(text)
+    except ValueError:
+        count = -1
+    if count < 0:
+        raise argparse.ArgumentTypeError(
+            f'expected 0 or a positive number, got {text!r}')
+    return count
+
+
+def get_parser(list_styles=True):
+    """ Create the parser of all options.  list_styles=False leaves out the
+        window styles from help text, which need PyQt5 to look up.
+    """
+    if list_styles:
+        from PyQt5 import QtWidgets
+        styles = ", ".join(QtWidgets.QStyleFactory.keys())
+    else:
+        styles = ''
     b = '\033[1m'
     n = '\033[0m'
     parser = argparse.ArgumentParser(
@@ -20,7 +42,8 @@ def get_arguments():
         epilog=(
             f'Hotkeys: {b}HOME{n}, {b}END{n}, {b}PGUP{n}, {b}PGDOWN{n}='
             f'navigation, {b}F9{n}=toggle-filterbar, {b}F10{n}=toggle-weblinks'
-            f' {b}F11{n}=toggle-fullscreen, {b}F12{n}=toggle-editbox'),
+            f' {b}F11{n}=toggle-fullscreen, {b}F12{n}=toggle-editbox,'
+            f' {b}CTRL+Z{n}=undo, {b}CTRL+Y{n}=redo'),
         allow_abbrev=False
     )
     parser.add_argument(
@@ -209,7 +232,8 @@ def get_arguments():
         type=str,
         required=False,
         help=(f'┗ {b}edit/filter{n}: preselect a tag name to apply the'
-             ' --filter on specific columns only, such as "name" or "path"')
+             ' --filter on specific columns only, such as "name" or "path",'
+             ' or "query" to read --filter as a query like --query')
     )
     parser.add_argument(
         '-r', '--regex',
@@ -227,6 +251,16 @@ def get_arguments():
         required=False,
         help=f'┗ {b}edit/filter{n}: enable case sensitivity for filter'
     )
+    parser.add_argument(
+        '--filter-delay',
+        dest='filter_delay',
+        metavar='MS',
+        type=int,
+        required=False,
+        help=(f'┗ {b}edit/filter{n}: milliseconds to wait after the last'
+             ' key typed into the filter, before the table is filtered,'
+             ' default: 150')
+    )
     parser.add_argument(
         '--re',
         dest='re',
@@ -238,6 +272,20 @@ def get_arguments():
              ' expression related options, argument pattern is used as -f and'
              ' the options -a -r and -c are all activated')
     )
+    parser.add_argument(
+        '--query',
+        dest='query',
+        metavar='TERM',
+        nargs='+',
+        type=str,
+        required=False,
+        help=(f'┗ {b}edit/filter{n}: filter by a query of terms which all'
+             ' have to match, each either TAG:TEXT to search a tag or just'
+             ' TEXT to search all, also with the operators = != < <= > >='
+             ' for numbers and dates such as rating>=0.8 or'
+             ' lastplayed<2021-01-01, ~ for a regular expression, and'
+             ' a leading - to exclude matches, such as -hidden:true')
+    )
     parser.add_argument(
         '-s', '--sort',
         dest='sort',
@@ -399,7 +447,7 @@ def get_arguments():
         type=str,
         required=False,
         help=(f'┗ {b}ui{n}: use alternative Qt window styling, available styles'
-             f' on this system: {", ".join(QtWidgets.QStyleFactory.keys())}')
+             f' on this system: {styles}')
     )
     parser.add_argument(
         '-G', '--no-gui',
@@ -413,6 +461,77 @@ def get_arguments():
              ' all user interactions, requires --import and --export files,'
              ' also will set --apply-filter if --filter or --sort is in use')
     )
+    parser.add_argument(
+        '--batch',
+        dest='batch',
+        metavar='PATTERN',
+        type=str,
+        required=False,
+        help=(f'┗ {b}terminal{n}: like --no-gui, but for every gamelist file'
+             ' matching PATTERN instead of --import, which is a glob pattern'
+             ' ("**" matches any subdirectories) or a directory to search'
+             ' for "gamelist.xml" files recursively, each export is written'
+             ' next to its input file with the extension of --format (xml'
+             ' by default) and never overwrites the input, exitcode is "1"'
+             ' if any file failed')
+    )
+    parser.add_argument(
+        '--batch-output',
+        dest='batch_output',
+        metavar='FOLDER',
+        type=str,
+        required=False,
+        help=(f'┗ {b}terminal{n}: write exports of --batch into FOLDER,'
+             ' keeping the directory structure below the search directory')
+    )
+    parser.add_argument(
+        '--jobs',
+        dest='jobs',
+        metavar='NUM',
+        type=job_count,
+        required=False,
+        help=(f'┗ {b}terminal{n}: number of files processed in parallel by'
+             ' --batch, defaults to the number of CPUs, also with 0')
+    )
+    parser.add_argument(
+        '--no-cache',
+        dest='no_cache',
+        action='store_true',
+        default=None,
+        required=False,
+        help=(f'┗ {b}import{n}: do not read or write the cache of parsed'
+             ' gamelist files, which is otherwise reused as long as size and'
+             ' modification time of the file are unchanged')
+    )
+    parser.add_argument(
+        '--cache-hash',
+        dest='cache_hash',
+        action='store_true',
+        default=None,
+        required=False,
+        help=(f'┗ {b}import{n}: additionally compare the sha256 checksum of'
+             ' the file content before using its cache entry')
+    )
+    parser.add_argument(
+        '--startup-timings',
+        dest='startup_timings',
+        action='store_true',
+        default=None,
+        required=False,
+        help=(f'┗ {b}ui/terminal{n}: print to stderr how long each step of'
+             ' the program start took, from imports and settings up to the'
+             ' first paint of the window')
+    )
+    parser.add_argument(
+        '--column-store',
+        dest='column_store',
+        action='store_true',
+        default=None,
+        required=False,
+        help=(f'┗ {b}ui{n}: keep the games in memory by column instead'
+             ' of by row, which needs less memory and speeds up completion'
+             ' lists and genres on big gamelists')
+    )
     parser.add_argument(
         '-q', '--quiet',
         dest='quiet',
@@ -466,4 +585,4 @@ def get_arguments():
         help=(f'┗ {b}ui/terminal{n}: same as -1 or --stdout, but printing to'
              ' system stderr instead')
     )
-    return parser.parse_args()
+    return parser
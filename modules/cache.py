@@ -0,0 +1,180 @@
+#!/usr/bin/python3
+
+import os
+import gc
+import pathlib
+import hashlib
+import pickle
+import tempfile
+
+
+# Increase whenever the layout of cached data changes.  Version 2 shares
+# the strings of equal cells, see core.read_gamelist().  Version 3 drops
+# repeated supported tags instead of keeping them as unsupported tags.
+CACHE_VERSION = 3
+# Least recently used entries are removed, if any of these is exceeded.
+CACHE_MAX_ENTRIES = 64
+CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+
+def get_cache_dir(app_name='gamelistedit'):
+    """ Directory for cache files, following the XDG base directories. """
+    base = os.environ.get('XDG_CACHE_HOME')
+    if not base or not os.path.isabs(base):
+        base = pathlib.Path('~/.cache').expanduser()
+    return pathlib.Path(base) / app_name
+
+
+def hash_file(file, blocksize=1024 * 1024):
+    """ sha256 hexdigest of a files content. """
+    digest = hashlib.sha256()
+    with open(file, 'rb') as stream:
+        for block in iter(lambda: stream.read(blocksize), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class GamelistCache():
+    """ On-disk cache of decoded gamelist files.
+
+        Each imported file gets one pickle file in the cache directory,
+        named after a hash of its full path.  It stores the decoded rows,
+        unsupptags, folders and otherdata together with size and
+        modification time the source file had before it was parsed.  An
+        entry is only used if those still match, and if use_hash is True
+        also the stored sha256 of its content, which is only computed then.
+        Rows are stored with the header order they were decoded with and
+        rearranged on load, if another tag order is requested.
+    """
+    def __init__(self, directory=None, use_hash=False,
+                 max_entries=CACHE_MAX_ENTRIES, max_bytes=CACHE_MAX_BYTES):
+        self.directory = pathlib.Path(directory or get_cache_dir())
+        self.use_hash = use_hash
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+    def entry_path(self, file):
+        key = hashlib.sha1(os.fsencode(os.path.abspath(file))).hexdigest()
+        return self.directory / f'{key}.pickle'
+
+    def stat(self, file):
+        """ Identity of the source file, which a cache entry must match. """
+        stat = os.stat(file)
+        return {
+            'path': os.path.abspath(file),
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+        }
+
+    def identify(self, file):
+        """ Identity of file and its sha256 if use_hash, to be stored with
+            its entry, or None if file cannot be read.  Taken before the
+            file is parsed, so the entry of a file saved meanwhile does not
+            match it anymore.
+        """
+        try:
+            # The hash reads the whole file, so it is left out unless it
+            # is checked.  Such an entry misses once with use_hash.
+            return self.stat(file), hash_file(file) if self.use_hash else None
+        except OSError:
+            return None
+
+    def load(self, file, header):
+        """ Get cached (data, unsupptags, folders, otherdata) of file with
+            rows in order of header, or None if there is no valid entry.
+        """
+        entry = self.entry_path(file)
+        try:
+            with open(entry, 'rb') as stream:
+                meta = pickle.load(stream)
+                if (not isinstance(meta, dict)
+                or not meta.get('version') == CACHE_VERSION
+                or not meta.get('identity') == self.stat(file)
+                or (self.use_hash
+                    and not meta.get('hash') == hash_file(file))):
+                    return None
+                # Unpickling creates lots of containers at once, which
+                # would trigger the cyclic garbage collector all the time.
+                gc_enabled = gc.isenabled()
+                gc.disable()
+                try:
+                    data, unsupptags, folders, otherdata = pickle.load(stream)
+                finally:
+                    if gc_enabled:
+                        gc.enable()
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # Broken or foreign entry, will be replaced on next store.
+            self.remove(file)
+            return None
+
+        cached_header = meta['header']
+        if not set(cached_header) == set(header):
+            return None
+        if not cached_header == list(header):
+            order = [cached_header.index(tag) for tag in header]
+            data = [[row[column] for column in order] for row in data]
+        # Mark as recently used.
+        try:
+            os.utime(entry)
+        except OSError:
+            pass
+        return data, unsupptags, folders, otherdata
+
+    def store(self, file, header, data, unsupptags, folders, otherdata,
+              identity):
+        """ Write cache entry of file and evict old entries.  identity is
+            from identify() before file was parsed, nothing is stored if it
+            is None.  Errors are ignored, as the cache is optional.
+        """
+        if identity is None:
+            return False
+        try:
+            meta = {
+                'version': CACHE_VERSION,
+                'identity': identity[0],
+                'hash': identity[1],
+                'header': list(header),
+            }
+            self.directory.mkdir(parents=True, exist_ok=True)
+            fd, temp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as stream:
+                    pickle.dump(meta, stream, pickle.HIGHEST_PROTOCOL)
+                    pickle.dump((data, unsupptags, folders, otherdata),
+                                stream, pickle.HIGHEST_PROTOCOL)
+                os.replace(temp, self.entry_path(file))
+            except BaseException:
+                os.unlink(temp)
+                raise
+        except (OSError, pickle.PicklingError, RecursionError):
+            return False
+        self.evict()
+        return True
+
+    def remove(self, file):
+        try:
+            os.unlink(self.entry_path(file))
+        except OSError:
+            pass
+
+    def evict(self):
+        """ Remove least recently used entries over the limits. """
+        entries = []
+        try:
+            for entry in self.directory.glob('*.pickle'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime_ns, stat.st_size, entry))
+        except OSError:
+            return
+        entries.sort(reverse=True)
+        total = 0
+        for count, (_, size, entry) in enumerate(entries, 1):
+            total += size
+            if count > self.max_entries or total > self.max_bytes:
+                try:
+                    entry.unlink()
+                except OSError:
+                    pass
+
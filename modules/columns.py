@@ -0,0 +1,247 @@
+#!/usr/bin/python3
+
+import array
+
+
+# Table of games stored by column, as alternative to the list of row lists
+# used by default.  A whole column is scanned without touching every game
+# and there is no list object per game.  Used with option --column-store.
+
+# Array typecodes for codes of EncodedColumn with their highest code, from
+# smallest to largest.
+CODE_TYPES = [('B', 2**8 - 1), ('H', 2**16 - 1), ('L', 2**32 - 1)]
+
+
+def get_column(data, index, start=None, end=None):
+    """ All values in column index of data, which is either a ColumnStore or
+        a list of rows, or only those of rows start to end.  The column of a
+        ColumnStore must not be changed.
+    """
+    if start is not None or end is not None:
+        if isinstance(data, ColumnStore):
+            return data.column(index)[start:end]
+        return [row[index] for row in data[start:end]]
+    if isinstance(data, ColumnStore):
+        return data.column(index)
+    return [row[index] for row in data]
+
+
+def get_distinct(data, index):
+    """ Set of the different values in column index of data. """
+    if isinstance(data, ColumnStore):
+        column = data.column(index)
+        if isinstance(column, EncodedColumn):
+            return column.distinct()
+        return set(column)
+    return {row[index] for row in data}
+
+
+def get_lowercase(value, pool=None):
+    """ Lowercase text of a cell, the same object if it is lowercase
+        already.  Equal results are shared through the dict pool.
+    """
+    if not value:
+        return ''
+    lowercase = value.lower()
+    if lowercase == value:
+        return value
+    if pool is None:
+        return lowercase
+    return pool.setdefault(lowercase, lowercase)
+
+
+class EncodedColumn():
+    """ Column with few distinct values, stored as array of integer codes
+        into the list of its values.  Behaves like the list of all values.
+        The array uses the smallest typecode for the number of values.
+    """
+    def __init__(self, values=()):
+        self.values = []
+        self.codes_by_value = {}
+        self.codes = array.array(CODE_TYPES[0][0])
+        self.extend(values)
+
+    def encode(self, value):
+        """ Code of value, added as new value if needed. """
+        code = self.codes_by_value.get(value)
+        if code is None:
+            code = len(self.values)
+            self.values.append(value)
+            self.codes_by_value[value] = code
+            for typecode, highest in CODE_TYPES:
+                if code <= highest:
+                    break
+            if not typecode == self.codes.typecode:
+                self.codes = array.array(typecode, self.codes)
+        return code
+
+    def copy(self):
+        column = EncodedColumn()
+        column.values = list(self.values)
+        column.codes_by_value = dict(self.codes_by_value)
+        column.codes = array.array(self.codes.typecode, self.codes)
+        return column
+
+    def distinct(self):
+        """ Set of the values in use, found by their codes. """
+        return {self.values[code] for code in set(self.codes)}
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.values[code] for code in self.codes[index]]
+        return self.values[self.codes[index]]
+
+    def __setitem__(self, index, value):
+        code = self.encode(value)
+        self.codes[index] = code
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __iter__(self):
+        return map(self.values.__getitem__, self.codes)
+
+    def __eq__(self, other):
+        if not isinstance(other, (EncodedColumn, list)):
+            return NotImplemented
+        return list(self) == list(other)
+
+    __hash__ = None
+
+    def append(self, value):
+        code = self.encode(value)
+        self.codes.append(code)
+
+    def extend(self, values):
+        codes = [self.encode(value) for value in values]
+        self.codes.extend(codes)
+
+    def insert(self, index, value):
+        code = self.encode(value)
+        self.codes.insert(index, code)
+
+    def pop(self, index=-1):
+        return self.values[self.codes.pop(index)]
+
+
+class RowView():
+    """ Single row of a ColumnStore, reading and writing through to the
+        columns like a list of the row would do.  It refers to the row by
+        number, so after removing rows in front it points to another game.
+    """
+    __slots__ = ('store', 'index')
+
+    def __init__(self, store, index):
+        self.store = store
+        self.index = index
+
+    def __getitem__(self, column):
+        if isinstance(column, slice):
+            return list(self)[column]
+        return self.store.columns[column][self.index]
+
+    def __setitem__(self, column, value):
+        self.store.own(column)[self.index] = value
+
+    def __len__(self):
+        return len(self.store.columns)
+
+    def __iter__(self):
+        index = self.index
+        return (column[index] for column in self.store.columns)
+
+    def __eq__(self, other):
+        if not isinstance(other, (RowView, list, tuple)):
+            return NotImplemented
+        return list(self) == list(other)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f'RowView({list(self)!r})'
+
+
+class ColumnStore():
+    """ Rows of equal length stored as one list per column, or as
+        EncodedColumn for the column indexes in encoded.  Supports the part
+        of the list interface used on the data of GamelistTableModel, with
+        rows given as RowView.
+    """
+    def __init__(self, width, rows=(), encoded=()):
+        self.columns = [EncodedColumn() if index in encoded else []
+                        for index in range(width)]
+        # shared are the indexes of the columns also in a snapshot(), which
+        # are replaced by a copy before they are changed.
+        self.shared = set()
+        self.extend(rows)
+
+    def __len__(self):
+        return len(self.columns[0]) if self.columns else 0
+
+    def __getitem__(self, index):
+        length = len(self)
+        if isinstance(index, slice):
+            return [RowView(self, row)
+                    for row in range(*index.indices(length))]
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError('row index out of range')
+        return RowView(self, index)
+
+    def __iter__(self):
+        return (RowView(self, index) for index in range(len(self)))
+
+    def __eq__(self, other):
+        if isinstance(other, ColumnStore):
+            return self.columns == other.columns
+        if isinstance(other, list):
+            return self.rows() == [list(row) for row in other]
+        return NotImplemented
+
+    __hash__ = None
+
+    def append(self, row):
+        for column, value in zip(self.owned(), row):
+            column.append(value)
+
+    def extend(self, rows):
+        for column, values in zip(self.owned(), zip(*rows)):
+            column.extend(values)
+
+    def insert(self, index, row):
+        for column, value in zip(self.owned(), row):
+            column.insert(index, value)
+
+    def pop(self, index=-1):
+        return [column.pop(index) for column in self.owned()]
+
+    def column(self, index):
+        return self.columns[index]
+
+    def own(self, index):
+        """ Column index to be changed, copied first if a snapshot has it. """
+        if index in self.shared:
+            self.shared.discard(index)
+            self.columns[index] = self.columns[index].copy()
+        return self.columns[index]
+
+    def owned(self):
+        """ All columns to be changed, see own(). """
+        for index in list(self.shared):
+            self.own(index)
+        return self.columns
+
+    def snapshot(self):
+        """ Store with the columns as they are now, which later changes of
+            this one leave alone.  Columns are shared until they are
+            changed here, the snapshot itself must not be changed.
+        """
+        store = ColumnStore(0)
+        store.columns = list(self.columns)
+        self.shared = set(range(len(self.columns)))
+        return store
+
+    def rows(self):
+        """ Copy of all rows as a list of lists. """
+        return [list(row) for row in zip(*self.columns)]
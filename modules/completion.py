@@ -0,0 +1,123 @@
+#!/usr/bin/python3
+
+import bisect
+import heapq
+import itertools
+
+from modules.trigrams import TrigramIndex
+
+
+# Index of the words a text field can be completed with, so a completer
+# shows only the first few matches instead of filtering every word.  Words
+# starting with the text are found in a sorted list and words containing it
+# through a trigram index.  Case is ignored.
+
+# Number of suggestions shown by a completer.
+LIMIT = 50
+
+# Removed words kept as None in an index, before the ids are given anew.
+# At least this many, and more than the words left.
+COMPACT_MIN = 1000
+
+
+class CompletionIndex():
+    """ Distinct words with their casefolded key, sorted as entries of
+        (key, word).  Each word gets an id, its position in by_id, and is
+        indexed in trigrams by step().  Removed words are None in by_id,
+        until compact() drops them.
+    """
+    def __init__(self, words=()):
+        # Strings are sorted faster than tuples, the second sort keeps the
+        # order of words with an equal key.
+        self.by_id = sorted(words)
+        self.by_id.sort(key=str.casefold)
+        self.entries = list(zip(map(str.casefold, self.by_id), self.by_id))
+        self.ids = {word: word_id for word_id, word in enumerate(self.by_id)}
+        self.trigrams = TrigramIndex()
+        # removed is the number of None in by_id.
+        self.removed = 0
+
+    def __contains__(self, word):
+        return word in self.ids
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, word):
+        if word in self.ids:
+            return
+        bisect.insort(self.entries, (word.casefold(), word))
+        self.ids[word] = len(self.by_id)
+        self.by_id.append(word)
+
+    def remove(self, word):
+        word_id = self.ids.pop(word, None)
+        if word_id is None:
+            return
+        self.by_id[word_id] = None
+        self.removed += 1
+        position = bisect.bisect_left(self.entries, (word.casefold(), word))
+        del self.entries[position]
+        if self.removed >= COMPACT_MIN and self.removed > len(self.entries):
+            self.compact()
+
+    def compact(self):
+        """ Give the words left new ids without the removed ones.  Their
+            trigrams are indexed again by step(), as the old ones still
+            point to the removed words.
+        """
+        self.by_id = [word for _, word in self.entries]
+        self.ids = {word: word_id for word_id, word in enumerate(self.by_id)}
+        self.trigrams = TrigramIndex()
+        self.removed = 0
+
+    def step(self, count):
+        """ Index the trigrams of the next count words.  Returns False once
+            all are done.
+        """
+        done = self.trigrams.length
+        if done >= len(self.by_id):
+            return False
+        self.trigrams.extend(self.by_id[done:done + count])
+        return True
+
+    def prefixed(self, key):
+        """ Words with key at the start of their key, in order. """
+        start = bisect.bisect_left(self.entries, (key,))
+        for entry_key, word in itertools.islice(self.entries, start, None):
+            if not entry_key.startswith(key):
+                break
+            yield word
+
+    def contained(self, key, limit):
+        """ First limit words in order, with key anywhere in their key. """
+        if not key:
+            return [word for _, word in self.entries[:limit]]
+        ids = None
+        if self.trigrams.length == len(self.by_id):
+            ids = self.trigrams.search(key)
+        if ids is None:
+            # Until all words are indexed, or without a trigram in key, the
+            # words are scanned in order until enough contain key.
+            return list(itertools.islice(
+                (word for entry_key, word in self.entries
+                 if key in entry_key), limit))
+        words = (self.by_id[word_id] for word_id in ids)
+        entries = ((word.casefold(), word) for word in words if word)
+        return [word for _, word in heapq.nsmallest(
+            limit, (entry for entry in entries if key in entry[0]))]
+
+    def find(self, text, contains=False, limit=LIMIT):
+        """ Up to limit words starting with text, then those containing it
+            if contains, each in order.
+        """
+        key = text.casefold()
+        found = list(itertools.islice(self.prefixed(key), limit))
+        if contains and len(found) < limit:
+            known = set(found)
+            for word in self.contained(key, limit + len(found)):
+                if word not in known:
+                    found.append(word)
+                    if len(found) == limit:
+                        break
+        return found
@@ -0,0 +1,231 @@
+#!/usr/bin/python3
+
+import os
+import re
+import html
+import xml.etree.ElementTree as ElementTree
+
+
+# Supported tags in default order of columns.
+HEADER_LIST = [
+    'name', 'sortname', 'desc',
+    'developer', 'publisher', 'releasedate', 'players',
+    'path', 'thumbnail', 'image', 'marquee', 'video',
+    'genre', 'rating',
+    'favorite', 'hidden', 'kidgame',
+    'lastplayed', 'playcount',
+    'id', 'source'
+]
+
+# Tags with few distinct values, repeated across many games.  Equal cells
+# of these share a single string, see read_gamelist().
+ENCODED_TAGS = [
+    'developer', 'publisher', 'genre', 'source', 'players',
+    'favorite', 'hidden', 'kidgame'
+]
+
+
+def build_header(tags=None):
+    """ Create the header dict with tag:column pairs of all supported tags.
+        Valid tags from the optional list are moved to the front, in their
+        given order.
+    """
+    header_list = HEADER_LIST.copy()
+    if tags:
+        new_order = []
+        # Validate user tag.
+        for tag in tags:
+            if (tag in header_list
+            and tag not in new_order):
+                new_order.append(tag)
+        # Remove from default list, so user list can appear in front.
+        for tag in new_order:
+            if tag in header_list:
+                header_list.remove(tag)
+        header_list = new_order + header_list
+    return {key: val for val, key in enumerate(header_list)}
+
+
+def load_error_message(error, file):
+    """ Standard message text for an exception raised while loading. """
+    if isinstance(error, FileNotFoundError):
+        return f'Error! Could not find file: {str(file)}'
+    elif isinstance(error, IsADirectoryError):
+        return f'Error! Path is a directory: {str(file)}'
+    elif isinstance(error, PermissionError):
+        return f'Error! No permission to access: {str(file)}'
+    elif isinstance(error, ElementTree.ParseError):
+        return ('Error! Could not parse gamelist XML file '
+                f'{str(error.position)}: {str(file)}')
+    else:
+        return f'Error! File cannot be opened: {str(file)}'
+
+
+def iterparse_gamelist(file, progress):
+    """ Parse a gamelist file incrementally and yield each top level
+        element (game, folder, provider...) as soon as it is complete.
+
+        After the caller is done with an element, it is cleared and
+        detached from the root, so the document tree never grows.  Only
+        the elements the caller keeps a reference to stay in memory.
+        Progress is reported in bytes read from the file.
+    """
+    with open(file, 'rb') as stream:
+        progress.setRange(0, os.fstat(stream.fileno()).st_size)
+        root = None
+        depth = 0
+        for event, element in ElementTree.iterparse(stream,
+                                                    ('start', 'end')):
+            if event == 'start':
+                if root is None:
+                    root = element
+                depth += 1
+                continue
+            depth -= 1
+            if depth == 1:
+                yield element
+                if element.tag == 'game':
+                    element.clear()
+                root.clear()
+                progress.setValue(stream.tell())
+
+
+def read_gamelist(elements, header, folders, otherdata, chunk_size=1000):
+    """ Decode top level elements of a gamelist and yield the games in
+        chunks of (rows, unsupptags) lists with up to chunk_size entries.
+        Folder and any other top level elements are appended to the given
+        folders and otherdata lists.  Cells of ENCODED_TAGS with the same
+        value are the same string object.
+    """
+    rows = []
+    unsupptags = []
+    pools = [(header[tag], {}) for tag in ENCODED_TAGS if tag in header]
+    for tag in elements:
+        if tag.tag == 'game':
+            row, unsupp = decode_game(tag, header)
+            for column, pool in pools:
+                value = row[column]
+                row[column] = pool.setdefault(value, value)
+            rows.append(row)
+            unsupptags.append(unsupp)
+            if len(rows) >= chunk_size:
+                yield rows, unsupptags
+                rows = []
+                unsupptags = []
+        elif tag.tag == 'folder':
+            folders.append(tag)
+        else:
+            otherdata.append(tag)
+    if rows:
+        yield rows, unsupptags
+
+
+def decode_game(game, header):
+    """ Decode a single <game> element into a table row in one pass.
+
+        header is the tag:column dict of the table and is used as lookup
+        map, so every child element is visited exactly once.  Returns a
+        tuple of the row list and a list of unsupported child elements.
+        Tags not in header are unsupported and kept untouched, so they are
+        not lost on export.  Supported tags after their first occurrence
+        are dropped, as they would overwrite the cell of their column in
+        exports.
+    """
+    row = [''] * len(header)
+    unsupp = []
+    for key in ('id', 'source'):
+        value = game.get(key)
+        if value:
+            row[header[key]] = html.unescape(value) if '&' in value else value
+    seen = set()
+    for child in game:
+        column = header.get(child.tag)
+        if column is None:
+            unsupp.append(child)
+            continue
+        if column in seen:
+            continue
+        seen.add(column)
+        text = child.text
+        if text is not None and '&' in text:
+            text = html.unescape(text)
+        row[column] = text
+    return row, unsupp
+
+
+def load_gamelist(file, header, progress, cache=None):
+    """ Read a gamelist file from disk or cache and return the tuple
+        (data, unsupptags, folders, otherdata).  Raises OSError or
+        ElementTree.ParseError if the file cannot be read.
+    """
+    cached = cache.load(file, header) if cache else None
+    if cached:
+        return cached
+    identity = cache.identify(file) if cache else None
+    data = []
+    unsupptags = []
+    folders = []
+    otherdata = []
+    for rows, unsupp in read_gamelist(iterparse_gamelist(file, progress),
+                                      header,
+                                      folders,
+                                      otherdata):
+        data.extend(rows)
+        unsupptags.extend(unsupp)
+    if cache:
+        cache.store(file, header, data, unsupptags, folders, otherdata,
+                    identity)
+    return data, unsupptags, folders, otherdata
+
+
+class NoProgress():
+    """ Stand-in for a QProgressBar, if no progress is displayed. """
+    def setRange(self, minimum, maximum):
+        pass
+
+    def setValue(self, value):
+        pass
+
+
+class Gamelist():
+    """ Imported gamelist without any table model, view or Qt.  Has the
+        same data attributes as GamelistTableModel, so both can be used as
+        source for the export functions.
+    """
+    def __init__(self, file, tags=None, progress=None, cache=None):
+        self.header = build_header(tags)
+        (self.data,
+         self.unsupptags,
+         self.folders,
+         self.otherdata) = load_gamelist(file,
+                                         self.header,
+                                         progress or NoProgress(),
+                                         cache)
+        self.file = file
+
+
+def filter_rows(data, pattern, column=None, regex=False, case=False):
+    """ Indexes of rows with a cell containing pattern, like the filter of
+        the table view.  column limits the search to one column, otherwise
+        any column can match.  An invalid regex does not filter anything.
+    """
+    if regex:
+        flags = re.DOTALL if case else re.DOTALL | re.IGNORECASE
+        try:
+            match = re.compile(pattern, flags).search
+        except re.error:
+            return list(range(len(data)))
+    elif case:
+        match = lambda cell: pattern in cell
+    else:
+        pattern = pattern.lower()
+        match = lambda cell: pattern in cell.lower()
+
+    indexes = []
+    for index, row in enumerate(data):
+        cells = row if column is None else (row[column],)
+        for cell in cells:
+            if match('' if cell is None else cell):
+                indexes.append(index)
+                break
+    return indexes
@@ -3,10 +3,11 @@
 import sys
 import os
 
-from PyQt5 import QtWidgets, QtCore, QtGui
-
 from modules import settings as G
 
+# PyQt5 is imported inside the functions creating widgets only, so modules
+# using these helpers can run in --no-gui mode without loading Qt.
+
 
 def msg_stderr(part1, part2=None, is_critical=False):
     if (is_critical
@@ -18,24 +19,25 @@ def msg_stderr(part1, part2=None, is_critical=False):
 
 def msg_show_error(message, mode):
     """ Displays a standardized error message box. """
-    msgBox = QtWidgets.QMessageBox()
-    if mode == 'Warning':
-        msgBox.setIcon(QtWidgets.QMessageBox.Warning)
-    elif mode == 'Critical':
-        msgBox.setIcon(QtWidgets.QMessageBox.Critical)
-    elif mode == 'Information':
-        msgBox.setIcon(QtWidgets.QMessageBox.Information)
-    else:
+    if mode not in ['Warning', 'Critical', 'Information']:
         raise ValueError('Invalid value for "mode" in msg_show_error().')
-    msgBox.setWindowTitle(os.path.basename(__file__))
-    msgBox.setText(message)
-    msgBox.setStandardButtons(QtWidgets.QMessageBox.Ok)
 
     if not G.settings['silence']:
         msg_stderr(message, None, bool(mode == 'Critical'))
 
         if not G.settings['no_gui']:
             if mode == 'Critical' or not G.settings['quiet']:
+                from PyQt5 import QtWidgets
+                msgBox = QtWidgets.QMessageBox()
+                if mode == 'Warning':
+                    msgBox.setIcon(QtWidgets.QMessageBox.Warning)
+                elif mode == 'Critical':
+                    msgBox.setIcon(QtWidgets.QMessageBox.Critical)
+                elif mode == 'Information':
+                    msgBox.setIcon(QtWidgets.QMessageBox.Information)
+                msgBox.setWindowTitle(os.path.basename(__file__))
+                msgBox.setText(message)
+                msgBox.setStandardButtons(QtWidgets.QMessageBox.Ok)
                 msgBox.exec()
 
 
@@ -46,6 +48,7 @@ def msg_continue(message, mode='Question', title=None, parent=None, force=False)
         or (not force and G.settings['quiet'])
     ):
         return True
+    from PyQt5 import QtWidgets
     msgBox = QtWidgets.QMessageBox(parent) if parent else QtWidgets.QMessageBox()
     # Ask to proceed. Default is ok.
     if mode == 'Question':
@@ -88,6 +91,16 @@ def dialog_choose_file(title,
     wdir=None,
     no_gui=None):
     """ Show a standardized dialog for selecting files. """
+    # Helper argument, because settings does not exist when called from
+    # set_settings()
+    try:
+        no_gui = G.settings['no_gui']
+    except:
+        pass
+    if no_gui:
+        return None
+
+    from PyQt5 import QtWidgets
     dialog = QtWidgets.QFileDialog()
     dialog.setWindowTitle(title)
     if filetype is not None:
@@ -101,15 +114,7 @@ def dialog_choose_file(title,
     if mode == 'Save':
         dialog.setAcceptMode(QtWidgets.QFileDialog.AcceptSave)
 
-    # Helper argument, because settings does not exist when called from
-    # set_settings()
-    try:
-        no_gui = G.settings['no_gui']
-    except:
-        pass
-
-    if (not no_gui
-    and dialog.exec_() == QtWidgets.QDialog.Accepted):
+    if dialog.exec_() == QtWidgets.QDialog.Accepted:
         file = str(dialog.selectedFiles()[0])
         if mode == 'Load' and not os.path.exists(file):
             file = None
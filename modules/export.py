@@ -0,0 +1,754 @@
+#!/usr/bin/python3
+
+import os
+import re
+import sys
+import codecs
+import shutil
+import tempfile
+import contextlib
+import xml.etree.ElementTree as ElementTree
+import html
+
+from modules.dialogs import msg_show_error
+
+
+# Converters from table rows to export formats.  Each takes a source with
+# the attributes header, unsupptags, folders and otherdata, which is either
+# a GamelistTableModel or a headless core.Gamelist.  No Qt is needed here.
+# Modules for a single format (json, csv, xmltodict) are imported in
+# the functions using them, so they only load when that format is used.
+
+
+# Declaration, processing instructions, comments and doctype in front of
+# the root element of an XML file, and the start of the root element.
+XML_PROLOG = re.compile(r'(?:\s+|<\?.*?\?>|<!--.*?-->'
+                        r'|<!DOCTYPE[^\[>]*(?:\[.*?\])?\s*>)*', re.DOTALL)
+XML_ROOT = re.compile(r'<([A-Za-z_:][^\s/>]*)')
+
+
+def xmltag_to_dict(tag):
+    import xmltodict
+    return xmltodict.parse(ElementTree.tostring(tag, encoding='unicode'))
+
+
+def xml_write(data, file):
+    data.write(file, encoding='UTF-8', xml_declaration=True, method='xml')
+    return file
+
+
+def xml_to_string(data, indent):
+    xml_root = data.getroot()
+    if indent is not None:
+        xml_indent_root(xml_root, 0, indent)
+        newline = ''
+    else:
+        newline = '\n'
+    xml_root = ElementTree.tostring(xml_root, encoding='unicode')
+    return xml_root + newline
+
+
+def xml_indent_root(element, level=0, indent=4):
+    """
+        https://effbot.org/zone/element-lib.htm#prettyprint
+        2004 by Fredrik Lundh
+    """
+    spaces = indent * ' '
+    i = '\n' + level * spaces
+    if element:
+        if not element.text or not element.text.strip():
+            element.text = i + spaces
+        if not element.tail or not element.tail.strip():
+            element.tail = i
+        for element in element:
+            xml_indent_root(element, level + 1, indent)
+        if not element.tail or not element.tail.strip():
+            element.tail = i
+    else:
+        if level and (not element.tail or not element.tail.strip()):
+            element.tail = i
+    return element
+
+
+def xml_game_dict(row, header_items, export_exclude):
+    """ Escaped cells of row by tag, as written to a game element. """
+    game_dict = {}
+    for head, headid in header_items:
+        if head in export_exclude:
+            continue
+        cell = row[headid]
+        if cell is None:
+            cell = ''
+        if head in ['id', 'source']:
+            if not cell == '':
+                game_dict[head] = html.escape(cell)
+        elif head in ['favorite', 'hidden', 'kidgame']:
+            if cell in ['true', 'false']:
+                game_dict[head] = cell
+        elif not cell == '':
+            game_dict[head] = html.escape(cell)
+        else:
+            game_dict[head] = ''
+    return game_dict
+
+
+def data_to_xml(source,
+                data,
+                export_exclude,
+                exclude_unsupptags,
+                remove_empty,
+                progress,
+                indent):
+    """ Tree of data as gameList element, for the exports xml_stream
+        cannot write.
+    """
+    if not isinstance(data, list):
+        raise TypeError('Invalid data in data_to_xml()', type(data))
+    if data:
+        progress.setRange(0, len(data))
+    header_items = source.header.items()
+    header_list = list(source.header.keys())
+    unsupptags = [] if exclude_unsupptags else source.unsupptags
+    folders = source.folders
+    otherdata = source.otherdata
+
+    root = ElementTree.Element('gameList')
+    for count, row in enumerate(data, 1):
+        game_dict = xml_game_dict(row, header_items, export_exclude)
+
+        if remove_empty is False:
+            game = ElementTree.SubElement(root, 'game')
+        elif remove_empty and game_dict:
+            game = ElementTree.SubElement(root, 'game')
+        elif unsupptags or folders:
+            game = ElementTree.SubElement(root, 'game')
+
+        if game_dict:
+            for tag in header_list:
+                try:
+                    cell = game_dict[tag]
+                except KeyError:
+                    if remove_empty:
+                        continue
+                    elif tag in ['id', 'source']:
+                        game.set(tag, '')
+                    else:
+                        ElementTree.SubElement(game, tag).text = ''
+                else:
+                    if remove_empty and cell == '':
+                        continue
+                    elif tag in ['id', 'source']:
+                        game.set(tag, cell)
+                    else:
+                        ElementTree.SubElement(game, tag).text = cell
+
+        if unsupptags:
+            for tag in unsupptags[count - 1]:
+                game.append(tag)
+        progress.setValue(count)
+
+    if not exclude_unsupptags:
+        if folders:
+            root.extend(folders)
+        if otherdata:
+            root.extend(otherdata)
+    if indent is not None:
+        xml_indent_root(root, 0, indent)
+    return ElementTree.ElementTree(root)
+
+
+def xml_streamable(source, data, exclude_unsupptags):
+    """ True if xml_stream can write the unsupported tags of source.  Tags
+        and attributes with a namespace need the namespace declarations
+        ElementTree collects over the whole tree, so they are left to it.
+    """
+    if exclude_unsupptags:
+        return True
+    elements = [tag for tags in source.unsupptags[:len(data)] for tag in tags]
+    elements.extend(source.folders or [])
+    elements.extend(source.otherdata or [])
+    for element in elements:
+        for child in element.iter():
+            if not isinstance(child.tag, str) or '{' in child.tag:
+                return False
+            if any('{' in key for key in child.keys()):
+                return False
+    return True
+
+
+def xml_stream_element(write, element, level, spaces):
+    """ Serialize element without its tail like ElementTree does, with
+        the whitespace xml_indent_root would add if spaces is not None.
+        The element itself is not changed.
+    """
+    children = list(element)
+    text = element.text
+    if spaces is not None and children and (not text or not text.strip()):
+        text = '\n' + (level + 1) * spaces
+    write('<' + element.tag)
+    for key, value in element.items():
+        write(f' {key}="{ElementTree._escape_attrib(value)}"')
+    if not text and not children:
+        write(' />')
+        return
+    write('>')
+    if text:
+        write(ElementTree._escape_cdata(text))
+    last = len(children) - 1
+    for count, child in enumerate(children):
+        xml_stream_element(write, child, level + 1, spaces)
+        xml_stream_tail(write, child.tail, level if count == last
+                        else level + 1, spaces)
+    write('</' + element.tag + '>')
+
+
+def xml_stream_tail(write, tail, level, spaces):
+    """ Write tail, or the line break and indentation replacing it. """
+    if spaces is not None and (not tail or not tail.strip()):
+        tail = '\n' + level * spaces
+    if tail:
+        write(ElementTree._escape_cdata(tail))
+
+
+def xml_stream(write,
+               source,
+               data,
+               export_exclude,
+               exclude_unsupptags,
+               remove_empty,
+               progress,
+               indent):
+    """ Write data as gameList element with the function write, one game
+        after another, without building a tree first.  Output is the same
+        as from data_to_xml, including the tail of the root.
+    """
+    if data:
+        progress.setRange(0, len(data))
+    header_items = source.header.items()
+    header_list = list(source.header.keys())
+    unsupptags = [] if exclude_unsupptags else source.unsupptags
+    folders = source.folders
+    otherdata = source.otherdata
+    spaces = None if indent is None else indent * ' '
+    escape = ElementTree._escape_cdata
+    escape_attrib = ElementTree._escape_attrib
+
+    def games():
+        """ Each child of the root as a string without its tail. """
+        for count, row in enumerate(data, 1):
+            game_dict = xml_game_dict(row, header_items, export_exclude)
+            if not (remove_empty is False or (remove_empty and game_dict)
+                    or unsupptags or folders):
+                progress.setValue(count)
+                continue
+
+            attributes = []
+            tags = []
+            if game_dict:
+                for tag in header_list:
+                    cell = game_dict.get(tag)
+                    if cell is None:
+                        if remove_empty:
+                            continue
+                        cell = ''
+                    elif remove_empty and cell == '':
+                        continue
+                    if tag in ['id', 'source']:
+                        attributes.append(f' {tag}="{escape_attrib(cell)}"')
+                    else:
+                        tags.append((tag, cell))
+            others = unsupptags[count - 1] if unsupptags else []
+
+            parts = ['<game']
+            parts.extend(attributes)
+            if not tags and not others:
+                parts.append(' />')
+            else:
+                parts.append('>')
+                if spaces is not None:
+                    parts.append('\n' + 2 * spaces)
+                last = len(tags) + len(others) - 1
+                for number, (tag, cell) in enumerate(tags):
+                    if cell:
+                        parts.append(f'<{tag}>{escape(cell)}</{tag}>')
+                    else:
+                        parts.append(f'<{tag} />')
+                    if spaces is not None:
+                        parts.append('\n' + (1 if number == last else 2)
+                                     * spaces)
+                for number, tag in enumerate(others, len(tags)):
+                    xml_stream_element(parts.append, tag, 2, spaces)
+                    xml_stream_tail(parts.append, tag.tail,
+                                    1 if number == last else 2, spaces)
+                parts.append('</game>')
+            progress.setValue(count)
+            yield ''.join(parts), None
+
+        if not exclude_unsupptags:
+            for tag in (folders or []) + (otherdata or []):
+                parts = []
+                xml_stream_element(parts.append, tag, 1, spaces)
+                yield ''.join(parts), tag.tail
+
+    # A child is written when the next one is known, because the tail of
+    # the last child gets a different indentation.
+    previous = None
+    write('<gameList')
+    for child in games():
+        if previous is None:
+            write('>')
+            if spaces is not None:
+                write('\n' + spaces)
+        else:
+            write(previous[0])
+            xml_stream_tail(write, previous[1], 1, spaces)
+        previous = child
+    if previous is None:
+        write(' />')
+        return
+    write(previous[0])
+    xml_stream_tail(write, previous[1], 0, spaces)
+    write('</gameList>')
+    if spaces is not None:
+        write('\n')
+
+
+def xml_stream_write(file, *args):
+    """ Write the output of xml_stream with XML declaration to file. """
+    with open(file, 'w', encoding='UTF-8',
+              errors='xmlcharrefreplace') as xmlfile:
+        xmlfile.write("<?xml version='1.0' encoding='UTF-8'?>\n")
+        xml_stream(xmlfile.write, *args)
+    return file
+
+
+def json_write(data, file):
+    with open(file, 'w') as jsonfile:
+        jsonfile.write(data)
+    return file
+
+
+def data_to_json(source,
+                 data,
+                 export_exclude,
+                 exclude_unsupptags,
+                 remove_empty,
+                 progress,
+                 indent):
+    import json
+    if not isinstance(data, list):
+        raise TypeError('Invalid data in data_to_json()', type(data))
+    if data:
+        progress.setRange(0, len(data))
+    header_items = source.header.items()
+    header_list = list(source.header.keys())
+    unsupptags = [] if exclude_unsupptags else source.unsupptags
+    folders = source.folders
+    otherdata = source.otherdata
+
+    root = {'gameList': []}
+    for count, row in enumerate(data, 1):
+        game_dict = {}
+
+        for head, headid in header_items:
+            if head in export_exclude:
+                continue
+            cell = row[headid]
+            if cell is None:
+                cell = ''
+            if head == 'id':
+                if not cell == '':
+                    try:
+                        cell = int(cell)
+                    except ValueError:
+                        pass
+                    game_dict[head] = cell
+            elif head == 'source':
+                if not cell == '':
+                    game_dict[head] = cell
+            elif head in ['favorite', 'hidden', 'kidgame']:
+                if cell == 'true':
+                    game_dict[head] = True
+                elif cell == 'false':
+                    game_dict[head] = False
+            elif head in ['players', 'playcount']:
+                if not cell == '':
+                    try:
+                        cell = int(cell)
+                    except ValueError:
+                        pass
+                    game_dict[head] = cell
+            elif head == 'genre':
+                if not cell == '':
+                    if '/' in cell:
+                        cell = cell.split('/')
+                        cell = [cell.strip() for cell in cell]
+                    elif ',' in cell:
+                        cell = cell.split(',')
+                        cell = [cell.strip() for cell in cell]
+                    game_dict[head] = cell
+            elif head == 'rating':
+                if not cell == '':
+                    try:
+                        cell = float(cell)
+                    except ValueError:
+                        pass
+                    game_dict[head] = cell
+            elif cell is None:
+                game_dict[head] = ''
+            elif not cell == '':
+                game_dict[head] = cell
+
+        if (remove_empty
+        and game_dict == {}
+        and unsupptags == []
+        and folders is None):
+            progress.setValue(count)
+            continue
+
+        game = {}
+        if game_dict:
+            for tag in header_list:
+                try:
+                    cell = game_dict[tag]
+                except KeyError:
+                    if remove_empty:
+                        continue
+                    else:
+                        game[tag] = ''
+                else:
+                    if remove_empty and cell == '':
+                        continue
+                    else:
+                        game[tag] = cell
+
+        if unsupptags:
+            for tag in unsupptags[count - 1]:
+                game.update(xmltag_to_dict(tag))
+
+        root['gameList'].append(game)
+        progress.setValue(count)
+
+    if not exclude_unsupptags:
+        if folders:
+            for tag in folders:
+                root['gameList'].append(xmltag_to_dict(tag))
+        if otherdata:
+            for tag in otherdata:
+                root['gameList'].append(xmltag_to_dict(tag))
+    return json.dumps(root, sort_keys=False, indent=indent)
+
+
+def csv_write(data, file, header):
+    import csv
+    with open(file, 'w', newline='') as csvfile:
+        csvwriter = csv.DictWriter(csvfile,
+                                   fieldnames=header,
+                                   restval='',
+                                   extrasaction='ignore',
+                                   dialect='excel')
+        csvwriter.writeheader()
+        csvwriter.writerows(data)
+    return file
+
+
+def csv_write_stdout(data, header):
+    import csv
+    csvwriter = csv.DictWriter(sys.stdout,
+                               fieldnames=header,
+                               restval='',
+                               extrasaction='ignore',
+                               dialect='excel')
+    csvwriter.writeheader()
+    csvwriter.writerows(data)
+    return sys.stdout
+
+
+def data_to_csv(source,
+                data,
+                export_exclude,
+                exclude_unsupptags,
+                remove_empty,
+                progress):
+    if not isinstance(data, list):
+        raise TypeError('Invalid data in data_to_csv()', type(data))
+    if data:
+        progress.setRange(0, len(data))
+    header_items = source.header.items()
+    header_list = list(source.header.keys())
+    unsupptags = [] if exclude_unsupptags else source.unsupptags
+
+    root = []
+    for count, row in enumerate(data, 1):
+        game_dict = {}
+
+        for head, headid in header_items:
+            if head in export_exclude:
+                continue
+            cell = row[headid]
+            if cell is None:
+                game_dict[head] = ''
+            elif not cell == '':
+                game_dict[head] = cell
+
+        if unsupptags:
+            for tag in unsupptags[count - 1]:
+                if tag.tag not in header_list:
+                    header_list.append(tag.tag)
+                game_dict.update(xmltag_to_dict(tag))
+
+        progress.setValue(count)
+        if (remove_empty
+        and game_dict == {}
+        and unsupptags == []):
+            continue
+
+        root.append(game_dict)
+    return root, header_list
+
+
+def txt_write(data, file):
+    data = [str(line) + '\n' for line in data]
+    with open(file, 'w', newline='') as txtfile:
+        txtfile.writelines(data)
+    return file
+
+
+def data_to_txt(source,
+                data,
+                export_exclude,
+                exclude_unsupptags,
+                remove_empty,
+                progress,
+                indent):
+    if not isinstance(data, list):
+        raise TypeError('Invalid data in data_to_txt()', type(data))
+    if data:
+        progress.setRange(0, len(data))
+    header_items = source.header.items()
+    header_list = list(source.header.keys())
+    unsupptags = [] if exclude_unsupptags else source.unsupptags
+    folders = source.folders
+
+    if indent:
+        indent = str(indent * '\n')
+    else:
+        indent = ''
+
+    root = []
+    for count, row in enumerate(data, 1):
+        game_dict = {}
+
+        for head, headid in header_items:
+            if head in export_exclude:
+                continue
+
+            cell = row[headid]
+            if cell is None or cell == '':
+                game_dict[head] = ''
+            else:
+                game_dict[head] = cell
+
+        if (remove_empty
+        and game_dict == {}
+        and not unsupptags == {}):
+            progress.setValue(count)
+            continue
+
+        if unsupptags:
+            for tag in unsupptags[count - 1]:
+                if tag.tag not in header_list:
+                    header_list.append(tag.tag)
+                game_dict.update(xmltag_to_dict(tag))
+
+        game = []
+        if game_dict:
+            for tag in header_list:
+                try:
+                    cell = game_dict[tag]
+                except KeyError:
+                    if remove_empty:
+                        continue
+                    else:
+                        game.append('')
+                else:
+                    if remove_empty and cell == '':
+                        continue
+                    else:
+                        game.append(str(cell))
+
+        if indent and root and game:
+            game[0] = indent + game[0]
+        root.extend(game)
+        progress.setValue(count)
+    return root
+
+
+def cfg_write(data, file):
+    data = [str(line) + '\n' for line in data]
+    with open(file, 'w', newline='') as cfgfile:
+        cfgfile.writelines(data)
+    return file
+
+
+def data_to_cfg(source,
+                data,
+                progress):
+    if not isinstance(data, list):
+        raise TypeError('Invalid data in data_to_cfg()', type(data))
+    if data:
+        progress.setRange(0, len(data))
+    headid = source.header['path']
+
+    root = []
+    for count, row in enumerate(data, 1):
+        if not row[headid] == '' and not row[headid] is None:
+            root.append(row[headid])
+        progress.setValue(count)
+    return root
+
+
+def looks_like_gamelist(file, size=4096):
+    """ Quick check if file starts like a gamelist, by reading only its
+        first bytes.  After the declaration, comments and doctype the root
+        element has to be gameList.  If those do not end within size, the
+        declaration alone is trusted.  Raises OSError if file cannot be
+        read.
+    """
+    with open(file, 'rb') as stream:
+        head = stream.read(size)
+    for bom, encoding in ((codecs.BOM_UTF8, 'utf-8'),
+                          (codecs.BOM_UTF16_LE, 'utf-16-le'),
+                          (codecs.BOM_UTF16_BE, 'utf-16-be')):
+        if head.startswith(bom):
+            head = head[len(bom):].decode(encoding, 'ignore')
+            break
+    else:
+        head = head.decode('utf-8', 'ignore')
+    head = head.lstrip()
+    rest = head[XML_PROLOG.match(head).end():]
+    root = XML_ROOT.match(rest)
+    if root is not None:
+        return root.group(1).lower() == 'gamelist'
+    return head.startswith('<?xml') and rest.startswith('<!')
+
+
+@contextlib.contextmanager
+def atomic_path(file):
+    """ Temporary path in the directory of file to write to, which replaces
+        file only after the block finished without error.  An interrupted
+        export never leaves a partially written file behind.  Paths that
+        are not regular files, like devices and pipes, are used directly.
+        None is passed through for output to stdout.
+    """
+    if file is None:
+        yield None
+        return
+    target = os.path.realpath(file)
+    if os.path.exists(target) and not os.path.isfile(target):
+        yield file
+        return
+    directory, name = os.path.split(target)
+    try:
+        fd, temp = tempfile.mkstemp(prefix=f'.{name}.', suffix='.tmp',
+                                    dir=directory)
+    except OSError:
+        # No new files allowed in directory, the file itself might be.
+        yield file
+        return
+    os.close(fd)
+    try:
+        yield temp
+        if os.path.exists(target):
+            shutil.copymode(target, temp)
+        else:
+            # mkstemp creates files only readable by the user.
+            umask = os.umask(0)
+            os.umask(umask)
+            os.chmod(temp, 0o666 & ~umask)
+        os.replace(temp, target)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(temp)
+        raise
+
+
+def export_data(format,
+                source,
+                data,
+                file,
+                export_exclude,
+                exclude_unsupptags,
+                remove_empty,
+                progress,
+                indent,
+                stdout=False):
+    """ Convert data to format and write it to file, or print to stdout.
+        Returns True if the file was written.
+    """
+    try:
+        with atomic_path(None if stdout else file) as path:
+            if format == 'xml' and xml_streamable(source, data,
+                                                  exclude_unsupptags):
+                args = (source, data, export_exclude, exclude_unsupptags,
+                        remove_empty, progress, indent)
+                if stdout:
+                    xml_stream(sys.stdout.write, *args)
+                    if indent is None:
+                        sys.stdout.write('\n')
+                else:
+                    xml_stream_write(path, *args)
+            elif format == 'xml':
+                xml_data = data_to_xml(source, data, export_exclude,
+                                       exclude_unsupptags, remove_empty,
+                                       progress, indent)
+                if stdout:
+                    sys.stdout.write(xml_to_string(xml_data, indent))
+                else:
+                    xml_write(xml_data, path)
+            elif format == 'json':
+                json_data = data_to_json(source, data, export_exclude,
+                                         exclude_unsupptags, remove_empty,
+                                         progress, indent)
+                if stdout:
+                    sys.stdout.write(str(json_data) + '\n')
+                else:
+                    json_write(json_data, path)
+            elif format == 'csv':
+                csv_data, header = data_to_csv(source, data,
+                                               export_exclude,
+                                               exclude_unsupptags,
+                                               remove_empty, progress)
+                if stdout:
+                    csv_write_stdout(csv_data, header)
+                else:
+                    csv_write(csv_data, path, header)
+            elif format == 'txt':
+                txt_data = data_to_txt(source, data, export_exclude,
+                                       exclude_unsupptags, remove_empty,
+                                       progress, indent)
+                if stdout:
+                    sys.stdout.write('\n'.join(txt_data) + '\n')
+                else:
+                    txt_write(txt_data, path)
+            elif format == 'cfg':
+                cfg_data = data_to_cfg(source, data, progress)
+                if stdout:
+                    sys.stdout.write('\n'.join(cfg_data) + '\n')
+                else:
+                    cfg_write(cfg_data, path)
+            else:
+                raise ValueError('Unknown export format', format)
+    except PermissionError:
+        msg_show_error(f'Error! No permission to access: {str(file)}',
+                       'Critical')
+    except IsADirectoryError:
+        msg_show_error(f'Error! Path is a directory: {str(file)}',
+                       'Critical')
+    except OSError:
+        msg_show_error(f'Error! File cannot be saved: {str(file)}',
+                       'Critical')
+    else:
+        if file and file.exists():
+            return True
+    return False
@@ -1325,6 +1325,9 @@ class Ui_mainwindow(object):
         self.pb_file_progress.setTextVisible(False)
         self.pb_file_progress.setObjectName("pb_file_progress")
         self.horizontalLayout_9.addWidget(self.pb_file_progress)
+        self.tb_file_cancel = QtWidgets.QToolButton(self.centralwidget)
+        self.tb_file_cancel.setObjectName("tb_file_cancel")
+        self.horizontalLayout_9.addWidget(self.tb_file_cancel)
         self.verticalLayout.addLayout(self.horizontalLayout_9)
         mainwindow.setCentralWidget(self.centralwidget)
         self.l_edit_id.setBuddy(self.le_edit_id)
@@ -1512,3 +1515,5 @@ class Ui_mainwindow(object):
         self.l_about_app_dir.setText(_translate("mainwindow", "app_dir"))
         self.l_about_app_readme.setText(_translate("mainwindow", "app_readme"))
         self.t_tabs.setTabText(self.t_tabs.indexOf(self.tab_about), _translate("mainwindow", "About"))
+        self.tb_file_cancel.setToolTip(_translate("mainwindow", "Cancel import (Esc)"))
+        self.tb_file_cancel.setText(_translate("mainwindow", "Cancel"))
@@ -0,0 +1,123 @@
+#!/usr/bin/python3
+
+
+# Rows of each genre, kept up to date on every edit instead of scanning the
+# genre column again.  A genre value like "Action / Platform" is in the
+# genres "Action" and "Platform", or in the group "Action / Platform" as a
+# whole if groups is given, as with --genre-groups.  Rows are the positions
+# in the table, moved along when rows are inserted or removed.
+
+
+def split_genres(value, groups=False):
+    """ Genres of a genre value, or its group only if groups. """
+    if groups:
+        return [value.strip()]
+    return [genre.strip() for genre in value.split('/')]
+
+
+def has_genre(value, genre, groups=False):
+    """ Whether a genre value is in genre. """
+    return bool(value) and genre in split_genres(value, groups)
+
+
+class GenreIndex():
+    """ Rows of each distinct genre value without empty cells, and the
+        values in each genre and group.
+    """
+    def __init__(self, values=()):
+        # rows of each value, as {value: set of rows}.
+        self.rows = {}
+        # values of each genre and of each group, as {genre: set of values}.
+        self.genres = {}
+        self.groups = {}
+        # changed is True once a genre or group appeared or disappeared,
+        # until reset by whoever shows them.
+        self.changed = False
+        for row, value in enumerate(values):
+            self.add(row, value)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def add(self, row, value):
+        if not value:
+            return
+        rows = self.rows.get(value)
+        if rows is None:
+            rows = self.rows[value] = set()
+            self.link(value, True)
+        rows.add(row)
+
+    def discard(self, row, value):
+        rows = self.rows.get(value)
+        if rows is None:
+            return
+        rows.discard(row)
+        if not rows:
+            del self.rows[value]
+            self.link(value, False)
+
+    def link(self, value, add):
+        """ Add a new value to its genres and group, or remove it. """
+        for index, groups in ((self.genres, False), (self.groups, True)):
+            for genre in split_genres(value, groups):
+                values = index.get(genre)
+                if add:
+                    if values is None:
+                        values = index[genre] = set()
+                        self.changed = True
+                    values.add(value)
+                elif values is not None:
+                    values.discard(value)
+                    if not values:
+                        del index[genre]
+                        self.changed = True
+
+    def extend(self, values, start):
+        """ Add values of the rows from start on. """
+        for row, value in enumerate(values, start):
+            self.add(row, value)
+
+    def insert_row(self, position, value):
+        """ Add a row put in at position, which moves the rows after. """
+        self.shift(position, 1)
+        self.add(position, value)
+
+    def remove_row(self, position, value):
+        """ Remove the row at position, which moves the rows after. """
+        self.discard(position, value)
+        self.shift(position + 1, -1)
+
+    def shift(self, position, step):
+        """ Move the rows from position on by step. """
+        for value, rows in self.rows.items():
+            if any(row >= position for row in rows):
+                self.rows[value] = {row + step if row >= position else row
+                                    for row in rows}
+
+    def clear(self):
+        if self.rows:
+            self.changed = True
+        self.rows.clear()
+        self.genres.clear()
+        self.groups.clear()
+
+    def get_values(self, genre, groups=False):
+        return (self.groups if groups else self.genres).get(genre, ())
+
+    def get_genres(self, groups=False):
+        """ All genres or groups, sorted. """
+        return sorted(self.groups if groups else self.genres)
+
+    def get_counts(self, groups=False):
+        """ Number of rows in each genre or group. """
+        index = self.groups if groups else self.genres
+        return {genre: sum(len(self.rows[value]) for value in values)
+                for genre, values in index.items()}
+
+    def find_rows(self, genre, groups=False):
+        """ Set of rows in genre, or in the group genre if groups. """
+        rows = set()
+        for value in self.get_values(genre, groups):
+            rows.update(self.rows[value])
+        return rows
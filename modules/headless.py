@@ -0,0 +1,324 @@
+#!/usr/bin/python3
+
+import os
+import io
+import sys
+import glob
+import time
+import pathlib
+import contextlib
+import concurrent.futures
+import xml.etree.ElementTree as ElementTree
+
+from modules import settings as G
+from modules.cache import GamelistCache
+from modules.core import (Gamelist, NoProgress, filter_rows,
+                          load_error_message, build_header)
+from modules.dialogs import *
+from modules.export import export_data
+from modules.misc import run_with_default_app
+from modules.path import *
+from modules.query import Query, QueryError
+from modules.sorting import get_fallbacks, sort_rows
+
+
+# Import and export for --no-gui, without QApplication or MainWindow.  It
+# follows the steps the window does at startup and when exporting, so the
+# results are identical to the GUI with the same options.
+
+EXPORT_FORMATS = ['xml', 'json', 'csv', 'txt', 'cfg']
+
+
+def get_export_format(file, current=None):
+    """ Format from option --format or the file extension.  Unknown
+        extensions keep the current format.
+    """
+    if G.settings['export_format']:
+        format = G.settings['export_format']
+    else:
+        format = pathlib.PurePath(file).suffix.lower().replace('.', '')
+    return format if format in EXPORT_FORMATS else current
+
+
+def rename_export_ext(file, format):
+    """ Replace extension of file to match format. """
+    if file == '/dev/null/' or file == '':
+        return file
+    try:
+        path = pathlib.PurePath(file).with_suffix('')
+        path = path.with_suffix('.' + format)
+    except ValueError:
+        path = pathlib.PurePath(file)
+    if format == 'cfg' and not path.name.startswith('custom-'):
+        path = path.with_name('custom-' + path.name)
+    return str(path)
+
+
+def sameasopen(file, open_file):
+    """ Path of file, if it is the same as the imported open_file. """
+    open_file = get_path(open_file, False)
+    other_file = get_path(file)
+    if type(other_file) is pathlib.PosixPath:
+        try:
+            same = other_file.samefile(open_file)
+        except Exception:
+            same = False
+    else:
+        same = False
+    return other_file if same else None
+
+
+def load():
+    """ Import file from settings, or None if it could not be loaded. """
+    file = str(G.settings['import'])
+    gamelist = None
+    if file and os.path.exists(file):
+        if G.settings['no_cache']:
+            cache = None
+        else:
+            cache = GamelistCache(use_hash=G.settings['cache_hash'])
+        try:
+            gamelist = Gamelist(file, G.settings['tag_order'], cache=cache)
+        except (OSError, ElementTree.ParseError) as error:
+            msg_show_error(load_error_message(error, file), 'Critical')
+        else:
+            msg_stderr(f'File successfully imported: {file}')
+
+    if (G.settings['import']
+    and not os.path.exists(G.settings['import'])):
+        msg = f'Error! File does not exist: {str(G.settings["import"])}'
+        msg_show_error(msg, 'Critical')
+    return gamelist
+
+
+def check_query():
+    """ Message and False if --filter is read as a query, which is not
+        valid.
+    """
+    if G.settings['filter_by'] == 'query':
+        try:
+            Query(G.settings['filter'], build_header(G.settings['tag_order']))
+        except QueryError as error:
+            msg_show_error(f'Error! {error}', 'Critical')
+            return False
+    return True
+
+
+def get_export_data(gamelist):
+    """ Rows to export, filtered and sorted if --apply-filter is in effect. """
+    if not G.settings['export_apply_filter']:
+        return gamelist.data
+    header = gamelist.header
+    if G.settings['filter_by'] == 'query':
+        query = Query(G.settings['filter'], header)
+        indexes = query.find_rows(gamelist.data)
+    else:
+        indexes = filter_rows(gamelist.data,
+                              G.settings['filter'],
+                              header.get(G.settings['filter_by']),
+                              G.settings['filter_regex'],
+                              G.settings['filter_case'])
+    columns = [header[head] for head in G.settings['sort'] if head in header]
+    indexes = sort_rows(gamelist.data, indexes, columns, get_fallbacks(header))
+    return [gamelist.data[index] for index in indexes]
+
+
+def export_gamelist(gamelist, data, file, format, stdout=False):
+    """ Export rows data of gamelist with the export options from settings. """
+    if G.settings['indent'] is None or format in ['csv', 'cfg']:
+        indent = None
+    else:
+        indent = min(max(G.settings['indent'], 0), 16)
+    return export_data(
+        format,
+        gamelist,
+        data,
+        file,
+        [] if format == 'cfg' else G.settings['export_exclude'],
+        False if format == 'cfg' else G.settings['export_exclude_unsupptags'],
+        not G.settings['export_keep_empty'],
+        NoProgress(),
+        indent,
+        stdout)
+
+
+def run():
+    """ Import, filter, sort and export as set by the options.  Terminates
+        with exit code 2 if no import file is given, and with 1 if --filter
+        is not a valid query.
+    """
+    if G.settings['import'] == '':
+        msg = ('Error! Missing import file. --no-gui option requires'
+              ' --import with a FILE argument.'
+              '\nProgram will terminate.')
+        msg_show_error(msg, 'Critical')
+        sys.exit(2)
+    # An invalid query is reported before the file is imported.
+    if not check_query():
+        sys.exit(1)
+    gamelist = load()
+    current_file = gamelist.file if gamelist else ''
+
+    # Export file name and format, changed like the export tab of the
+    # window would do.
+    text = str(G.settings['export'])
+    format = get_export_format(normalize_path(text.strip()))
+    if G.settings['no_same'] is not None:
+        export_file = sameasopen(text, current_file)
+        if export_file:
+            text = str(export_file.with_suffix('')) + G.settings['no_same']
+            format = get_export_format(normalize_path(text.strip()), format)
+    if pathlib.PurePath(text).suffix == '':
+        format = 'xml'
+    format = get_export_format(text, format)
+    if format is not None:
+        text = rename_export_ext(text, format)
+
+    if not text or not current_file:
+        return False
+    if (sameasopen(text, current_file)
+    and G.settings['no_same'] is not None):
+        return False
+    if format is None:
+        msg_show_error(f'Error! Unknown export format: {text}', 'Critical')
+        sys.exit(1)
+
+    file = get_path(text.strip())
+    success = export_gamelist(gamelist, get_export_data(gamelist), file,
+                              format, G.settings['export'] == '/dev/null/')
+
+    if success:
+        msg_stderr(f'File successfully exported: {str(file)}')
+        G.settings['EOT_action_file'] = file
+        if G.settings['export_open']:
+            run_with_default_app(G.settings['EOT_action_file'])
+    return success
+
+
+def find_batch_files(pattern):
+    """ Gamelist files for --batch, sorted, and the root directory of them.
+        pattern is a directory searched recursively for gamelist.xml files,
+        or a glob pattern with ** for any number of subdirectories.
+    """
+    pattern = os.path.expanduser(pattern)
+    if os.path.isdir(pattern):
+        root = pathlib.Path(pattern)
+        files = root.rglob('gamelist.xml')
+    else:
+        files = glob.glob(pattern, recursive=True)
+        # Root is the part in front of the first component with wildcards.
+        parts = []
+        for part in pathlib.PurePath(pattern).parts:
+            if glob.has_magic(part):
+                break
+            parts.append(part)
+        root = pathlib.Path(*parts) if parts else pathlib.Path()
+    files = sorted({path.resolve() for path in map(pathlib.Path, files)
+                    if path.is_file()})
+    return files, root.resolve()
+
+
+def batch_output_file(file, root, output_dir, format):
+    """ Export path of file for --batch.  Same directory as the input file,
+        or mirrored from root to output_dir.  Never the input file itself.
+    """
+    if output_dir:
+        try:
+            relative = file.parent.relative_to(root)
+        except ValueError:
+            relative = pathlib.Path(file.parent.name)
+        directory = get_path(output_dir, False) / relative
+    else:
+        directory = file.parent
+    name = file.stem + '.' + format
+    if format == 'cfg' and not name.startswith('custom-'):
+        name = 'custom-' + name
+    output = directory / name
+    if output == file:
+        output = directory / (file.stem + '_export.' + format)
+    return output
+
+
+def init_batch_worker(settings):
+    """ Use settings of the main process in a worker process. """
+    G.settings.update(settings)
+
+
+def batch_worker(file, output, format):
+    """ Import and export a single file of a batch.  Returns a tuple of
+        (success, number of games, messages written to stderr).
+    """
+    messages = io.StringIO()
+    success = False
+    games = 0
+    with contextlib.redirect_stderr(messages):
+        if G.settings['no_cache']:
+            cache = None
+        else:
+            cache = GamelistCache(use_hash=G.settings['cache_hash'])
+        try:
+            gamelist = Gamelist(str(file), G.settings['tag_order'],
+                                cache=cache)
+        except (OSError, ElementTree.ParseError) as error:
+            msg_show_error(load_error_message(error, file), 'Critical')
+        else:
+            msg_stderr(f'File successfully imported: {str(file)}')
+            try:
+                output.parent.mkdir(parents=True, exist_ok=True)
+            except OSError:
+                pass
+            data = get_export_data(gamelist)
+            success = export_gamelist(gamelist, data, output, format)
+            if success:
+                msg_stderr(f'File successfully exported: {str(output)}')
+                games = len(data)
+    return success, games, messages.getvalue()
+
+
+def run_batch():
+    """ Run import, filter, sort and export on every file matched by option
+        --batch, in parallel processes.  Returns True if all succeeded.
+    """
+    start = time.perf_counter()
+    if not check_query():
+        return False
+    files, root = find_batch_files(G.settings['batch'])
+    if not files:
+        msg_show_error(f'Error! No gamelist files found: {G.settings["batch"]}',
+                       'Critical')
+        return False
+    format = G.settings['export_format'] or 'xml'
+    outputs = [batch_output_file(file, root, G.settings['batch_output'], format)
+               for file in files]
+    jobs = min(G.settings['jobs'] or os.cpu_count() or 1, len(files))
+
+    with concurrent.futures.ProcessPoolExecutor(
+            max_workers=jobs,
+            initializer=init_batch_worker,
+            initargs=(dict(G.settings),)) as pool:
+        futures = [pool.submit(batch_worker, file, output, format)
+                   for file, output in zip(files, outputs)]
+        # Messages are written in order of input files, as soon as all
+        # files before are done.
+        results = []
+        for future in futures:
+            try:
+                result = future.result()
+            except Exception as error:
+                result = (False, 0, f'Error! {error!r}\n')
+            sys.stderr.write(result[2])
+            results.append(result)
+
+    failed = [file for file, result in zip(files, results) if not result[0]]
+    exported = [output for output, result in zip(outputs, results)
+                if result[0]]
+    if exported:
+        G.settings['EOT_action_file'] = exported[-1]
+    games = sum(result[1] for result in results)
+    seconds = time.perf_counter() - start
+    msg_stderr(f'Batch finished: {len(exported)} of {len(files)} files'
+               f' exported with {games} games in {seconds:.1f} seconds',
+               None, bool(failed))
+    for file in failed:
+        msg_stderr(f'Failed: {str(file)}', None, True)
+    return not failed
@@ -1,11 +1,8 @@
 #!/usr/bin/python3
 
 import sys
-import subprocess
 import os
 
-from PyQt5 import QtWidgets
-
 from modules import settings as G
 from modules.dialogs import *
 
@@ -14,7 +11,8 @@ def frozen():
     return getattr(sys, 'frozen', False) and hasattr(sys, '_MEIPASS')
 
 
-def check_version():
+def check_version(qt=True):
+    """ Exit if Python, or Qt if qt is True, is too old. """
     error = 0
     app_minpython = G.settings['app_minpython'].split('.')
     if (sys.version_info[0] < int(app_minpython[0])
@@ -22,12 +20,14 @@ def check_version():
         print('ERROR! At least Python 3.6 is required.')
         error += 1
 
-    qt5version = QtCore.qVersion().split('.')
-    app_minqt5 = G.settings['app_minqt5'].split('.')
-    if (int(qt5version[0]) < int(app_minqt5[0])
-    or  int(qt5version[1]) < int(app_minqt5[1])):
-        print('ERROR! At least Qt5 5.9 is required.')
-        error += 1
+    if qt:
+        from PyQt5 import QtCore
+        qt5version = QtCore.qVersion().split('.')
+        app_minqt5 = G.settings['app_minqt5'].split('.')
+        if (int(qt5version[0]) < int(app_minqt5[0])
+        or  int(qt5version[1]) < int(app_minqt5[1])):
+            print('ERROR! At least Qt5 5.9 is required.')
+            error += 1
 
     if error:
         print('\nYour system does not meet the minimum requirements.')
@@ -63,6 +63,7 @@ def run_with_default_app(file):
             pass
         elif file.exists() and file.is_file():
             if sys.platform.startswith('linux'):
+                import subprocess
                 subprocess.call(["xdg-open", file])
             else:
                 os.startfile(file)  # pylint: disable=E1101
@@ -74,9 +75,23 @@ def run_with_default_app(file):
         msg_show_error(msg, 'Warning')
 
 
+def open_url(url):
+    """ Open url in a new tab of the default web browser. """
+    # Imported on first use, as webbrowser takes a while to load.
+    import webbrowser
+    webbrowser.open_new_tab(url)
+
+
+def open_web_search(url, query, url_tail=''):
+    """ Open search url with the quoted query and optional url_tail. """
+    import urllib.parse
+    open_url(url + urllib.parse.quote(query.strip()) + url_tail)
+
+
 def set_window_style(app):
     style = G.settings['window_style']
     if style:
+        from PyQt5 import QtWidgets
         all_styles = QtWidgets.QStyleFactory.keys()
         if style.lower() in [key.lower() for key in all_styles]:
             app.setStyle(style)
@@ -0,0 +1,258 @@
+#!/usr/bin/python3
+
+import re
+import shlex
+
+from modules.core import ENCODED_TAGS
+from modules.columns import get_column
+
+
+# Query language for the filter, such as
+#   genre:shooter rating>=0.8 players:2 lastplayed<2021-01-01 -hidden:true
+# Each word is a term and a game must match all terms.  A term is either
+# TAG OPERATOR VALUE or a bare text searched in any tag, with a leading -
+# to exclude the games matching it instead.  Values with spaces are put in
+# quotes, like tag:"two words".  Operators:
+#   :   contains text, or equals a number, date or boolean
+#   =   equals, != does not equal
+#   < <= > >=   compares numbers, dates or text
+#   ~   matches a regular expression
+# An empty value after : or = matches games without the tag.
+
+# Tags compared by value instead of as text.
+NUMBER_TAGS = ['rating', 'players', 'playcount']
+DATE_TAGS = ['releasedate', 'lastplayed']
+BOOLEAN_TAGS = ['favorite', 'hidden', 'kidgame']
+
+BOOLEANS = {'true': True, 'yes': True, '1': True,
+            'false': False, 'no': False, '0': False}
+
+TERM = re.compile(r'([A-Za-z]+)(<=|>=|!=|<|>|=|:|~)(.*)', re.DOTALL)
+NUMBER = re.compile(r'\d+(?:\.\d+)?')
+DATE_SEPARATORS = re.compile(r'[-/:.T ]')
+
+# Relative cost of a test on a single cell, terms are evaluated from the
+# cheapest to the most expensive one.  Tests on tags in ENCODED_TAGS are
+# done once per distinct value.
+COSTS = {'boolean': 1, 'number': 2, 'date': 2, 'empty': 1,
+         'equal': 2, 'contains': 3, 'compare': 3, 'regex': 4}
+ENCODED_COST = 1
+
+# Rows tested by a term between two calls of stopped in Query.find_rows().
+STOP_STEP = 1024
+
+
+class QueryError(ValueError):
+    """ Text of a query cannot be compiled. """
+
+
+def number_range(text):
+    """ Lowest and highest number in text, such as (1, 4) for players
+        "1-4", or None if there is no number.
+    """
+    numbers = [float(number) for number in NUMBER.findall(text)]
+    if not numbers:
+        return None
+    return min(numbers), max(numbers)
+
+
+def date_digits(text):
+    """ Digits of a date without separators, "20210101T000000" and
+        "2021-01-01" both give "20210101..." to be compared as text.
+    """
+    return DATE_SEPARATORS.sub('', text)
+
+
+def compile_number(tag, operator, value):
+    try:
+        number = float(value)
+    except ValueError:
+        raise QueryError(f'"{value}" is not a number for tag {tag}')
+    # A range matches, if any number in it does.
+    tests = {
+        ':': lambda low, high: low <= number <= high,
+        '=': lambda low, high: low <= number <= high,
+        '<': lambda low, high: low < number,
+        '<=': lambda low, high: low <= number,
+        '>': lambda low, high: high > number,
+        '>=': lambda low, high: high >= number,
+    }
+    compare = tests[operator]
+
+    def test(text):
+        numbers = number_range(text)
+        return numbers is not None and compare(*numbers)
+    return test
+
+
+def compile_date(tag, operator, value):
+    digits = date_digits(value)
+    if not digits.isdigit() or not 4 <= len(digits) <= 14:
+        raise QueryError(f'"{value}" is not a date for tag {tag},'
+                         ' use YYYY, YYYY-MM or YYYY-MM-DD')
+    # Dates are compared up to the precision of the value, so
+    # releasedate:1995 matches all of the year.
+    size = len(digits)
+    tests = {
+        ':': lambda date: date == digits,
+        '=': lambda date: date == digits,
+        '<': lambda date: date < digits,
+        '<=': lambda date: date <= digits,
+        '>': lambda date: date > digits,
+        '>=': lambda date: date >= digits,
+    }
+    compare = tests[operator]
+
+    def test(text):
+        date = date_digits(text)[:size]
+        return len(date) == size and date.isdigit() and compare(date)
+    return test
+
+
+def compile_boolean(tag, operator, value):
+    if operator not in [':', '=']:
+        raise QueryError(f'Operator {operator} is not supported for tag {tag}')
+    expected = BOOLEANS.get(value.lower())
+    if expected is None:
+        raise QueryError(f'"{value}" is not true or false for tag {tag}')
+    # Games without the tag are false.
+    return lambda text: (text.lower() == 'true') == expected
+
+
+def compile_text(operator, value):
+    lower = value.lower()
+    tests = {
+        ':': lambda text: lower in text.lower(),
+        '=': lambda text: text.lower() == lower,
+        '<': lambda text: text.lower() < lower,
+        '<=': lambda text: text.lower() <= lower,
+        '>': lambda text: text.lower() > lower,
+        '>=': lambda text: text.lower() >= lower,
+    }
+    return tests[operator]
+
+
+def compile_regex(value):
+    try:
+        return re.compile(value, re.IGNORECASE | re.DOTALL).search
+    except re.error as error:
+        raise QueryError(f'Invalid regular expression "{value}": {error}')
+
+
+class Term():
+    """ Single condition of a Query on one or all columns.  test is called
+        with the text of a cell, '' for empty ones.
+    """
+    def __init__(self, columns, test, negate=False, cost=1, memo=False):
+        self.columns = columns
+        self.test = test
+        self.negate = negate
+        self.cost = cost
+        # memo remembers the result for each value, for columns with few
+        # distinct values.
+        self.memo = memo
+
+    def match(self, row):
+        test = self.test
+        found = any(test(row[column] or '') for column in self.columns)
+        return found != self.negate
+
+    def filter(self, data, rows, stopped=None):
+        """ Those of the row indexes rows in data, which match.  stopped is
+            called every STOP_STEP rows and returns True to give up, then
+            None is returned.
+        """
+        test = self.test
+        if self.memo:
+            results = {}
+
+            def test(text, test=test):
+                result = results.get(text)
+                if result is None:
+                    result = results[text] = bool(test(text))
+                return result
+        keep = not self.negate
+        found = []
+        if len(self.columns) == 1:
+            values = get_column(data, self.columns[0])
+        else:
+            columns = [get_column(data, column) for column in self.columns]
+        for start in range(0, len(rows), STOP_STEP):
+            if stopped is not None and stopped():
+                return None
+            part = rows[start:start + STOP_STEP]
+            if len(self.columns) == 1:
+                found.extend([row for row in part
+                              if bool(test(values[row] or '')) == keep])
+            else:
+                found.extend([row for row in part
+                              if any(test(values[row] or '')
+                                     for values in columns) == keep])
+        return found
+
+
+class Query():
+    """ Compiled text of the query language described above, for the
+        columns of header.  Raises QueryError, if text is not valid.
+    """
+    def __init__(self, text, header):
+        try:
+            words = shlex.split(text)
+        except ValueError as error:
+            raise QueryError(f'Invalid query: {error}')
+        terms = [self.compile_term(word, header) for word in words]
+        # Cheap terms first, so expensive ones only see the rows left.
+        self.terms = sorted(terms, key=lambda term: term.cost)
+
+    def compile_term(self, word, header):
+        negate = False
+        if word.startswith('-') and len(word) > 1:
+            negate = True
+            word = word[1:]
+        match = TERM.fullmatch(word)
+        if not match:
+            # Bare text, searched in any tag.
+            lower = word.lower()
+            return Term(list(header.values()),
+                        lambda text: lower in text.lower(),
+                        negate, COSTS['contains'] * len(header))
+        tag, operator, value = match.groups()
+        tag = tag.lower()
+        if tag not in header:
+            raise QueryError(f'Unknown tag "{tag}" in query')
+        if operator == '!=':
+            operator = '='
+            negate = not negate
+
+        if operator == '~':
+            test, kind = compile_regex(value), 'regex'
+        elif value == '' and operator in [':', '=']:
+            test, kind = (lambda text: text == ''), 'empty'
+        elif tag in BOOLEAN_TAGS:
+            test, kind = compile_boolean(tag, operator, value), 'boolean'
+        elif tag in NUMBER_TAGS:
+            test, kind = compile_number(tag, operator, value), 'number'
+        elif tag in DATE_TAGS:
+            test, kind = compile_date(tag, operator, value), 'date'
+        else:
+            test = compile_text(operator, value)
+            kind = {':': 'contains', '=': 'equal'}.get(operator, 'compare')
+        if tag in ENCODED_TAGS:
+            return Term([header[tag]], test, negate, ENCODED_COST, True)
+        return Term([header[tag]], test, negate, COSTS[kind])
+
+    def match(self, row):
+        """ True if row, a list of the cells of a game, matches. """
+        return all(term.match(row) for term in self.terms)
+
+    def find_rows(self, data, stopped=None):
+        """ Indexes of the rows in data matching, in order.  stopped is
+            called every STOP_STEP rows of each term and returns True to
+            give up, then None is returned.
+        """
+        rows = range(len(data))
+        for term in self.terms:
+            rows = term.filter(data, rows, stopped)
+            if rows is None:
+                return None
+        return list(rows)
@@ -3,7 +3,6 @@
 import sys
 import os
 import pathlib
-import inspect
 
 from modules.meta import *
 from modules.dialogs import *
@@ -63,7 +62,9 @@ def set_settings(main_path, arguments):
     settings['filter_by'] = ''
     settings['filter_regex'] = False
     settings['filter_case'] = False
+    settings['filter_delay'] = 150
     settings['re'] = False
+    settings['query'] = False
     settings['export_open'] = False
     settings['export_apply_filter'] = False
     settings['export_keep_empty'] = False
@@ -76,6 +77,13 @@ def set_settings(main_path, arguments):
     settings['fullscreen'] = False
     settings['window_style'] = ''
     settings['no_gui'] = False
+    settings['batch'] = ''
+    settings['batch_output'] = ''
+    settings['jobs'] = None
+    settings['no_cache'] = False
+    settings['cache_hash'] = False
+    settings['startup_timings'] = False
+    settings['column_store'] = False
     settings['quiet'] = False
     settings['silence'] = False
     settings['EOT_stdout'] = []
@@ -168,6 +176,9 @@ def set_settings(main_path, arguments):
         settings['filter_regex'] = True
         settings['filter_case'] = True
         settings['export_apply_filter'] = True
+    elif settings['query']:
+        settings['filter'] = ' '.join(settings['query'])
+        settings['filter_by'] = 'query'
     else:
         if settings['filter']:
             settings['filter'] = ' '.join(settings['filter'])
@@ -206,6 +217,8 @@ def set_settings(main_path, arguments):
     elif settings['ignore_copy'] == []:
         settings['ignore_copy'] = settings['lock']
 
+    if settings['batch']:
+        settings['no_gui'] = True
     if settings['no_gui']:
         if settings['export'] == '':
             settings['export'] = '/dev/null/'
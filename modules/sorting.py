@@ -0,0 +1,188 @@
+#!/usr/bin/python3
+
+import re
+
+from modules.columns import get_column
+
+
+# Sort keys of the table, for the view and for --no-gui alike.  A sort is
+# given as specs, a list of (column, descending) pairs from the least to
+# the most significant column, in the order they were clicked or given
+# with --sort.  All columns are sorted at once by a composite key, instead
+# of one sort after the other.  Keys of rows are tuples of the key of each
+# column from the most to the least significant one, compared in the
+# directions given by get_directions().
+
+# Runs of digits in a text, compared by value.  A dot between them is text,
+# so "v1.10" comes after "v1.9" like in a version number.
+NUMBER = re.compile(r'(\d+)')
+
+# A cell which is only a decimal number, such as a rating, is compared by
+# its value instead.
+DECIMAL = re.compile(r'\d+\.\d+')
+
+# Tags sorted by another tag where they are empty.
+FALLBACK_TAGS = {'sortname': 'name'}
+
+
+class LastKey():
+    """ Sort key greater than any other, for empty cells. """
+    def __lt__(self, other):
+        return False
+
+    def __gt__(self, other):
+        return other is not self
+
+
+LAST_KEY = LastKey()
+
+
+def text_key(text):
+    """ Key to sort text regardless of case, with the numbers in it by
+        value, so "game 9" comes before "Game 10".  Empty cells (None) come
+        after any text.
+    """
+    if text is None:
+        return LAST_KEY
+    if DECIMAL.fullmatch(text):
+        return ('', float(text), '')
+    parts = NUMBER.split(text.casefold())
+    for index in range(1, len(parts), 2):
+        parts[index] = int(parts[index])
+    return tuple(parts)
+
+
+def get_fallbacks(header):
+    """ FALLBACK_TAGS as {column: fallback column} for header. """
+    return {header[tag]: header[fallback]
+            for tag, fallback in FALLBACK_TAGS.items()
+            if tag in header and fallback in header}
+
+
+def significant(specs):
+    """ specs without the columns sorted again later, which do not matter
+        anymore.  Column -1 restores the original order, so it leaves out
+        all in front of it.
+    """
+    result = []
+    for column, descending in specs:
+        if column < 0:
+            result = []
+        else:
+            result = [spec for spec in result if not spec[0] == column]
+            result.append((column, descending))
+    return result
+
+
+def get_sort_columns(specs, fallbacks):
+    """ Set of columns the keys for specs are made of. """
+    columns = set()
+    for column, _ in specs:
+        columns.add(column)
+        if column in fallbacks:
+            columns.add(fallbacks[column])
+    return columns
+
+
+def column_keys(data, column, fallback=None):
+    """ text_key() of each cell in column of data, or of the cell in column
+        fallback where it is empty.  Equal cells share their key.
+    """
+    values = get_column(data, column)
+    if fallback is not None:
+        values = [value or other for value, other
+                  in zip(values, get_column(data, fallback))]
+    keys = {}
+    result = []
+    for value in values:
+        key = keys.get(value)
+        if key is None:
+            key = keys[value] = text_key(value)
+        result.append(key)
+    return result
+
+
+def get_ranks(keys, descending=False):
+    """ Position of each key of keys among the distinct keys in sort order,
+        counted from the end if descending, and the number of distinct
+        keys.
+    """
+    distinct = sorted(set(keys))
+    if descending:
+        distinct.reverse()
+    ranks = {key: rank for rank, key in enumerate(distinct)}
+    return [ranks[key] for key in keys], len(distinct)
+
+
+def sort_order(data, specs, fallbacks={}):
+    """ Indexes of all rows of data sorted by significant specs in one sort,
+        rows with equal keys in their order in data.  Returns the order and
+        the key of each row of data, as row_key() makes it.
+    """
+    directions = get_directions(specs)
+    columns = [column_keys(data, column, fallbacks.get(column))
+               for column, _ in reversed(specs)]
+    if len(columns) == 1:
+        sort_key, reverse = columns[0], directions[0]
+    else:
+        # The ranks of all columns are combined into one integer per row,
+        # which is compared much faster than the keys themselves.
+        sort_key, reverse = [0] * len(data), False
+        for keys, descending in zip(columns, directions):
+            ranks, count = get_ranks(keys, descending)
+            sort_key = [key * count + rank
+                        for key, rank in zip(sort_key, ranks)]
+    order = sorted(range(len(data)), key=sort_key.__getitem__,
+                   reverse=reverse)
+    return order, list(zip(*columns))
+
+
+def get_directions(specs):
+    """ Whether each column of the keys for specs is descending. """
+    return [descending for _, descending in reversed(specs)]
+
+
+def row_key(row, specs, fallbacks={}):
+    """ Key of row, a list of its cells, as sort_order() makes it. """
+    key = []
+    for column, _ in reversed(specs):
+        value = row[column]
+        if not value and column in fallbacks:
+            value = row[fallbacks[column]]
+        key.append(text_key(value))
+    return tuple(key)
+
+
+def compare_keys(key, other, directions):
+    """ -1, 0 or 1 if key comes before, together with or after other. """
+    for value, other_value, descending in zip(key, other, directions):
+        if value != other_value:
+            if descending:
+                return -1 if other_value < value else 1
+            return -1 if value < other_value else 1
+    return 0
+
+
+def upper_bound(keys, key, directions):
+    """ Position in the sorted list keys after all keys equal to key. """
+    low, high = 0, len(keys)
+    while low < high:
+        middle = (low + high) // 2
+        if compare_keys(key, keys[middle], directions) < 0:
+            high = middle
+        else:
+            low = middle + 1
+    return low
+
+
+def sort_rows(data, indexes, columns, fallbacks={}):
+    """ Sort row indexes ascending by all columns, the last column is the
+        primary key and former ones break ties.  Empty cells (None) come
+        last, just like in the table view.
+    """
+    specs = significant([(column, False) for column in columns])
+    if not specs:
+        return list(indexes)
+    order, _ = sort_order(data, specs, fallbacks)
+    indexes = set(indexes)
+    return [row for row in order if row in indexes]
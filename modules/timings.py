@@ -0,0 +1,56 @@
+#!/usr/bin/python3
+
+import sys
+import time
+
+
+# Durations of startup phases as (name, seconds), reported with option
+# --startup-timings.  Each phase lasts from the previous mark() to its own.
+phases = []
+_started = time.perf_counter()
+_last = _started
+
+
+def mark(name):
+    """ End the current startup phase and record its duration. """
+    global _last
+    now = time.perf_counter()
+    phases.append((name, now - _last))
+    _last = now
+
+
+def report(stream=None):
+    """ Write a table of all recorded phases and their total. """
+    if stream is None:
+        stream = sys.stderr
+    width = max([len(name) for name, _ in phases] + [len('total')])
+    stream.write('Startup timings (ms):\n')
+    for name, seconds in phases:
+        stream.write(f'  {name:<{width}} {seconds * 1000:9.1f}\n')
+    stream.write(f'  {"total":<{width}} {(_last - _started) * 1000:9.1f}\n')
+    stream.flush()
+
+
+def report_on_first_paint(app, window):
+    """ Mark phase 'first paint' and report, after window got painted the
+        first time in the event loop of app.
+    """
+    from PyQt5 import QtCore, QtWidgets
+
+    class FirstPaintFilter(QtCore.QObject):
+        def eventFilter(self, obj, event):
+            if (event.type() == QtCore.QEvent.Paint
+            and isinstance(obj, QtWidgets.QWidget)
+            and obj.window() is window):
+                app.removeEventFilter(self)
+                # Let the remaining widgets of this paint cycle finish.
+                QtCore.QTimer.singleShot(0, finish)
+            return False
+
+    def finish():
+        mark('first paint')
+        report()
+
+    # Keep a reference, otherwise the filter is garbage collected.
+    window.first_paint_filter = FirstPaintFilter(app)
+    app.installEventFilter(window.first_paint_filter)
@@ -0,0 +1,248 @@
+#!/usr/bin/python3
+
+import re
+import array
+
+
+# Index of the trigrams in a column, to find the rows containing a text
+# without matching every cell.  Used by the filter of the table.
+
+# Escape sequences of regular expressions, which stand for a single
+# character, but not the escaped letter itself.
+SINGLE_ESCAPES = set('bBdDsSwWhHvVRAzZGKXnrtfae')
+
+# Content of braces, which are a quantifier.
+QUANTIFIER = re.compile(r'[\d,\s]*\}')
+
+# Edited rows of an index, before it is cleared to be built anew.  At least
+# this many, and more than a quarter of the rows indexed.
+COMPACT_MIN = 1000
+
+
+def trigrams(text):
+    """ Set of all substrings of length 3 in text. """
+    return {text[index:index + 3] for index in range(len(text) - 2)}
+
+
+def skip_class(pattern, index):
+    """ Position after the character class starting at pattern[index]. """
+    index += 1
+    if pattern.startswith('^', index):
+        index += 1
+    if pattern.startswith(']', index):
+        index += 1
+    while index < len(pattern):
+        if pattern[index] == '\\':
+            index += 2
+        elif pattern.startswith('[:', index):
+            end = pattern.find(':]', index + 2)
+            index = index + 1 if end == -1 else end + 2
+        elif pattern[index] == ']':
+            return index + 1
+        else:
+            index += 1
+    return index
+
+
+def skip_group(pattern, index):
+    """ Position after the group starting at pattern[index], or -1 if it is
+        not closed.
+    """
+    depth = 0
+    while index < len(pattern):
+        char = pattern[index]
+        if char == '\\':
+            index += 2
+            continue
+        if char == '[':
+            index = skip_class(pattern, index)
+            continue
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+            if depth == 0:
+                return index + 1
+        index += 1
+    return -1
+
+
+def required_literals(pattern):
+    """ Strings which every match of the regular expression pattern must
+        contain.  Only plain text outside of groups, classes and
+        alternatives is found.  Anything unclear ends the search, so less
+        or none is found, but never a string a match could be without.
+    """
+    literals = []
+    run = []
+    # True if the last character of run can be made optional by a
+    # following quantifier.
+    last_literal = False
+    index = 0
+    if '\\Q' in pattern:
+        return []
+    while index < len(pattern):
+        char = pattern[index]
+        index += 1
+        if char in '?*{' and last_literal:
+            run.pop()
+        if char == '+' and last_literal or char in '?*{.^$[]})':
+            literals.append(''.join(run))
+            run = []
+            last_literal = False
+            if char == '[':
+                index = skip_class(pattern, index - 1)
+            elif char == '{':
+                match = QUANTIFIER.match(pattern, index)
+                if match:
+                    index = match.end()
+            elif char == ')':
+                # Closes a group never opened.
+                return []
+        elif char == '+':
+            last_literal = False
+        elif char == '|':
+            return []
+        elif char == '(' and pattern.startswith('?#', index):
+            # Comments are left out, a following quantifier still belongs to
+            # the character in front.
+            index = pattern.find(')', index) + 1
+            if not index:
+                return []
+        elif char == '(':
+            literals.append(''.join(run))
+            run = []
+            last_literal = False
+            # Options such as (?x) change how the rest of the pattern is
+            # read.
+            option = pattern[index + 1:index + 2]
+            if (pattern.startswith('?', index)
+            and (option.isalpha() or option in ['-', '^'])
+            and not option in ['P', 'R', 'C']):
+                break
+            index = skip_group(pattern, index - 1)
+            if index == -1:
+                return []
+        elif char == '\\':
+            escaped = pattern[index:index + 1]
+            index += 1
+            if escaped and not escaped.isalnum():
+                run.append(escaped)
+                last_literal = True
+            elif escaped in SINGLE_ESCAPES:
+                literals.append(''.join(run))
+                run = []
+                last_literal = False
+            else:
+                # Unknown escapes could also be followed by a quantifier
+                # for the character in front.
+                if last_literal:
+                    run.pop()
+                break
+        else:
+            run.append(char)
+            last_literal = True
+    else:
+        index = len(pattern)
+    # The rest after an early stop could still be an alternative to all.
+    if '|' in pattern[index:]:
+        return []
+    literals.append(''.join(run))
+    return [literal for literal in literals if literal]
+
+
+class TrigramIndex():
+    """ Inverted index from each trigram of the casefolded values of a
+        column to the rows containing it.  Rows are added in order, the
+        first length rows are indexed, with an array of rows as postings
+        of each trigram.  Edited rows are in edits instead, a set of rows
+        for each trigram of their current value.  Their former value is
+        still in postings, so a search may find rows which do not contain
+        the text anymore, but never misses one.
+    """
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.postings = {}
+        # edits are the edited rows of each trigram, and edited the
+        # trigrams of each edited row, as sets.
+        self.edits = {}
+        self.edited = {}
+        self.length = 0
+
+    def extend(self, values):
+        """ Index values of the rows following the indexed ones. """
+        start = self.length
+        postings = self.postings
+        for row, value in enumerate(values, start):
+            if value:
+                for trigram in trigrams(value.casefold()):
+                    rows = postings.get(trigram)
+                    if rows is None:
+                        postings[trigram] = rows = array.array('I')
+                    rows.append(row)
+        self.length = start + len(values)
+
+    def edit(self, row, value):
+        """ Index the new value of an already indexed row, in place of the
+            value of its last edit.  Returns False, if the index was
+            cleared instead, as it had too many edited rows.
+        """
+        edits = self.edits
+        for trigram in self.edited.pop(row, ()):
+            rows = edits[trigram]
+            rows.discard(row)
+            if not rows:
+                del edits[trigram]
+        found = trigrams(value.casefold()) if value else set()
+        self.edited[row] = found
+        for trigram in found:
+            rows = edits.get(trigram)
+            if rows is None:
+                edits[trigram] = rows = set()
+            rows.add(row)
+        if (len(self.edited) >= COMPACT_MIN
+        and len(self.edited) * 4 > self.length):
+            self.clear()
+            return False
+        return True
+
+    def view(self):
+        """ Index of the rows indexed now, to be searched in another thread.
+            clear() starts new postings and edits, so it finds all rows it
+            would find now, maybe with rows indexed later.  Rows edited
+            later may be missed, they have to be matched again anyway.
+        """
+        view = TrigramIndex()
+        view.postings = self.postings
+        view.edits = self.edits
+        view.edited = self.edited
+        view.length = self.length
+        return view
+
+    def search(self, text):
+        """ Set of indexed rows, which may contain text in any case.  None
+            if text is too short to be looked up.
+        """
+        found = trigrams(text.casefold())
+        if not found:
+            return None
+        postings = sorted(((self.postings.get(trigram, ()),
+                            self.edits.get(trigram, ()))
+                           for trigram in found),
+                          key=lambda pair: len(pair[0]) + len(pair[1]))
+        rows = set(postings[0][0])
+        rows.update(postings[0][1])
+        for indexed, edited in postings[1:]:
+            # Few rows are matched faster than long lists of common
+            # trigrams are read.
+            if len(indexed) + len(edited) > 8 * len(rows):
+                break
+            if edited:
+                other = set(indexed)
+                other.update(edited)
+                rows &= other
+            else:
+                rows.intersection_update(indexed)
+        return rows
@@ -0,0 +1,105 @@
+#!/usr/bin/python3
+
+import collections
+
+from modules.completion import CompletionIndex, LIMIT
+
+
+# Distinct values of a column with the number of rows having each, kept up
+# to date on every edit instead of scanning the column again.  Used for the
+# words of the completers, which only change when a value appears or
+# disappears.
+
+
+class WordCounts():
+    """ Number of rows with each value of a column, without empty cells.
+        Each set in watchers collects the values, which might have been
+        added or removed.
+    """
+    def __init__(self, values=()):
+        self.counts = dict(collections.Counter(values))
+        self.counts.pop('', None)
+        self.counts.pop(None, None)
+        self.watchers = []
+
+    def __contains__(self, value):
+        return value in self.counts
+
+    def __len__(self):
+        return len(self.counts)
+
+    def __iter__(self):
+        return iter(self.counts)
+
+    def add(self, value):
+        if not value:
+            return
+        count = self.counts.get(value, 0)
+        self.counts[value] = count + 1
+        if not count:
+            for changed in self.watchers:
+                changed.add(value)
+
+    def discard(self, value):
+        count = self.counts.get(value)
+        if count is None:
+            return
+        if count > 1:
+            self.counts[value] = count - 1
+        else:
+            del self.counts[value]
+            for changed in self.watchers:
+                changed.add(value)
+
+    def extend(self, values):
+        for value in values:
+            self.add(value)
+
+    def clear(self):
+        for changed in self.watchers:
+            changed.update(self.counts)
+        self.counts.clear()
+
+
+class WordList():
+    """ Distinct values of several WordCounts in a CompletionIndex, for a
+        completer.  model, a QStringListModel, shows the words found for
+        the text given to complete().
+    """
+    def __init__(self, counts, model, contains=False, limit=LIMIT):
+        self.counts = counts
+        # changed are the values added to or removed from counts since.
+        self.changed = set()
+        for column in counts:
+            column.watchers.append(self.changed)
+        self.index = CompletionIndex(set().union(*counts))
+        self.model = model
+        self.contains = contains
+        self.limit = limit
+        self.text = ''
+
+    def close(self):
+        """ Stop watching counts. """
+        for column in self.counts:
+            column.watchers = [changed for changed in column.watchers
+                               if changed is not self.changed]
+
+    def complete(self, text):
+        """ Show the words for text in model. """
+        self.text = text
+        self.model.setStringList(
+            self.index.find(text, self.contains, self.limit))
+
+    def update(self):
+        """ Add or remove the values changed since, depending on whether any
+            of the WordCounts still has them.
+        """
+        if not self.changed:
+            return
+        for value in self.changed:
+            if any(value in counts for counts in self.counts):
+                self.index.add(value)
+            else:
+                self.index.remove(value)
+        self.changed.clear()
+        self.complete(self.text)
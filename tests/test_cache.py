@@ -0,0 +1,119 @@
+#!/usr/bin/python3
+
+""" Tests of modules.cache.  Run from the project root:
+
+        python3 -m unittest discover -s tests -t .
+"""
+
+import os
+import tempfile
+import unittest
+
+from modules.cache import GamelistCache
+from modules.core import NoProgress, build_header, load_gamelist
+
+
+GAMELIST = b'''<?xml version="1.0"?>
+<gameList>
+    <game><path>./a.zip</path><name>A</name><region>eu</region></game>
+    <game><path>./b.zip</path><name>B</name></game>
+    <folder><path>./f</path></folder>
+</gameList>
+'''
+
+
+class GamelistCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.file = os.path.join(self.directory, 'gamelist.xml')
+        self.write(GAMELIST)
+        self.header = build_header()
+
+    def write(self, content, mtime_ns=None):
+        with open(self.file, 'wb') as stream:
+            stream.write(content)
+        if mtime_ns is not None:
+            os.utime(self.file, ns=(mtime_ns, mtime_ns))
+
+    def cache(self, use_hash=False):
+        return GamelistCache(os.path.join(self.directory, 'cache'), use_hash)
+
+    def load(self, cache, header=None):
+        return load_gamelist(self.file, header or self.header, NoProgress(),
+                             cache)
+
+    def test_store_and_load(self):
+        cache = self.cache()
+        self.assertIsNone(cache.load(self.file, self.header))
+        data, unsupptags, folders, otherdata = self.load(cache)
+        cached = cache.load(self.file, self.header)
+        self.assertIsNotNone(cached)
+        self.assertEqual(cached[0], data)
+        self.assertEqual([[tag.tag for tag in tags] for tags in cached[1]],
+                         [['region'], []])
+        self.assertEqual([tag.find('path').text for tag in cached[2]],
+                         ['./f'])
+        self.assertEqual(cached[3], [])
+
+    def test_other_tag_order(self):
+        cache = self.cache()
+        self.load(cache)
+        header = build_header(['path', 'name'])
+        data = cache.load(self.file, header)[0]
+        self.assertEqual([row[:2] for row in data],
+                         [['./a.zip', 'A'], ['./b.zip', 'B']])
+
+    def test_changed_file_is_invalid(self):
+        cache = self.cache()
+        self.load(cache)
+        self.write(GAMELIST.replace(b'<name>B</name>', b'<name>BB</name>'))
+        self.assertIsNone(cache.load(self.file, self.header))
+        data = self.load(cache)[0]
+        self.assertEqual(data[1][self.header['name']], 'BB')
+        self.assertEqual(cache.load(self.file, self.header)[0], data)
+
+    def test_file_saved_while_parsed(self):
+        cache = self.cache()
+        identity = cache.identify(self.file)
+        data, unsupptags, folders, otherdata = self.load(None)
+        self.write(GAMELIST.replace(b'<name>B</name>', b'<name>BB</name>'))
+        cache.store(self.file, self.header, data, unsupptags, folders,
+                    otherdata, identity)
+        self.assertIsNone(cache.load(self.file, self.header))
+
+    def test_missing_file_is_not_stored(self):
+        cache = self.cache()
+        self.assertIsNone(cache.identify(self.file + '.missing'))
+        self.assertFalse(cache.store(self.file, self.header, [], [], [], [],
+                                     None))
+
+    def test_hash(self):
+        # Same size and modification time, only the content differs.
+        mtime_ns = os.stat(self.file).st_mtime_ns
+        self.load(self.cache(use_hash=True))
+        self.write(GAMELIST.replace(b'<name>B</name>', b'<name>C</name>'),
+                   mtime_ns)
+        self.assertIsNotNone(self.cache().load(self.file, self.header))
+        self.assertIsNone(self.cache(True).load(self.file, self.header))
+
+    def test_entry_without_hash_misses_once(self):
+        self.load(self.cache())
+        cache = self.cache(use_hash=True)
+        self.assertIsNone(cache.load(self.file, self.header))
+        self.load(cache)
+        self.assertIsNotNone(cache.load(self.file, self.header))
+
+    def test_broken_entry(self):
+        cache = self.cache()
+        self.load(cache)
+        with open(cache.entry_path(self.file), 'wb') as stream:
+            stream.write(b'broken')
+        self.assertIsNone(cache.load(self.file, self.header))
+        self.assertFalse(os.path.exists(cache.entry_path(self.file)))
+
+
+if __name__ == '__main__':
+    unittest.main()
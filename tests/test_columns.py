@@ -0,0 +1,155 @@
+#!/usr/bin/python3
+
+""" Tests of modules.columns.  Run from the project root:
+
+        python3 -m unittest discover -s tests -t .
+"""
+
+import array
+import unittest
+
+from modules.columns import (ColumnStore, EncodedColumn, RowView, get_column,
+                             get_distinct, get_lowercase)
+
+
+ROWS = [
+    ['Sonic', 'Sega', '1'],
+    ['Mario', 'Nintendo', '2'],
+    ['Zelda', 'Nintendo', None],
+]
+
+
+class EncodedColumnTest(unittest.TestCase):
+
+    def test_list_interface(self):
+        column = EncodedColumn(['a', 'b', 'a', None])
+        self.assertEqual(list(column), ['a', 'b', 'a', None])
+        self.assertEqual(len(column), 4)
+        self.assertEqual(column[1], 'b')
+        self.assertEqual(column[-1], None)
+        self.assertEqual(column[1:3], ['b', 'a'])
+        column[0] = 'c'
+        column.append('b')
+        column.insert(0, 'd')
+        self.assertEqual(column.pop(), 'b')
+        self.assertEqual(column.pop(0), 'd')
+        self.assertEqual(column, ['c', 'b', 'a', None])
+        self.assertEqual(column, EncodedColumn(['c', 'b', 'a', None]))
+
+    def test_values_are_stored_once(self):
+        column = EncodedColumn(['a', 'b'] * 100)
+        self.assertEqual(column.values, ['a', 'b'])
+        self.assertEqual(column.codes.typecode, 'B')
+        self.assertEqual(column.distinct(), {'a', 'b'})
+        # Values no cell has anymore are not distinct.
+        column[1] = 'a'
+        column[3] = 'a'
+        self.assertEqual(column.distinct(), {'a', 'b'})
+        column.codes = array.array('B', [0] * len(column))
+        self.assertEqual(column.distinct(), {'a'})
+
+    def test_larger_codes(self):
+        column = EncodedColumn(str(number) for number in range(300))
+        self.assertEqual(column.codes.typecode, 'H')
+        self.assertEqual(list(column), [str(number) for number in range(300)])
+
+    def test_copy(self):
+        column = EncodedColumn(['a', 'b'])
+        other = column.copy()
+        other[0] = 'c'
+        self.assertEqual(column, ['a', 'b'])
+        self.assertEqual(other, ['c', 'b'])
+
+
+class ColumnStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.store = ColumnStore(3, ROWS, encoded=[1])
+
+    def test_rows(self):
+        self.assertEqual(len(self.store), 3)
+        self.assertIsInstance(self.store.column(1), EncodedColumn)
+        self.assertEqual(self.store.rows(), ROWS)
+        self.assertEqual(self.store, ROWS)
+        self.assertEqual([list(row) for row in self.store], ROWS)
+        self.assertEqual(self.store[-1], ROWS[-1])
+        self.assertEqual(self.store[1:], ROWS[1:])
+        with self.assertRaises(IndexError):
+            self.store[3]
+        self.assertEqual(len(ColumnStore(3)), 0)
+
+    def test_row_view(self):
+        row = self.store[1]
+        self.assertIsInstance(row, RowView)
+        self.assertEqual(len(row), 3)
+        self.assertEqual(row[0], 'Mario')
+        self.assertEqual(row[:2], ['Mario', 'Nintendo'])
+        row[2] = '4'
+        self.assertEqual(self.store.column(2)[1], '4')
+        self.assertEqual(row, ['Mario', 'Nintendo', '4'])
+        self.assertEqual(repr(row), "RowView(['Mario', 'Nintendo', '4'])")
+        # A view refers to the row by number.
+        self.store.pop(0)
+        self.assertEqual(row[0], 'Zelda')
+
+    def test_get_column(self):
+        for data in (ROWS, self.store):
+            with self.subTest(data=type(data).__name__):
+                self.assertEqual(list(get_column(data, 0)),
+                                 ['Sonic', 'Mario', 'Zelda'])
+                self.assertEqual(get_column(data, 1, 1, 3),
+                                 ['Nintendo', 'Nintendo'])
+                self.assertEqual(get_distinct(data, 1), {'Sega', 'Nintendo'})
+
+    def test_get_lowercase(self):
+        pool = {}
+        self.assertEqual(get_lowercase(None), '')
+        value = 'sonic'
+        self.assertIs(get_lowercase(value), value)
+        first = get_lowercase('Sonic', pool)
+        self.assertEqual(first, 'sonic')
+        self.assertIs(get_lowercase('SONIC', pool), first)
+
+
+class SnapshotTest(unittest.TestCase):
+
+    def setUp(self):
+        self.store = ColumnStore(3, ROWS, encoded=[1])
+        self.snapshot = self.store.snapshot()
+
+    def test_columns_are_shared(self):
+        for column, other in zip(self.store.columns, self.snapshot.columns):
+            self.assertIs(column, other)
+
+    def test_edit_copies_only_its_column(self):
+        self.store[1][1] = 'Capcom'
+        self.store[2][0] = 'Link'
+        self.assertEqual(self.store.rows(),
+                         [['Sonic', 'Sega', '1'],
+                          ['Mario', 'Capcom', '2'],
+                          ['Link', 'Nintendo', None]])
+        self.assertEqual(self.snapshot.rows(), ROWS)
+        self.assertIs(self.store.columns[2], self.snapshot.columns[2])
+        # Once copied, a column is changed in place.
+        column = self.store.columns[0]
+        self.store[0][0] = 'Tails'
+        self.assertIs(self.store.columns[0], column)
+
+    def test_rows_added_and_removed(self):
+        self.store.append(['Kirby', 'Nintendo', '1'])
+        self.store.insert(0, ['Pong', 'Atari', '2'])
+        self.assertEqual(self.store.pop(1), ROWS[0])
+        self.assertEqual(len(self.store), 4)
+        self.assertEqual(self.snapshot.rows(), ROWS)
+
+    def test_new_snapshot(self):
+        self.store[0][0] = 'Tails'
+        second = self.store.snapshot()
+        self.store[0][0] = 'Knuckles'
+        self.assertEqual(self.snapshot[0][0], 'Sonic')
+        self.assertEqual(second[0][0], 'Tails')
+        self.assertEqual(self.store[0][0], 'Knuckles')
+
+
+if __name__ == '__main__':
+    unittest.main()
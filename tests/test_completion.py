@@ -0,0 +1,122 @@
+#!/usr/bin/python3
+
+""" Tests of modules.completion.  Run from the project root:
+
+        python3 -m unittest discover -s tests -t .
+"""
+
+import unittest
+
+from modules.completion import COMPACT_MIN, CompletionIndex
+
+
+WORDS = ['Super Mario', 'mario kart', 'Dr. Mario', 'Zelda', 'Metroid',
+         'MARIO Party', 'Paper Mario']
+
+
+def complete(index, text, limit):
+    """ find() done without the index. """
+    key = text.casefold()
+    words = sorted(index.ids, key=lambda word: (word.casefold(), word))
+    found = [word for word in words if word.casefold().startswith(key)]
+    found += [word for word in words
+              if key in word.casefold() and word not in found]
+    return found[:limit]
+
+
+class CompletionIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.index = CompletionIndex(WORDS)
+
+    def index_all(self):
+        while self.index.step(2):
+            pass
+
+    def test_prefix(self):
+        self.assertEqual(self.index.find('mario'),
+                         ['mario kart', 'MARIO Party'])
+        self.assertEqual(self.index.find('M'),
+                         ['mario kart', 'MARIO Party', 'Metroid'])
+        self.assertEqual(self.index.find('x'), [])
+        self.assertEqual(self.index.find('', limit=2),
+                         ['Dr. Mario', 'mario kart'])
+        self.assertEqual(len(self.index.find('')), len(WORDS))
+
+    def test_contains(self):
+        for indexed in [False, True]:
+            if indexed:
+                self.index_all()
+            with self.subTest(indexed=indexed):
+                self.assertEqual(self.index.find('mario', True),
+                                 ['mario kart', 'MARIO Party', 'Dr. Mario',
+                                  'Paper Mario', 'Super Mario'])
+                self.assertEqual(self.index.find('ar', True),
+                                 ['Dr. Mario', 'mario kart', 'MARIO Party',
+                                  'Paper Mario', 'Super Mario'])
+                self.assertEqual(self.index.find('mario', True, 3),
+                                 ['mario kart', 'MARIO Party', 'Dr. Mario'])
+                self.assertEqual(self.index.find('', True, 2),
+                                 ['Dr. Mario', 'mario kart'])
+
+    def test_step(self):
+        self.assertTrue(self.index.step(5))
+        self.assertEqual(self.index.trigrams.length, 5)
+        self.assertTrue(self.index.step(5))
+        self.assertEqual(self.index.trigrams.length, len(WORDS))
+        self.assertFalse(self.index.step(5))
+
+    def test_add_and_remove(self):
+        self.index_all()
+        self.index.add('Mario Golf')
+        self.index.add('Mario Golf')
+        self.index.remove('mario kart')
+        self.index.remove('Sonic')
+        self.assertEqual(len(self.index), len(WORDS))
+        self.assertIn('Mario Golf', self.index)
+        self.assertNotIn('mario kart', self.index)
+        self.assertEqual(self.index.find('ario', True),
+                         ['Dr. Mario', 'Mario Golf', 'MARIO Party',
+                          'Paper Mario', 'Super Mario'])
+        self.assertTrue(self.index.step(10))
+        self.assertEqual(self.index.find('golf', True), ['Mario Golf'])
+
+    def test_compact(self):
+        index = CompletionIndex(f'game {number}'
+                                for number in range(2 * COMPACT_MIN))
+        while index.step(500):
+            pass
+        for number in range(COMPACT_MIN, 2 * COMPACT_MIN):
+            index.remove(f'game {number}')
+        self.assertEqual(index.removed, COMPACT_MIN)
+        self.assertEqual(len(index.by_id), 2 * COMPACT_MIN)
+        index.remove('game 0')
+        # The removed words are dropped, and have to be indexed again.
+        self.assertEqual(index.removed, 0)
+        self.assertEqual(len(index.by_id), COMPACT_MIN - 1)
+        self.assertEqual(index.trigrams.length, 0)
+        self.assertEqual(index.find('me 99', True, 3),
+                         ['game 99', 'game 990', 'game 991'])
+        while index.step(500):
+            pass
+        self.assertEqual(index.find('me 99', True, 3),
+                         ['game 99', 'game 990', 'game 991'])
+        self.assertEqual(index.find('e 1', True, 3),
+                         ['game 1', 'game 10', 'game 100'])
+
+    def test_same_as_scanning_words(self):
+        words = [f'{first} {second}' for first in ['Mario', 'zelda', 'MARIO']
+                 for second in range(30)]
+        self.index = CompletionIndex(words)
+        self.index_all()
+        for word in words[::3]:
+            self.index.remove(word)
+        for text in ['mario', 'ario 1', 'a 2', 'o 29', 'ZEL', '']:
+            for limit in [1, 5, 50]:
+                with self.subTest(text=text, limit=limit):
+                    self.assertEqual(self.index.find(text, True, limit),
+                                     complete(self.index, text, limit))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+#!/usr/bin/python3
+
+""" Tests of modules.core.  Run from the project root:
+
+        python3 -m unittest discover -s tests -t .
+"""
+
+import json
+import os
+import tempfile
+import unittest
+import xml.etree.ElementTree as ElementTree
+
+from modules.core import (ENCODED_TAGS, Gamelist, NoProgress, build_header,
+                          decode_game, read_gamelist)
+from modules.export import data_to_csv, data_to_json, data_to_txt, xml_stream
+
+
+REPEATED = b'''<?xml version="1.0"?>
+<gameList>
+    <game id="7">
+        <path>./real.zip</path>
+        <name>Real</name>
+        <region>eu</region>
+        <name>Dup</name>
+        <lang>en</lang>
+    </game>
+</gameList>
+'''
+
+
+class DecodeGameTest(unittest.TestCase):
+
+    def setUp(self):
+        self.header = build_header()
+
+    def decode(self, text):
+        return decode_game(ElementTree.fromstring(text), self.header)
+
+    def test_cells(self):
+        row, unsupp = self.decode(
+            '<game id="1" source="S &amp;amp; S"><name>A &amp;amp; B</name>'
+            '<desc /></game>')
+        self.assertEqual(row[self.header['name']], 'A & B')
+        self.assertEqual(row[self.header['source']], 'S & S')
+        self.assertIsNone(row[self.header['desc']])
+        self.assertEqual(row[self.header['genre']], '')
+        self.assertEqual(unsupp, [])
+
+    def test_unsupported_tags_are_kept_in_order(self):
+        row, unsupp = self.decode(
+            '<game><region>eu</region><name>A</name>'
+            '<lang><code>en</code></lang></game>')
+        self.assertEqual([tag.tag for tag in unsupp], ['region', 'lang'])
+        # Children of unsupported tags are not columns.
+        self.assertNotIn('code', self.header)
+
+    def test_repeated_tag_is_dropped(self):
+        row, unsupp = self.decode(
+            '<game><name>Real</name><name>Dup</name><region>eu</region>'
+            '</game>')
+        self.assertEqual(row[self.header['name']], 'Real')
+        self.assertEqual([tag.tag for tag in unsupp], ['region'])
+
+
+class ReadGamelistTest(unittest.TestCase):
+
+    def test_chunks_and_shared_strings(self):
+        header = build_header()
+        games = ''.join(f'<game><name>Game {number}</name>'
+                        f'<developer>{"Sega" if number % 2 else "Capcom"}'
+                        '</developer></game>' for number in range(5))
+        root = ElementTree.fromstring(
+            f'<gameList><provider /><folder /><folder />{games}</gameList>')
+        folders = []
+        otherdata = []
+        chunks = list(read_gamelist(root, header, folders, otherdata, 2))
+        self.assertEqual([len(rows) for rows, _ in chunks], [2, 2, 1])
+        self.assertEqual([len(unsupp) for _, unsupp in chunks], [2, 2, 1])
+        self.assertEqual(len(folders), 2)
+        self.assertEqual([tag.tag for tag in otherdata], ['provider'])
+        rows = [row for chunk, _ in chunks for row in chunk]
+        developer = header['developer']
+        self.assertIn('developer', ENCODED_TAGS)
+        self.assertIs(rows[0][developer], rows[2][developer])
+        self.assertIs(rows[1][developer], rows[3][developer])
+        self.assertEqual(rows[1][developer], 'Sega')
+
+
+class RepeatedTagExportTest(unittest.TestCase):
+    """ A repeated supported tag must not replace the cell of its column in
+        any export, also after the cell was edited.
+    """
+    def setUp(self):
+        fd, file = tempfile.mkstemp(suffix='.xml')
+        with os.fdopen(fd, 'wb') as stream:
+            stream.write(REPEATED)
+        self.addCleanup(os.unlink, file)
+        self.gamelist = Gamelist(file)
+        self.name = self.gamelist.header['name']
+
+    def export(self, format):
+        gamelist = self.gamelist
+        args = (gamelist, gamelist.data, [], False, True, NoProgress())
+        if format == 'json':
+            game = json.loads(data_to_json(*args, None))['gameList'][0]
+            return game['name'], game
+        if format == 'csv':
+            rows, header = data_to_csv(*args)
+            return rows[0]['name'], rows[0]
+        if format == 'txt':
+            lines = data_to_txt(*args, None)
+            return lines[0], lines
+        parts = []
+        xml_stream(parts.append, *args, None)
+        game = ElementTree.fromstring(''.join(parts)).find('game')
+        return [tag.text for tag in game.iter('name')], game
+
+    def test_exports_keep_the_first(self):
+        for format in ['json', 'csv', 'txt']:
+            with self.subTest(format=format):
+                name, game = self.export(format)
+                self.assertEqual(name, 'Real')
+                self.assertIn('eu', str(game))
+        self.assertEqual(self.export('xml')[0], ['Real'])
+
+    def test_exports_keep_edits(self):
+        self.gamelist.data[0][self.name] = 'Edited'
+        for format in ['json', 'csv', 'txt']:
+            with self.subTest(format=format):
+                self.assertEqual(self.export(format)[0], 'Edited')
+        self.assertEqual(self.export('xml')[0], ['Edited'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+#!/usr/bin/python3
+
+""" Tests of modules.export.  Run from the project root:
+
+        python3 -m unittest discover -s tests -t .
+"""
+
+import codecs
+import os
+import tempfile
+import unittest
+
+from modules.export import looks_like_gamelist
+
+
+class LooksLikeGamelistTest(unittest.TestCase):
+
+    def check(self, content):
+        fd, file = tempfile.mkstemp(suffix='.xml')
+        with os.fdopen(fd, 'wb') as stream:
+            stream.write(content)
+        try:
+            return looks_like_gamelist(file)
+        finally:
+            os.unlink(file)
+
+    def test_gamelist(self):
+        self.assertTrue(self.check(
+            b'<?xml version="1.0"?>\n<gameList>\n</gameList>\n'))
+        self.assertTrue(self.check(b'<gameList><game /></gameList>'))
+        self.assertTrue(self.check(
+            codecs.BOM_UTF8 + b'<!-- scraped -->\n<gameList />'))
+        self.assertTrue(self.check(
+            codecs.BOM_UTF16_LE + '<gameList />'.encode('utf-16-le')))
+
+    def test_long_prolog_trusts_declaration(self):
+        comment = b'<!-- ' + b'x' * 8192 + b' -->'
+        self.assertTrue(self.check(
+            b'<?xml version="1.0"?>' + comment + b'<gameList />'))
+        self.assertFalse(self.check(comment + b'<gameList />'))
+
+    def test_other_xml_is_refused(self):
+        self.assertFalse(self.check(
+            b'<?xml version="1.0"?>\n<svg xmlns="http://www.w3.org/2000/svg">'
+            b'</svg>'))
+        self.assertFalse(self.check(b'<root><gameList /></root>'))
+
+    def test_html_is_refused(self):
+        self.assertFalse(self.check(
+            b'<!DOCTYPE html>\n<html><head><title>gameList</title></head>'
+            b'</html>'))
+        self.assertFalse(self.check(b'<html><body></body></html>'))
+
+    def test_other_files_are_refused(self):
+        self.assertFalse(self.check(b''))
+        self.assertFalse(self.check(b'name;path\nGame;./game.zip\n'))
+        self.assertFalse(self.check(b'{"gameList": []}'))
+
+
+if __name__ == '__main__':
+    unittest.main()
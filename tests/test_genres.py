@@ -0,0 +1,149 @@
+#!/usr/bin/python3
+
+""" Tests of modules.genres.  Run from the project root:
+
+        python3 -m unittest discover -s tests -t .
+"""
+
+import random
+import unittest
+
+from modules.genres import GenreIndex, has_genre, split_genres
+
+
+VALUES = ['Action / Platform', 'Shooter', '', 'Platform', None,
+          'Action / Shooter', 'Platform']
+
+
+def scan(values, genre, groups=False):
+    """ find_rows() done without the index. """
+    return {row for row, value in enumerate(values)
+            if has_genre(value, genre, groups)}
+
+
+class SplitGenresTest(unittest.TestCase):
+
+    def test_split(self):
+        self.assertEqual(split_genres('Action / Platform'),
+                         ['Action', 'Platform'])
+        self.assertEqual(split_genres(' Action / Platform ', True),
+                         ['Action / Platform'])
+        self.assertTrue(has_genre('Action / Platform', 'Platform'))
+        self.assertFalse(has_genre('Action / Platform', 'Platform', True))
+        self.assertFalse(has_genre('', ''))
+        self.assertFalse(has_genre(None, 'Action'))
+
+
+class GenreIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.values = list(VALUES)
+        self.index = GenreIndex(self.values)
+        self.index.changed = False
+
+    def assert_rows(self):
+        for groups in [False, True]:
+            genres = {genre for value in self.values if value
+                      for genre in split_genres(value, groups)}
+            self.assertEqual(self.index.get_genres(groups), sorted(genres))
+            for genre in genres:
+                self.assertEqual(self.index.find_rows(genre, groups),
+                                 scan(self.values, genre, groups),
+                                 (genre, groups))
+
+    def test_find_rows(self):
+        self.assertEqual(len(self.index), 4)
+        self.assertEqual(self.index.get_genres(),
+                         ['Action', 'Platform', 'Shooter'])
+        self.assertEqual(self.index.find_rows('Platform'), {0, 3, 6})
+        self.assertEqual(self.index.find_rows('Platform', True), {3, 6})
+        self.assertEqual(self.index.find_rows('Action / Shooter', True),
+                         {5})
+        self.assertEqual(self.index.find_rows('Racing'), set())
+        self.assertEqual(self.index.get_values('Shooter'),
+                         {'Shooter', 'Action / Shooter'})
+        self.assert_rows()
+
+    def test_counts(self):
+        self.assertEqual(self.index.get_counts(),
+                         {'Action': 2, 'Platform': 3, 'Shooter': 2})
+        self.assertEqual(self.index.get_counts(True),
+                         {'Action / Platform': 1, 'Shooter': 1,
+                          'Platform': 2, 'Action / Shooter': 1})
+
+    def test_edit(self):
+        self.index.discard(3, 'Platform')
+        self.index.add(3, 'Shooter')
+        self.values[3] = 'Shooter'
+        # No genre appeared or disappeared.
+        self.assertFalse(self.index.changed)
+        self.assert_rows()
+        self.index.discard(5, 'Action / Shooter')
+        self.index.add(5, 'Racing')
+        self.values[5] = 'Racing'
+        self.assertTrue(self.index.changed)
+        self.assertNotIn('Action / Shooter', self.index.get_genres(True))
+        self.assert_rows()
+        # Rows without the value are left alone.
+        self.index.discard(1, 'Platform')
+        self.index.discard(1, 'Puzzle')
+        self.index.add(2, '')
+        self.assert_rows()
+
+    def test_insert_and_remove_rows(self):
+        self.index.insert_row(1, 'Puzzle')
+        self.values.insert(1, 'Puzzle')
+        self.assertEqual(self.index.find_rows('Platform'), {0, 4, 7})
+        self.assert_rows()
+        self.index.remove_row(0, 'Action / Platform')
+        del self.values[0]
+        self.assertEqual(self.index.find_rows('Platform'), {3, 6})
+        self.assert_rows()
+        self.index.insert_row(len(self.values), None)
+        self.values.append(None)
+        self.assert_rows()
+
+    def test_shift(self):
+        self.index.shift(4, 2)
+        self.assertEqual(self.index.find_rows('Platform'), {0, 3, 8})
+        self.assertEqual(self.index.find_rows('Shooter'), {1, 7})
+        self.index.shift(3, -1)
+        self.assertEqual(self.index.find_rows('Platform'), {0, 2, 7})
+
+    def test_random_edits(self):
+        rnd = random.Random(1)
+        choices = ['Action', 'Platform', 'Action / Platform', 'Puzzle',
+                   '', None]
+        for _ in range(500):
+            action = rnd.randrange(3)
+            value = rnd.choice(choices)
+            if action == 0 or not self.values:
+                row = rnd.randint(0, len(self.values))
+                self.index.insert_row(row, value)
+                self.values.insert(row, value)
+            elif action == 1:
+                row = rnd.randrange(len(self.values))
+                self.index.remove_row(row, self.values.pop(row))
+            else:
+                row = rnd.randrange(len(self.values))
+                self.index.discard(row, self.values[row])
+                self.index.add(row, value)
+                self.values[row] = value
+        self.assert_rows()
+
+    def test_clear(self):
+        self.index.clear()
+        self.assertTrue(self.index.changed)
+        self.assertEqual(len(self.index), 0)
+        self.assertEqual(self.index.get_genres(), [])
+        self.assertEqual(self.index.get_counts(True), {})
+        self.index.changed = False
+        self.index.clear()
+        self.assertFalse(self.index.changed)
+        self.index.extend(['Puzzle', 'Puzzle'], 3)
+        self.assertTrue(self.index.changed)
+        self.assertEqual(self.index.find_rows('Puzzle'), {3, 4})
+
+
+if __name__ == '__main__':
+    unittest.main()
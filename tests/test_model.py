@@ -0,0 +1,183 @@
+#!/usr/bin/python3
+
+""" Tests of the undo journal of modules.GamelistTable.  Run from the
+    project root:
+
+        python3 -m unittest discover -s tests -t .
+"""
+
+import unittest
+
+from modules.GamelistTable import GamelistTableModel
+from modules.core import NoProgress
+
+
+GAMES = [
+    ('Sonic', 'Sega', 'Platform'),
+    ('Mario', 'Nintendo', 'Platform'),
+    ('Doom', 'id Software', 'Shooter'),
+]
+
+
+class UndoTest(unittest.TestCase):
+
+    columnar = False
+
+    def setUp(self):
+        model = GamelistTableModel(None, None, NoProgress(), background=True,
+                                   columnar=self.columnar)
+        self.name = model.header['name']
+        self.developer = model.header['developer']
+        self.genre = model.header['genre']
+        rows = []
+        for name, developer, genre in GAMES:
+            row = [''] * len(model.header)
+            row[self.name] = name
+            row[self.developer] = developer
+            row[self.genre] = genre
+            rows.append(row)
+        model.append_rows(rows, [[] for _ in rows])
+        self.original = [list(row) for row in model.data]
+        self.model = model
+
+    def rows(self):
+        return [list(row) for row in self.model.data]
+
+    def names(self):
+        return [row[self.name] for row in self.model.data]
+
+    def test_nothing_to_undo(self):
+        self.assertFalse(self.model.undo())
+        self.assertFalse(self.model.redo())
+        self.assertFalse(self.model.is_edited())
+
+    def test_cell(self):
+        model = self.model
+        model.set_value(1, self.name, 'Luigi')
+        self.assertTrue(model.is_edited_cell(1, self.name))
+        self.assertEqual(model.original_value(1, self.name), 'Mario')
+        self.assertEqual(model.original_row(1), self.original[1])
+        self.assertTrue(model.undo())
+        self.assertEqual(self.rows(), self.original)
+        self.assertFalse(model.is_edited())
+        self.assertTrue(model.redo())
+        self.assertEqual(self.names(), ['Sonic', 'Luigi', 'Doom'])
+        self.assertTrue(model.is_edited_cell(1, self.name))
+        self.assertFalse(model.redo())
+
+    def test_same_value_is_not_recorded(self):
+        self.model.set_value(0, self.name, 'Sonic')
+        self.assertFalse(self.model.undo())
+
+    def test_edit_back_to_original(self):
+        model = self.model
+        model.set_value(0, self.name, 'Tails')
+        model.set_value(0, self.name, 'Sonic')
+        self.assertFalse(model.is_edited())
+        model.undo()
+        self.assertEqual(model.original_value(0, self.name), 'Sonic')
+        self.assertTrue(model.is_edited_row(0))
+
+    def test_new_edit_ends_redo(self):
+        model = self.model
+        model.set_value(0, self.name, 'Tails')
+        model.undo()
+        model.set_value(2, self.name, 'Quake')
+        self.assertFalse(model.redo())
+        self.assertEqual(self.names(), ['Sonic', 'Mario', 'Quake'])
+
+    def test_group(self):
+        model = self.model
+        model.begin_group()
+        model.set_value(0, self.developer, 'Sonic Team')
+        model.set_value(0, self.name, 'Sonic 2')
+        model.set_value(0, self.name, 'Sonic 3')
+        model.end_group()
+        model.set_value(1, self.name, 'Luigi')
+        model.undo()
+        self.assertEqual(self.names(), ['Sonic 3', 'Mario', 'Doom'])
+        # The whole group is one step.
+        model.undo()
+        self.assertEqual(self.rows(), self.original)
+        self.assertFalse(model.is_edited())
+        model.redo()
+        self.assertEqual(model.data[0][self.name], 'Sonic 3')
+        self.assertEqual(model.data[0][self.developer], 'Sonic Team')
+
+    def test_empty_group(self):
+        self.model.begin_group()
+        self.model.end_group()
+        self.assertFalse(self.model.undo())
+
+    def test_remove(self):
+        model = self.model
+        model.set_value(2, self.name, 'Quake')
+        model.removeRows(1)
+        self.assertEqual(self.names(), ['Sonic', 'Quake'])
+        # Changes follow their rows.
+        self.assertTrue(model.is_edited_cell(1, self.name))
+        self.assertEqual(model.genres.find_rows('Platform'), {0})
+        model.undo()
+        self.assertEqual(self.names(), ['Sonic', 'Mario', 'Quake'])
+        self.assertEqual(model.original_value(2, self.name), 'Doom')
+        self.assertFalse(model.is_edited_row(1))
+        self.assertEqual(model.genres.find_rows('Platform'), {0, 1})
+        model.undo()
+        self.assertEqual(self.rows(), self.original)
+        model.redo()
+        model.redo()
+        self.assertEqual(self.names(), ['Sonic', 'Quake'])
+
+    def test_remove_edited_row(self):
+        model = self.model
+        model.set_value(1, self.name, 'Luigi')
+        model.removeRows(1)
+        self.assertFalse(model.is_edited())
+        model.undo()
+        self.assertEqual(self.names(), ['Sonic', 'Luigi', 'Doom'])
+        self.assertEqual(model.original_row(1), self.original[1])
+
+    def test_add(self):
+        model = self.model
+        model.insertRows(len(model.data))
+        model.duplicateRows(0, ['name'], len(model.data))
+        self.assertEqual(self.names(), ['Sonic', 'Mario', 'Doom', '', ''])
+        self.assertEqual(model.data[4][self.developer], 'Sega')
+        self.assertEqual(model.genres.find_rows('Platform'), {0, 1, 4})
+        model.undo()
+        model.undo()
+        self.assertEqual(self.rows(), self.original)
+        self.assertEqual(model.genres.find_rows('Platform'), {0, 1})
+        model.redo()
+        model.redo()
+        self.assertEqual(len(model.data), 5)
+        self.assertEqual(model.data[4][self.developer], 'Sega')
+
+    def test_word_counts(self):
+        model = self.model
+        counts = model.count_words(self.developer)
+        model.set_value(0, self.developer, 'Nintendo')
+        self.assertNotIn('Sega', counts)
+        model.undo()
+        self.assertIn('Sega', counts)
+        model.removeRows(0)
+        self.assertNotIn('Sega', counts)
+        model.undo()
+        self.assertIn('Sega', counts)
+
+    def test_clear_rows(self):
+        model = self.model
+        model.set_value(0, self.name, 'Tails')
+        model.clear_rows()
+        self.assertEqual(len(model.data), 0)
+        self.assertFalse(model.is_edited())
+        self.assertFalse(model.undo())
+
+
+class ColumnarUndoTest(UndoTest):
+
+    columnar = True
+
+
+if __name__ == '__main__':
+    unittest.main()
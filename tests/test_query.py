@@ -0,0 +1,137 @@
+#!/usr/bin/python3
+
+""" Tests of modules.query.  Run from the project root:
+
+        python3 -m unittest discover -s tests -t .
+"""
+
+import unittest
+
+from modules.columns import ColumnStore
+from modules.core import ENCODED_TAGS, build_header
+from modules.query import STOP_STEP, Query, QueryError
+
+
+HEADER = build_header()
+
+GAMES = [
+    {'name': 'Super Mario World', 'genre': 'Platform', 'rating': '0.9',
+     'players': '1-2', 'releasedate': '19901121T000000',
+     'favorite': 'true', 'developer': 'Nintendo'},
+    {'name': 'Doom', 'genre': 'Shooter', 'rating': '0.85', 'players': '4',
+     'releasedate': '19931210T000000', 'hidden': 'true',
+     'developer': 'id Software'},
+    {'name': 'Mario Kart', 'genre': 'Racing', 'rating': '0.75',
+     'players': '1-4', 'releasedate': '1992-08-27',
+     'developer': 'Nintendo'},
+    {'name': 'Tetris', 'rating': '', 'players': '1', 'favorite': 'false'},
+]
+
+
+def make_row(game):
+    row = [''] * len(HEADER)
+    for tag, value in game.items():
+        row[HEADER[tag]] = value
+    return row
+
+
+class QueryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.data = [make_row(game) for game in GAMES]
+
+    def find(self, text, data=None):
+        query = Query(text, HEADER)
+        rows = query.find_rows(self.data if data is None else data)
+        self.assertEqual(rows, [row for row, values in enumerate(self.data)
+                                if query.match(values)])
+        return rows
+
+    def test_text(self):
+        self.assertEqual(self.find('name:mario'), [0, 2])
+        self.assertEqual(self.find('mario'), [0, 2])
+        self.assertEqual(self.find('name:"mario kart"'), [2])
+        self.assertEqual(self.find('name=doom'), [1])
+        self.assertEqual(self.find('name!=doom'), [0, 2, 3])
+        self.assertEqual(self.find('name<e'), [1])
+        self.assertEqual(self.find('-nintendo'), [1, 3])
+        self.assertEqual(self.find(''), [0, 1, 2, 3])
+
+    def test_number(self):
+        self.assertEqual(self.find('rating>=0.8'), [0, 1])
+        self.assertEqual(self.find('rating<0.8'), [2])
+        # A range matches if any number in it does.
+        self.assertEqual(self.find('players:2'), [0, 2])
+        self.assertEqual(self.find('players>3'), [1, 2])
+
+    def test_date(self):
+        self.assertEqual(self.find('releasedate:1992'), [2])
+        self.assertEqual(self.find('releasedate<1992-01-01'), [0])
+        self.assertEqual(self.find('releasedate>=1992-08'), [1, 2])
+
+    def test_boolean(self):
+        self.assertEqual(self.find('favorite:true'), [0])
+        # Games without the tag are false.
+        self.assertEqual(self.find('hidden:no'), [0, 2, 3])
+        self.assertEqual(self.find('-hidden:yes favorite:0'), [2, 3])
+
+    def test_empty(self):
+        self.assertEqual(self.find('genre:'), [3])
+        self.assertEqual(self.find('-rating='), [0, 1, 2])
+
+    def test_regex(self):
+        self.assertEqual(self.find('name~^m.*t$'), [2])
+        self.assertEqual(self.find('genre~"^(racing|shooter)$"'), [1, 2])
+
+    def test_all_terms(self):
+        self.assertEqual(self.find('developer:nintendo rating>0.8'), [0])
+        self.assertEqual(self.find('nintendo players:4'), [2])
+
+    def test_column_store(self):
+        store = ColumnStore(len(HEADER), self.data,
+                            [HEADER[tag] for tag in ENCODED_TAGS])
+        for text in ['developer:nintendo', 'rating>=0.8', 'mario -kart']:
+            with self.subTest(text=text):
+                self.assertEqual(self.find(text, store), self.find(text))
+
+    def test_cheap_terms_first(self):
+        query = Query('name~mario mario favorite:true', HEADER)
+        costs = [term.cost for term in query.terms]
+        self.assertEqual(costs, sorted(costs))
+        self.assertEqual(query.terms[0].columns, [HEADER['favorite']])
+
+    def test_errors(self):
+        for text in ['platform:x', 'rating>high', 'releasedate:today',
+                     'releasedate:12', 'favorite>true', 'favorite:maybe',
+                     'name~(', 'name:"open']:
+            with self.subTest(text=text):
+                with self.assertRaises(QueryError):
+                    Query(text, HEADER)
+
+
+class StoppedTest(unittest.TestCase):
+
+    def setUp(self):
+        self.data = [make_row({'name': f'game {row}'})
+                     for row in range(10 * STOP_STEP)]
+
+    def test_stopped_within_a_term(self):
+        query = Query('name~game', HEADER)
+        calls = []
+
+        def stopped():
+            calls.append(None)
+            return len(calls) > 3
+        self.assertIsNone(query.find_rows(self.data, stopped))
+        self.assertEqual(len(calls), 4)
+
+    def test_not_stopped(self):
+        query = Query('name~"game 1" name:0', HEADER)
+        rows = query.find_rows(self.data, lambda: False)
+        self.assertEqual(rows, [row for row in range(len(self.data))
+                                if str(row).startswith('1')
+                                and '0' in str(row)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,156 @@
+#!/usr/bin/python3
+
+""" Tests of modules.sorting.  Run from the project root:
+
+        python3 -m unittest discover -s tests -t .
+"""
+
+import random
+import unittest
+
+from modules.columns import ColumnStore
+from modules.sorting import (LAST_KEY, compare_keys, get_fallbacks,
+                             get_sort_columns, row_key, significant,
+                             sort_order, sort_rows, text_key, upper_bound)
+
+
+# Columns of ROWS.
+NAME, SORTNAME, RATING = 0, 1, 2
+
+ROWS = [
+    ['game 10', '', '0.8'],
+    ['Game 9', 'a game', '0.75'],
+    ['game 9', None, None],
+    ['Alpha', '', '0.8'],
+    ['beta', 'zeta', '1'],
+]
+
+
+def sort_texts(texts):
+    return sorted(texts, key=text_key)
+
+
+class TextKeyTest(unittest.TestCase):
+
+    def test_numbers_by_value(self):
+        self.assertEqual(sort_texts(['game 10', 'game 9', 'game 100']),
+                         ['game 9', 'game 10', 'game 100'])
+        self.assertEqual(sort_texts(['v1.10', 'v1.9', 'v1.09.1']),
+                         ['v1.9', 'v1.09.1', 'v1.10'])
+        self.assertEqual(sort_texts(['2 in 1', '10 in 1', 'Zoo']),
+                         ['2 in 1', '10 in 1', 'Zoo'])
+
+    def test_case_is_ignored(self):
+        self.assertEqual(sort_texts(['beta', 'Alpha', 'ALPHA 2', 'Gamma']),
+                         ['Alpha', 'ALPHA 2', 'beta', 'Gamma'])
+        self.assertEqual(text_key('Straße'), text_key('STRASSE'))
+
+    def test_decimals(self):
+        self.assertEqual(sort_texts(['0.8', '0.75', '1', '0.05', '10']),
+                         ['0.05', '0.75', '0.8', '1', '10'])
+        self.assertEqual(text_key('0.50'), text_key('0.5'))
+
+    def test_empty_cells_last(self):
+        self.assertEqual(sort_texts([None, 'b', '', '1', None, 'a']),
+                         ['', '1', 'a', 'b', None, None])
+        self.assertIs(text_key(None), LAST_KEY)
+        self.assertFalse(LAST_KEY < text_key('z'))
+        self.assertFalse(LAST_KEY > LAST_KEY)
+
+
+class SortTest(unittest.TestCase):
+
+    def setUp(self):
+        self.fallbacks = get_fallbacks({'name': NAME, 'sortname': SORTNAME})
+
+    def test_fallbacks(self):
+        self.assertEqual(self.fallbacks, {SORTNAME: NAME})
+        self.assertEqual(get_fallbacks({'sortname': 1}), {})
+        self.assertEqual(get_sort_columns([(SORTNAME, False)],
+                                          self.fallbacks),
+                         {SORTNAME, NAME})
+
+    def test_significant(self):
+        self.assertEqual(significant([(0, False), (1, True), (0, True)]),
+                         [(1, True), (0, True)])
+        self.assertEqual(significant([(0, False), (-1, False), (2, True)]),
+                         [(2, True)])
+        self.assertEqual(significant([(0, False), (-1, False)]), [])
+
+    def test_sort_order(self):
+        order, keys = sort_order(ROWS, [(NAME, False)])
+        self.assertEqual(order, [3, 4, 1, 2, 0])
+        self.assertEqual(keys[0], (text_key('game 10'),))
+        order, _ = sort_order(ROWS, [(NAME, True)])
+        self.assertEqual(order, [0, 1, 2, 4, 3])
+        # The last spec is the primary column, equal keys keep their order.
+        # Descending is the reverse order, with empty cells first.
+        order, _ = sort_order(ROWS, [(NAME, False), (RATING, True)])
+        self.assertEqual(order, [2, 4, 3, 0, 1])
+        order, _ = sort_order(ROWS, [(NAME, True), (RATING, False)])
+        self.assertEqual(order, [1, 0, 3, 4, 2])
+
+    def test_fallback_column(self):
+        order, _ = sort_order(ROWS, [(SORTNAME, False)], self.fallbacks)
+        self.assertEqual(order, [1, 3, 2, 0, 4])
+
+    def test_column_store(self):
+        store = ColumnStore(3, ROWS, encoded=[RATING])
+        for specs in [[(NAME, False)], [(NAME, True), (RATING, False)],
+                      [(SORTNAME, False), (RATING, True)]]:
+            with self.subTest(specs=specs):
+                self.assertEqual(sort_order(store, specs, self.fallbacks),
+                                 sort_order(ROWS, specs, self.fallbacks))
+
+    def test_same_as_sorting_by_each_column(self):
+        rnd = random.Random(1)
+        words = [None, '', 'a', 'B', 'a 2', 'a 10', '0.5', '1.25', 'v1.9']
+        rows = [[rnd.choice(words) for _ in range(3)] for _ in range(300)]
+        for _ in range(50):
+            specs = significant([(rnd.randrange(3), rnd.random() < 0.5)
+                                 for _ in range(rnd.randint(1, 3))])
+            expected = list(range(len(rows)))
+            for column, descending in specs:
+                expected.sort(key=lambda row: text_key(rows[row][column]),
+                              reverse=descending)
+            order, _ = sort_order(rows, specs)
+            self.assertEqual([[rows[row][column] for column, _ in specs]
+                              for row in order],
+                             [[rows[row][column] for column, _ in specs]
+                              for row in expected], specs)
+
+    def test_sort_rows(self):
+        self.assertEqual(sort_rows(ROWS, [0, 2, 4], [RATING, NAME]),
+                         [4, 2, 0])
+        self.assertEqual(sort_rows(ROWS, [2, 0], []), [2, 0])
+        self.assertEqual(sort_rows(ROWS, range(5), [SORTNAME],
+                                   self.fallbacks),
+                         [1, 3, 2, 0, 4])
+
+    def test_place_a_row(self):
+        specs = [(NAME, False), (RATING, True)]
+        order, keys = sort_order(ROWS, specs)
+        directions = [True, False]
+        sorted_keys = [keys[row] for row in order]
+        for row in order:
+            self.assertEqual(row_key(ROWS[row], specs), keys[row])
+        for new in [['Alpha', '', '0.9'], ['game 9', '', '0.75'],
+                    ['zz', '', None], ['a', '', '5']]:
+            with self.subTest(row=new):
+                key = row_key(new, specs)
+                position = upper_bound(sorted_keys, key, directions)
+                expected, _ = sort_order(ROWS + [new], specs)
+                self.assertEqual(expected.index(len(ROWS)), position)
+
+    def test_compare_keys(self):
+        key = (text_key('a'), text_key('2'))
+        self.assertEqual(compare_keys(key, key, [False, False]), 0)
+        other = (text_key('a'), text_key('10'))
+        self.assertEqual(compare_keys(key, other, [False, False]), -1)
+        self.assertEqual(compare_keys(key, other, [False, True]), 1)
+        self.assertEqual(compare_keys((LAST_KEY,), (text_key('z'),),
+                                      [True]), -1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+#!/usr/bin/python3
+
+""" Tests of modules.trigrams.  Run from the project root:
+
+        python3 -m unittest discover -s tests -t .
+"""
+
+import random
+import re
+import unittest
+
+from modules.trigrams import (COMPACT_MIN, TrigramIndex, required_literals,
+                              trigrams)
+
+
+class RequiredLiteralsTest(unittest.TestCase):
+
+    def test_plain_text(self):
+        self.assertEqual(required_literals('mario'), ['mario'])
+        self.assertEqual(required_literals(''), [])
+
+    def test_split_at_special_characters(self):
+        self.assertEqual(required_literals('game 12.*puzzle'),
+                         ['game 12', 'puzzle'])
+        self.assertEqual(required_literals(r'^game \d+ sport$'),
+                         ['game ', ' sport'])
+        self.assertEqual(required_literals('a[xyz]bc'), ['a', 'bc'])
+        self.assertEqual(required_literals(r'1\.5'), ['1.5'])
+
+    def test_quantifiers(self):
+        # The character in front of an optional quantifier is not required.
+        self.assertEqual(required_literals('marios?'), ['mario'])
+        self.assertEqual(required_literals('mario*x'), ['mari', 'x'])
+        self.assertEqual(required_literals('mario{0,2}'), ['mari'])
+        self.assertEqual(required_literals('mario+x'), ['mario', 'x'])
+
+    def test_groups(self):
+        self.assertEqual(required_literals('super (mario|luigi) bros'),
+                         ['super ', ' bros'])
+        self.assertEqual(required_literals('ab(?#note)?c'), ['a', 'c'])
+        # Options change the rest of the pattern.
+        self.assertEqual(required_literals('abc(?x) d e'), ['abc'])
+
+    def test_nothing_certain(self):
+        self.assertEqual(required_literals('mario|zelda'), [])
+        self.assertEqual(required_literals('a)b'), [])
+        self.assertEqual(required_literals(r'\Qa.b\E'), [])
+        self.assertEqual(required_literals('(abc'), [])
+
+    def test_literals_are_in_every_match(self):
+        rnd = random.Random(1)
+        parts = ['a', 'b', 'ab', '.', '*', '+', '?', '|', '(', ')', '[ab]',
+                 '{1,2}', '\\d', '\\.', '^', '$', '(?i)', '(?:', '1']
+        texts = [''.join(rnd.choice('ab.1') for _ in range(rnd.randint(0, 8)))
+                 for _ in range(200)]
+        for _ in range(2000):
+            pattern = ''.join(rnd.choice(parts)
+                              for _ in range(rnd.randint(1, 6)))
+            try:
+                search = re.compile(pattern).search
+            except re.error:
+                continue
+            literals = required_literals(pattern)
+            for text in texts:
+                if search(text):
+                    for literal in literals:
+                        self.assertIn(literal, text, pattern)
+
+
+class TrigramIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.values = ['Super Mario', 'Zelda', None, 'MARIO Kart', '', 'ab']
+        self.index = TrigramIndex()
+        self.index.extend(self.values)
+
+    def test_trigrams(self):
+        self.assertEqual(trigrams('abcd'), {'abc', 'bcd'})
+        self.assertEqual(trigrams('ab'), set())
+
+    def test_search(self):
+        self.assertEqual(self.index.search('mario'), {0, 3})
+        self.assertEqual(self.index.search('ELD'), {1})
+        self.assertEqual(self.index.search('xyz'), set())
+        self.assertIsNone(self.index.search('ab'))
+        self.assertEqual(self.index.length, len(self.values))
+
+    def test_edit(self):
+        self.assertTrue(self.index.edit(1, 'Mario Party'))
+        self.assertTrue(self.index.search('mario') >= {0, 1, 3})
+        self.assertEqual(self.index.search('party'), {1})
+        # Only the trigrams of the last edit are kept.
+        self.assertTrue(self.index.edit(1, 'Metroid'))
+        self.assertEqual(self.index.search('party'), set())
+        self.assertEqual(self.index.search('metroid'), {1})
+        self.assertTrue(self.index.edit(1, None))
+        self.assertEqual(self.index.search('metroid'), set())
+        self.assertEqual(sum(map(len, self.index.edits.values())), 0)
+
+    def test_edits_do_not_grow(self):
+        for number in range(100):
+            self.index.edit(0, f'Mario {number}')
+        self.assertEqual(len(self.index.edited), 1)
+        self.assertEqual(sum(map(len, self.index.edits.values())),
+                         len(trigrams('mario 99')))
+
+    def test_cleared_with_many_edits(self):
+        index = TrigramIndex()
+        index.extend([f'game {row}' for row in range(2 * COMPACT_MIN)])
+        for row in range(COMPACT_MIN - 1):
+            self.assertTrue(index.edit(row, f'edited {row}'))
+        self.assertFalse(index.edit(COMPACT_MIN, 'edited'))
+        self.assertEqual(index.length, 0)
+        self.assertEqual(index.edits, {})
+
+    def test_view(self):
+        view = self.index.view()
+        self.index.extend(['Mario Golf'])
+        self.index.clear()
+        self.assertEqual(view.length, len(self.values))
+        self.assertTrue(view.search('mario') >= {0, 3})
+
+
+if __name__ == '__main__':
+    unittest.main()
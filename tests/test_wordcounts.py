@@ -0,0 +1,114 @@
+#!/usr/bin/python3
+
+""" Tests of modules.wordcounts.  Run from the project root:
+
+        python3 -m unittest discover -s tests -t .
+"""
+
+import unittest
+
+from PyQt5 import QtCore
+
+from modules.wordcounts import WordCounts, WordList
+
+
+class WordCountsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.counts = WordCounts(['Sega', '', 'Capcom', None, 'Sega'])
+        self.changed = set()
+        self.counts.watchers.append(self.changed)
+
+    def test_counts(self):
+        self.assertEqual(self.counts.counts, {'Sega': 2, 'Capcom': 1})
+        self.assertEqual(len(self.counts), 2)
+        self.assertEqual(set(self.counts), {'Sega', 'Capcom'})
+        self.assertIn('Sega', self.counts)
+        self.assertNotIn('', self.counts)
+
+    def test_empty_values_are_ignored(self):
+        self.counts.add('')
+        self.counts.add(None)
+        self.counts.discard('')
+        self.counts.discard('Konami')
+        self.assertEqual(self.counts.counts, {'Sega': 2, 'Capcom': 1})
+        self.assertEqual(self.changed, set())
+
+    def test_watchers_see_values_appear_and_disappear(self):
+        other = set()
+        self.counts.watchers.append(other)
+        self.counts.add('Sega')
+        self.counts.discard('Sega')
+        self.counts.discard('Sega')
+        self.assertEqual(self.changed, set())
+        self.counts.discard('Sega')
+        self.assertNotIn('Sega', self.counts)
+        self.counts.extend(['Konami', 'Konami', ''])
+        self.assertEqual(self.counts.counts, {'Capcom': 1, 'Konami': 2})
+        self.assertEqual(self.changed, {'Sega', 'Konami'})
+        self.assertEqual(other, {'Sega', 'Konami'})
+
+    def test_clear(self):
+        self.counts.clear()
+        self.assertEqual(len(self.counts), 0)
+        self.assertEqual(self.changed, {'Sega', 'Capcom'})
+        self.counts.add('Sega')
+        self.assertEqual(self.counts.counts, {'Sega': 1})
+
+
+class WordListTest(unittest.TestCase):
+
+    def setUp(self):
+        self.developers = WordCounts(['Sega', 'Capcom', 'Sega'])
+        self.publishers = WordCounts(['Sega', 'Atari'])
+        self.model = QtCore.QStringListModel()
+        self.wordlist = WordList([self.developers, self.publishers],
+                                 self.model)
+
+    def shown(self):
+        return self.model.stringList()
+
+    def test_words_of_all_columns(self):
+        self.wordlist.complete('')
+        self.assertEqual(self.shown(), ['Atari', 'Capcom', 'Sega'])
+        self.wordlist.complete('s')
+        self.assertEqual(self.shown(), ['Sega'])
+
+    def test_contains(self):
+        wordlist = WordList([self.developers], self.model, True, limit=2)
+        wordlist.complete('CA')
+        self.assertEqual(self.shown(), ['Capcom'])
+        wordlist.complete('a')
+        self.assertEqual(self.shown(), ['Capcom', 'Sega'])
+
+    def test_update(self):
+        self.wordlist.complete('s')
+        self.developers.add('Sunsoft')
+        self.developers.discard('Sega')
+        # Words are changed on update only.
+        self.assertEqual(self.shown(), ['Sega'])
+        self.wordlist.update()
+        self.assertEqual(self.shown(), ['Sega', 'Sunsoft'])
+        self.developers.discard('Sega')
+        self.publishers.discard('Sega')
+        # Capcom is a publisher now.
+        self.publishers.add('Capcom')
+        self.developers.discard('Capcom')
+        self.wordlist.update()
+        self.assertEqual(self.shown(), ['Sunsoft'])
+        self.wordlist.complete('')
+        self.assertEqual(self.shown(), ['Atari', 'Capcom', 'Sunsoft'])
+        self.assertEqual(self.wordlist.changed, set())
+
+    def test_close(self):
+        other = WordList([self.developers], QtCore.QStringListModel())
+        self.wordlist.close()
+        self.assertEqual(self.developers.watchers, [other.changed])
+        self.assertEqual(self.publishers.watchers, [])
+        self.developers.add('Konami')
+        self.assertEqual(self.wordlist.changed, set())
+        self.assertEqual(other.changed, {'Konami'})
+
+
+if __name__ == '__main__':
+    unittest.main()